@@ -1,27 +1,47 @@
 # local_api.py
 
 import os
+import json
 import uuid
 import logging
 
-from flask import Flask, request, send_file, jsonify
+from flask import Flask, Response, request, send_file, jsonify, stream_with_context
 from flask_cors import CORS
 
-from services.openai_service import OpenAIService
+from services.openai_service import OpenAIService, OpenAIServiceError, OpenAIRateLimitError, OpenAITimeoutError
 from services.translator_service import TranslatorService
 from services.json_generation_service import JSONGenerationService
 from services.data_generation_service import DataGenerationService
+from services.job_service import JobService, JobQueueFullError
+from services.model_cache_service import ModelCacheService
+from services.prompt_cache_service import PromptCacheService
 from utils.logger_config import LoggerUtils
+from utils.output_utils import OutputUtils
+
+
+class RequestParameterError(ValueError):
+    """
+    Parámetro de una petición con un valor no válido: se responde con 400.
+    """
+
 
 class WebAPI:
     """
-    Sub­sistema Web API que expone el endpoint /generate y orquesta
-    los servicios de generación de datos.
+    Sub­sistema Web API que expone el endpoint /generate (y /jobs para
+    ejecuciones asíncronas) y orquesta los servicios de generación de datos.
     """
 
+    STREAM_CHUNK_SIZE = 10_000
+    # Semillas de 32 bits: las de SDV / CTGAN no pueden ser mayores
+    MAX_SEED = 2 ** 32 - 1
+
     def __init__(self,
                  logger_name: str = "my_logger",
-                 log_file: str = "app.log"):
+                 log_file: str = "app.log",
+                 job_workers: int = 2,
+                 job_queue_size: int = 20,
+                 job_generator_limits: dict = None,
+                 merlin_workers: int = 1):
         # Logger
         self.logger: logging.Logger = LoggerUtils.setup_logger(logger_name, log_file)
 
@@ -30,12 +50,29 @@ class WebAPI:
         CORS(self.app)
 
         # Servicios
-        self.openai_service      = OpenAIService(self.logger, model_name="gpt-4o-mini")
-        self.translator_service  = TranslatorService(self.logger)
+        prompt_cache_path        = os.path.join(self._tmp_dir(), "prompt_cache.sqlite3")
+        self.prompt_cache        = PromptCacheService(self.logger, prompt_cache_path)
+        self.openai_service      = OpenAIService(self.logger, model_name="gpt-4o-mini", cache=self.prompt_cache)
+        translation_cache_path   = os.path.join(self._tmp_dir(), "translations.sqlite3")
+        self.translator_service  = TranslatorService(self.logger, cache_path=translation_cache_path)
         self.json_gen_service    = JSONGenerationService(self.openai_service, self.logger)
+        model_cache_dir          = os.path.join(self._tmp_dir(), "model_cache")
+        self.model_cache         = ModelCacheService(self.logger, model_cache_dir)
         self.data_gen_service    = DataGenerationService(self.translator_service,
                                                          self.openai_service,
-                                                         self.logger)
+                                                         self.logger,
+                                                         self.model_cache)
+        self.job_service         = JobService(self.logger,
+                                              results_dir=os.path.join(self._tmp_dir(), "jobs"),
+                                              max_workers=job_workers,
+                                              max_queue=job_queue_size,
+                                              generator_limits=job_generator_limits or {"ctgan": 1},
+                                              model_cache_dir=model_cache_dir,
+                                              prompt_cache_path=prompt_cache_path,
+                                              translation_cache_path=translation_cache_path)
+
+        # Procesos que generan las filas de MERLIN (None = uno por núcleo)
+        self.merlin_workers = merlin_workers
 
         # Registrar rutas
         self._register_routes()
@@ -44,44 +81,65 @@ class WebAPI:
         @self.app.route("/generate", methods=["POST"])
         def generate():
             try:
-                # Calculamos tmp_dir en backend/tmp independientemente de donde arranquemos
-                current_dir = os.path.dirname(__file__)
-                parent_dir  = os.path.abspath(os.path.join(current_dir, os.pardir))
-                tmp_dir     = os.path.join(parent_dir, "tmp")
-                os.makedirs(tmp_dir, exist_ok=True)
+                tmp_dir = self._tmp_dir()
 
                 # --- CTGAN / Gaussian uploads (form-data) ---
                 if 'generator_type' in request.form:
                     gtype = request.form['generator_type'].lower()
                     rows  = int(request.form.get('rows', 100))
+                    stream = self._is_true(request.form.get('stream'))
+                    training = self._training_from_form(request.form)
+                    seed = self._seed(request.form.get('seed'))
+                    output_format = self._output_format(request.form.get('output_format'))
                     file_ = request.files.get('file')
                     if not file_:
                         return jsonify({"error": "No file was uploaded"}), 400
+                    if gtype not in ('ctgan', 'gaussian'):
+                        return jsonify({"error": f"Unknown generator_type: {gtype}"}), 400
+                    error = self._output_format_error(output_format, stream)
+                    if error:
+                        return jsonify({"error": error}), 400
 
                     # Generamos nombres y rutas usando tmp_dir
                     in_name  = f"{gtype}_{uuid.uuid4().hex}_input.csv"
                     in_path  = os.path.join(tmp_dir, in_name)
                     file_.save(in_path)
 
-                    out_name = f"{gtype}_{uuid.uuid4().hex}_augmented.csv"
-                    out_path = os.path.join(tmp_dir, out_name)
+                    if stream:
+                        try:
+                            synthesizer, report = self.data_gen_service.fit_synthesizer(gtype, in_path, training, seed)
+                        except Exception:
+                            self._remove_files(in_path)
+                            raise
+                        chunks = self.data_gen_service.iter_augmented_csv(
+                            in_path, synthesizer, rows, chunk_size=self.STREAM_CHUNK_SIZE, seed=seed
+                        )
+                        # El original se copia en streaming: se borra al cerrar la respuesta
+                        response = self._stream_csv(chunks, in_path)
+                        response.headers["X-Training-Report"] = json.dumps(report)
+                        return response
 
-                    if gtype == 'ctgan':
-                        self.data_gen_service.generate_data_ctgan(in_path, rows, out_path)
-                    elif gtype == 'gaussian':
-                        self.data_gen_service.generate_data_gaussian(in_path, rows, out_path)
-                    else:
-                        return jsonify({"error": f"Unknown generator_type: {gtype}"}), 400
+                    out_name = f"{gtype}_{uuid.uuid4().hex}_augmented{OutputUtils.extension(output_format)}"
+                    out_path = os.path.join(tmp_dir, out_name)
 
-                    if not os.path.exists(out_path):
-                        return jsonify({"error": "CSV not created"}), 500
+                    try:
+                        if gtype == 'ctgan':
+                            report = self.data_gen_service.generate_data_ctgan(
+                                in_path, rows, out_path, training=training, seed=seed, output_format=output_format
+                            )
+                        else:
+                            report = self.data_gen_service.generate_data_gaussian(
+                                in_path, rows, out_path, training=training, seed=seed, output_format=output_format
+                            )
+                    except Exception:
+                        # Ni la subida ni una salida a medias se quedan en tmp_dir
+                        self._remove_files(in_path, out_path)
+                        raise
 
-                    return send_file(
-                        out_path,
-                        mimetype="text/csv",
-                        as_attachment=True,
-                        download_name="synthetic_data.csv"
-                    )
+                    response = self._send_output(out_path, output_format, in_path)
+                    if isinstance(response, Response):
+                        response.headers["X-Training-Report"] = json.dumps(report)
+                    return response
 
                 # --- JSON-based generators (Merlin/Gold/Real) ---
                 data = request.get_json()
@@ -91,11 +149,33 @@ class WebAPI:
                 gtype = data.get("generator_type", "").lower()
                 theme = data.get("theme", "")
                 rows  = data.get("rows", 100)
+                stream = self._is_true(data.get("stream"))
+                use_cache = self._use_cache(gtype, data.get("cache"))
+                seed = self._seed(data.get("seed"))
+                output_format = self._output_format(data.get("output_format"))
                 if not gtype or not theme:
                     return jsonify({"error": "Missing 'generator_type' or 'theme'"}), 400
+                error = self._output_format_error(output_format, stream)
+                if error:
+                    return jsonify({"error": error}), 400
+
+                if gtype == "merlin" and stream:
+                    config = self.data_gen_service.create_merlin_config(theme, self.json_gen_service, use_cache, seed)
+                    if config is None:
+                        return jsonify({"error": "Could not generate a valid configuration"}), 500
+                    chunks = self.data_gen_service.iter_csv_from_config(
+                        config,
+                        vary_names=True,
+                        vary_countries=True,
+                        num_rows=rows,
+                        seed=seed,
+                        chunk_size=self.STREAM_CHUNK_SIZE,
+                        workers=self.merlin_workers
+                    )
+                    return self._stream_csv(chunks)
 
                 # Preparamos ruta de salida en el mismo tmp_dir
-                filename = f"{gtype}_{uuid.uuid4().hex}.csv"
+                filename = f"{gtype}_{uuid.uuid4().hex}{OutputUtils.extension(output_format)}"
                 filepath = os.path.join(tmp_dir, filename)
 
                 if gtype == "merlin":
@@ -105,37 +185,359 @@ class WebAPI:
                         rows=rows,
                         vary_names=True,
                         vary_countries=True,
-                        output_file=filepath
+                        output_file=filepath,
+                        use_cache=use_cache,
+                        seed=seed,
+                        workers=self.merlin_workers,
+                        output_format=output_format
                     )
                 elif gtype == "gold":
                     self.data_gen_service.generate_data_gold(
                         theme=theme,
                         rows=rows,
-                        output_file=filepath
+                        output_file=filepath,
+                        max_concurrency=data.get("max_concurrency", DataGenerationService.LLM_MAX_CONCURRENCY),
+                        use_cache=use_cache,
+                        seed=seed,
+                        output_format=output_format
                     )
                 elif gtype == "real":
                     self.data_gen_service.generate_data_real(
                         theme=theme,
                         rows=rows,
-                        output_file=filepath
+                        output_file=filepath,
+                        max_concurrency=data.get("max_concurrency", DataGenerationService.LLM_MAX_CONCURRENCY),
+                        use_cache=use_cache,
+                        seed=seed,
+                        output_format=output_format
                     )
                 else:
                     return jsonify({"error": f"Unknown generator_type: {gtype}"}), 400
 
-                if not os.path.exists(filepath):
-                    return jsonify({"error": "CSV not created"}), 500
+                return self._send_output(filepath, output_format)
+
+            except RequestParameterError as e:
+                return jsonify({"error": str(e)}), 400
+            except OpenAIServiceError as e:
+                self.logger.error(f"OpenAI error in /generate endpoint: {e}")
+                return self._openai_error_response(e)
+            except Exception as e:
+                self.logger.exception("Error in /generate endpoint")
+                return jsonify({"error": str(e)}), 500
+
+        @self.app.route("/jobs", methods=["POST"])
+        def create_job():
+            in_path = None
+            try:
+                # --- CTGAN / Gaussian uploads (form-data) ---
+                if 'generator_type' in request.form:
+                    gtype = request.form['generator_type'].lower()
+                    rows  = int(request.form.get('rows', 100))
+                    file_ = request.files.get('file')
+                    if not file_:
+                        return jsonify({"error": "No file was uploaded"}), 400
+                    if gtype not in ('ctgan', 'gaussian'):
+                        return jsonify({"error": f"Unknown generator_type: {gtype}"}), 400
+
+                    in_path = os.path.join(self._tmp_dir(), f"{gtype}_{uuid.uuid4().hex}_input.csv")
+                    file_.save(in_path)
+                    params = {
+                        "rows": rows,
+                        "input_file": in_path,
+                        "training": self._training_from_form(request.form),
+                        "seed": self._seed(request.form.get('seed')),
+                        "output_format": self._output_format(request.form.get('output_format')),
+                    }
+
+                # --- JSON-based generators (Merlin/Gold/Real) ---
+                else:
+                    data = request.get_json(silent=True)
+                    if not data:
+                        return jsonify({"error": "No JSON payload provided"}), 400
+
+                    gtype = data.get("generator_type", "").lower()
+                    theme = data.get("theme", "")
+                    if not gtype or not theme:
+                        return jsonify({"error": "Missing 'generator_type' or 'theme'"}), 400
+                    if gtype not in ('merlin', 'gold', 'real'):
+                        return jsonify({"error": f"Unknown generator_type: {gtype}"}), 400
+                    params = {
+                        "rows": data.get("rows", 100),
+                        "theme": theme,
+                        "cache": self._use_cache(gtype, data.get("cache")),
+                        "seed": self._seed(data.get("seed")),
+                        "output_format": self._output_format(data.get("output_format")),
+                    }
+                    if gtype == 'merlin':
+                        params["workers"] = self.merlin_workers
+
+                error = self._output_format_error(params["output_format"])
+                if error:
+                    self._remove_files(in_path)
+                    return jsonify({"error": error}), 400
+                job_id = self.job_service.submit(gtype, params)
+                return jsonify({"job_id": job_id, "status": JobService.QUEUED, "status_url": f"/jobs/{job_id}"}), 202
+
+            except JobQueueFullError as e:
+                self._remove_files(in_path)
+                return jsonify({"error": str(e)}), 429
+            except RequestParameterError as e:
+                self._remove_files(in_path)
+                return jsonify({"error": str(e)}), 400
+            except Exception as e:
+                self._remove_files(in_path)
+                self.logger.exception("Error in /jobs endpoint")
+                return jsonify({"error": str(e)}), 500
+
+        @self.app.route("/jobs/<job_id>", methods=["GET"])
+        def get_job(job_id):
+            job = self.job_service.get(job_id)
+            if job is None:
+                return jsonify({"error": f"Unknown job: {job_id}"}), 404
+            if job["status"] == JobService.DONE:
+                job["result_url"] = f"/jobs/{job_id}/result"
+            return jsonify(job)
+
+        @self.app.route("/jobs/<job_id>/result", methods=["GET"])
+        def get_job_result(job_id):
+            if self.job_service.get(job_id) is None:
+                return jsonify({"error": f"Unknown job: {job_id}"}), 404
+            path = self.job_service.result_path(job_id)
+            if path is None or not os.path.exists(path):
+                return jsonify({"error": "Job result is not available"}), 409
+            output_format = OutputUtils.format_of(path)
+            return send_file(
+                path,
+                mimetype=OutputUtils.mimetype(output_format),
+                as_attachment=True,
+                download_name=f"synthetic_data{OutputUtils.extension(output_format)}"
+            )
+
+        @self.app.route("/jobs/<job_id>", methods=["DELETE"])
+        def cancel_job(job_id):
+            if self.job_service.get(job_id) is None:
+                return jsonify({"error": f"Unknown job: {job_id}"}), 404
+            if not self.job_service.cancel(job_id):
+                return jsonify({"error": "Job has already finished"}), 409
+            return jsonify(self.job_service.get(job_id))
+
+        @self.app.route("/models", methods=["POST"])
+        def fit_model():
+            in_path = None
+            try:
+                gtype = request.form.get('generator_type', '').lower()
+                file_ = request.files.get('file')
+                if not file_:
+                    return jsonify({"error": "No file was uploaded"}), 400
+                if gtype not in ('ctgan', 'gaussian'):
+                    return jsonify({"error": f"Unknown generator_type: {gtype}"}), 400
+
+                in_path = os.path.join(self._tmp_dir(), f"{gtype}_{uuid.uuid4().hex}_input.csv")
+                file_.save(in_path)
+                model_id, report = self.data_gen_service.fit_model(
+                    gtype, in_path, self._training_from_form(request.form), self._seed(request.form.get('seed'))
+                )
+                return jsonify({
+                    "model_id": model_id,
+                    "generator_type": gtype,
+                    "training": report,
+                    "sample_url": f"/models/{model_id}/sample"
+                }), 201
 
-                return send_file(
-                    filepath,
-                    mimetype="text/csv",
-                    as_attachment=True,
-                    download_name="synthetic_data.csv"
+            except RequestParameterError as e:
+                return jsonify({"error": str(e)}), 400
+            except Exception as e:
+                self.logger.exception("Error in /models endpoint")
+                return jsonify({"error": str(e)}), 500
+            finally:
+                self._remove_files(in_path)
+
+        @self.app.route("/models/<model_id>/sample", methods=["POST"])
+        def sample_model(model_id):
+            try:
+                data = request.get_json(silent=True) or {}
+                chunks = self.data_gen_service.iter_model_samples(
+                    model_id,
+                    rows=int(data.get("rows", 100)),
+                    conditions=data.get("conditions"),
+                    seed=self._seed(data.get("seed")),
+                    batch_size=int(data.get("batch_size", self.STREAM_CHUNK_SIZE))
                 )
+                return self._stream_csv(chunks)
 
+            except RequestParameterError as e:
+                return jsonify({"error": str(e)}), 400
+            except KeyError:
+                return jsonify({"error": f"Unknown model: {model_id}"}), 404
             except Exception as e:
-                self.logger.exception("Error in /generate endpoint")
+                self.logger.exception("Error in /models/<id>/sample endpoint")
                 return jsonify({"error": str(e)}), 500
 
+        # Los modelos entrenados con POST /models quedan fijados en la caché
+        # (no se desalojan) hasta que se borran aquí
+        @self.app.route("/models/<model_id>", methods=["DELETE"])
+        def delete_model(model_id):
+            if not self.data_gen_service.delete_model(model_id):
+                return jsonify({"error": f"Unknown model: {model_id}"}), 404
+            return "", 204
+
+        # Los contadores de modelos son los de todos los procesos (web y jobs);
+        # los de prompts sólo los de este proceso web
+        @self.app.route("/cache/stats", methods=["GET"])
+        def cache_stats():
+            return jsonify({"models": self.model_cache.stats(), "prompts": self.prompt_cache.stats()})
+
+    def _tmp_dir(self) -> str:
+        """
+        Calcula backend/tmp independientemente de donde arranquemos y lo crea si no existe.
+        """
+        current_dir = os.path.dirname(__file__)
+        parent_dir  = os.path.abspath(os.path.join(current_dir, os.pardir))
+        tmp_dir     = os.path.join(parent_dir, "tmp")
+        os.makedirs(tmp_dir, exist_ok=True)
+        return tmp_dir
+
+    @staticmethod
+    def _is_true(value) -> bool:
+        if isinstance(value, str):
+            return value.strip().lower() in ("1", "true", "yes", "on")
+        return bool(value)
+
+    @staticmethod
+    def _use_cache(gtype: str, value) -> bool:
+        """
+        Parámetro 'cache' de una petición. Si no se indica, sólo se usa la
+        caché de prompts para el config de MERLIN; las filas de GOLD/REAL
+        se piden siempre nuevas salvo que se active explícitamente.
+        """
+        if value is None:
+            return gtype == "merlin"
+        return WebAPI._is_true(value)
+
+    @staticmethod
+    def _seed(value):
+        """
+        Semilla opcional de una petición (JSON o formulario): entero entre
+        0 y MAX_SEED (el rango que aceptan SDV y CTGAN) o None. Lanza
+        RequestParameterError si no lo es.
+        """
+        if value is None or (isinstance(value, str) and not value.strip()):
+            return None
+        seed = -1
+        if not isinstance(value, bool) and not (isinstance(value, float) and not value.is_integer()):
+            try:
+                seed = int(value)
+            except (TypeError, ValueError):
+                pass
+        if not 0 <= seed <= WebAPI.MAX_SEED:
+            raise RequestParameterError(f"'seed' must be an integer between 0 and {WebAPI.MAX_SEED}, got {value!r}.")
+        return seed
+
+    @staticmethod
+    def _training_from_form(form) -> dict:
+        """
+        Lee el presupuesto de entrenamiento opcional de un formulario
+        (max_rows, epochs, batch_size, time_limit, stratify).
+        """
+        training = {}
+        for key, cast in (("max_rows", int), ("epochs", int), ("batch_size", int), ("time_limit", float)):
+            if form.get(key):
+                training[key] = cast(form[key])
+
+        stratify = form.get("stratify")
+        if stratify is not None:
+            if stratify.strip().lower() in ("0", "false", "no", "off", ""):
+                training["stratify"] = False
+            elif stratify.strip().lower() in ("1", "true", "yes", "on"):
+                training["stratify"] = True
+            else:
+                training["stratify"] = [c.strip() for c in stratify.split(",") if c.strip()]
+        return training
+
+    @staticmethod
+    def _openai_error_response(error: OpenAIServiceError):
+        """
+        429 si OpenAI sigue limitando, 504 si se agota el plazo y 502 en otro caso.
+        """
+        if isinstance(error, OpenAIRateLimitError):
+            response = jsonify({"error": str(error)})
+            response.status_code = 429
+            if error.retry_after is not None:
+                response.headers["Retry-After"] = str(int(error.retry_after + 0.5))
+            return response
+        status = 504 if isinstance(error, OpenAITimeoutError) else 502
+        return jsonify({"error": str(error)}), status
+
+    def _remove_files(self, *paths):
+        for path in paths:
+            try:
+                if path and os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                self.logger.warning(f"Could not remove temp file {path}: {e}")
+
+    @staticmethod
+    def _output_format(value):
+        """
+        Formato de salida de una petición (ver OutputUtils.FORMATS), o None
+        si no es válido.
+        """
+        try:
+            return OutputUtils.normalize_format(value)
+        except ValueError:
+            return None
+
+    @staticmethod
+    def _output_format_error(output_format, stream: bool = False):
+        """
+        Mensaje de error para un output_format inválido (o no disponible en streaming).
+        """
+        if output_format is None:
+            return f"Unknown output_format. Use one of {list(OutputUtils.FORMATS)}"
+        if stream and output_format != OutputUtils.DEFAULT_FORMAT:
+            return "Streaming is only available with output_format 'csv'"
+        return None
+
+    def _send_output(self, out_path: str, output_format: str = OutputUtils.DEFAULT_FORMAT, *extra_tmp_files):
+        """
+        Envía el fichero generado y borra los ficheros temporales al cerrar la respuesta.
+        """
+        if not os.path.exists(out_path):
+            self._remove_files(*extra_tmp_files)
+            return jsonify({"error": "Output file not created"}), 500
+
+        response = send_file(
+            out_path,
+            mimetype=OutputUtils.mimetype(output_format),
+            as_attachment=True,
+            download_name=f"synthetic_data{OutputUtils.extension(output_format)}"
+        )
+        # Sin direct_passthrough Werkzeug envuelve el fichero y ejecuta call_on_close al terminar
+        response.direct_passthrough = False
+        response.call_on_close(lambda: self._remove_files(out_path, *extra_tmp_files))
+        return response
+
+    def _stream_csv(self, chunks, *tmp_files):
+        """
+        Devuelve una respuesta HTTP que va enviando los bloques CSV según se generan.
+        Los ficheros temporales indicados se borran al cerrar la respuesta.
+        """
+        def body():
+            try:
+                for chunk in chunks:
+                    yield chunk.encode('utf-8')
+            except Exception:
+                self.logger.exception("Error while streaming CSV response")
+                raise
+
+        response = Response(
+            stream_with_context(body()),
+            mimetype="text/csv",
+            headers={"Content-Disposition": "attachment; filename=synthetic_data.csv"}
+        )
+        if tmp_files:
+            response.call_on_close(lambda: self._remove_files(*tmp_files))
+        return response
 
     def run(self, host="0.0.0.0", port=5000, debug=True):
         self.app.run(host=host, port=port, debug=debug)
\ No newline at end of file
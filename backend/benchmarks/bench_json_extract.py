@@ -0,0 +1,92 @@
+"""
+Benchmark: extracción de objetos JSON con las expresiones regulares
+anteriores frente a JSONScanner, sobre salidas sintéticas de un LLM.
+
+Casos:
+- "jsonl": N objetos planos separados por texto (respuesta GOLD/REAL).
+- "braces": los mismos objetos con llaves dentro de las cadenas; la
+  expresión perezosa los corta y pierde filas.
+- "unclosed": texto con muchas llaves sin cerrar (respuesta truncada),
+  donde `\\{.*?\\}` retrocede de forma cuadrática.
+
+Uso (desde backend/):
+    python benchmarks/bench_json_extract.py
+    python benchmarks/bench_json_extract.py --sizes 1000 100000
+"""
+import argparse
+import json
+import os
+import random
+import re
+import sys
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from utils.json_utils import JSONUtils  # noqa: E402
+
+
+def legacy_format_result_for_jsonl(raw_result: str) -> str:
+    """Réplica de la versión anterior de JSONUtils.format_result_for_jsonl."""
+    matches = re.findall(r'\{.*?\}', raw_result, re.DOTALL)
+    json_content = "\n".join(matches).replace("\n\n", "\n")
+    return re.sub(r'(?<!")\bN/A\b(?!")', '"N/A"', json_content)
+
+
+def llm_output(num_objects: int, braces: bool = False, seed: int = 0) -> str:
+    rnd = random.Random(seed)
+    lines = ["Here are the entries you asked for:", "```json"]
+    for i in range(num_objects):
+        note = f"note {{{i}}}" if braces else f"note {i}"
+        lines.append(json.dumps({
+            "id": i + 1,
+            "city": rnd.choice(["Madrid", "Lima", "Quito", "Bogotá"]),
+            "population": rnd.randint(1_000, 9_000_000),
+            "note": note,
+        }, ensure_ascii=False))
+    lines.append("```")
+    return "\n".join(lines)
+
+
+def unclosed_output(num_objects: int) -> str:
+    return "{ \"a\": 1, " * num_objects
+
+
+def count_valid(jsonl: str) -> int:
+    valid = 0
+    for line in jsonl.splitlines():
+        try:
+            json.loads(line)
+            valid += 1
+        except json.JSONDecodeError:
+            pass
+    return valid
+
+
+def timed(func, text: str):
+    start = time.perf_counter()
+    try:
+        result = count_valid(func(text))
+    except ValueError:
+        result = 0
+    return time.perf_counter() - start, result
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[1_000, 10_000, 100_000])
+    parser.add_argument("--unclosed-sizes", type=int, nargs="+", default=[1_000, 5_000, 20_000])
+    args = parser.parse_args()
+
+    print(f"{'case':>9} {'objects':>9} {'legacy (s)':>11} {'rows':>8} {'scanner (s)':>12} {'rows':>8}")
+    cases = [("jsonl", n, llm_output(n)) for n in args.sizes]
+    cases += [("braces", n, llm_output(n, braces=True)) for n in args.sizes]
+    cases += [("unclosed", n, unclosed_output(n)) for n in args.unclosed_sizes]
+    for case, size, text in cases:
+        legacy, legacy_rows = timed(legacy_format_result_for_jsonl, text)
+        scanner, scanner_rows = timed(JSONUtils.format_result_for_jsonl, text)
+        print(f"{case:>9} {size:>9,} {legacy:>11.3f} {legacy_rows:>8,} {scanner:>12.3f} {scanner_rows:>8,}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,84 @@
+"""
+Benchmark: conversión JSONL→CSV fila a fila (json.loads + DictWriter, como
+antes) frente a JSONUtils.jsonlist_to_csv (lectura en bloque y columnas),
+con json y con orjson, y escritura a Parquet si pyarrow está instalado.
+
+Uso (desde backend/):
+    python benchmarks/bench_jsonl_to_csv.py
+    python benchmarks/bench_jsonl_to_csv.py --sizes 10000 1000000
+"""
+import argparse
+import csv
+import json
+import logging
+import os
+import random
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+import utils.json_utils as json_utils  # noqa: E402
+from utils.json_utils import JSONUtils  # noqa: E402
+
+logger = logging.getLogger("bench")
+
+
+def legacy_jsonlist_to_csv(jsonl_list: list, output_file: str) -> None:
+    """Réplica de la versión anterior (sin los logs por fila)."""
+    json_objects = [json.loads(line.strip()) for line in jsonl_list]
+    with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
+        writer = csv.DictWriter(f, fieldnames=list(json_objects[0].keys()))
+        writer.writeheader()
+        for obj in json_objects:
+            writer.writerow(obj)
+
+
+def jsonl_lines(num_rows: int, seed: int = 0) -> list:
+    rnd = random.Random(seed)
+    cities = ["Madrid", "Lima", "Quito", "Bogotá", "Santiago"]
+    return [
+        json.dumps({
+            "id": i + 1,
+            "city": rnd.choice(cities),
+            "population": rnd.randint(1_000, 9_000_000),
+            "area_km2": round(rnd.uniform(10, 2_000), 2),
+            "capital": rnd.random() < 0.2,
+            "founded": f"{rnd.randint(1500, 1950)}-01-01",
+        }, ensure_ascii=False)
+        for i in range(num_rows)
+    ]
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    args = parser.parse_args()
+
+    orjson_module = json_utils.orjson
+    print(f"{'rows':>10} {'legacy':>9} {'json':>9} {'orjson':>9} {'parquet':>9}   (seconds)")
+    with tempfile.TemporaryDirectory() as tmp:
+        csv_path = os.path.join(tmp, "out.csv")
+        parquet_path = os.path.join(tmp, "out.parquet")
+        for num_rows in args.sizes:
+            lines = jsonl_lines(num_rows)
+            legacy = timed(legacy_jsonlist_to_csv, lines, csv_path)
+
+            json_utils.orjson = None
+            stdlib = timed(JSONUtils.jsonlist_to_csv, lines, csv_path, logger)
+            json_utils.orjson = orjson_module
+            fast = timed(JSONUtils.jsonlist_to_csv, lines, csv_path, logger) if orjson_module else float("nan")
+            parquet = timed(JSONUtils.jsonlist_to_csv, lines, parquet_path, logger) if json_utils.pa else float("nan")
+
+            print(f"{num_rows:>10,} {legacy:>9.3f} {stdlib:>9.3f} {fast:>9.3f} {parquet:>9.3f}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,56 @@
+"""
+Benchmark: generación de nombres con una instancia nueva de Faker por fila
+(como hacía DataGenerationService._faker_name) frente a
+NameUtils.name_column, con un locale, con mezcla de locales y con nombres
+únicos. La versión anterior sólo se mide sobre una muestra y se extrapola.
+
+Uso (desde backend/):
+    python benchmarks/bench_names.py
+    python benchmarks/bench_names.py --sizes 10000 1000000 --legacy-sample 200
+"""
+import argparse
+import os
+import sys
+import time
+
+import numpy as np
+from faker import Faker
+
+sys.path.insert(0, os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir)))
+
+from utils.name_utils import NameUtils  # noqa: E402
+
+MIX = {"en_US": 0.3, "es_ES": 0.4, "de_DE": 0.3}
+
+
+def legacy_names(num_rows: int) -> list:
+    return [Faker().name() for _ in range(num_rows)]
+
+
+def timed(func, *args) -> float:
+    start = time.perf_counter()
+    func(*args)
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--legacy-sample", type=int, default=100)
+    args = parser.parse_args()
+
+    warmup = timed(lambda: [NameUtils.distinct_pools(locale) for locale in MIX])
+    print(f"pool warm-up for {list(MIX)}: {warmup:.3f} s (once per process)")
+    legacy_per_row = timed(legacy_names, args.legacy_sample) / args.legacy_sample
+
+    print(f"{'rows':>10} {'legacy*':>10} {'en_US':>9} {'mix':>9} {'unique mix':>11}   (seconds, *extrapolated)")
+    for num_rows in args.sizes:
+        rng = np.random.default_rng(0)
+        single = timed(NameUtils.name_column, rng, num_rows)
+        mixed = timed(NameUtils.name_column, rng, num_rows, MIX)
+        unique = timed(NameUtils.name_column, rng, num_rows, MIX, True)
+        print(f"{num_rows:>10,} {legacy_per_row * num_rows:>10.1f} {single:>9.3f} {mixed:>9.3f} {unique:>11.3f}")
+
+
+if __name__ == "__main__":
+    main()
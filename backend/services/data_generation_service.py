@@ -1,16 +1,91 @@
 import logging
 import json
-import random
+import csv
+import itertools
+import math
+import time
+import threading
+import numpy as np
 import pandas as pd
 import os
-from faker import Faker
+import shutil
+import zipfile
+from collections import Counter, deque
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor, as_completed
 from utils.data_utils import DataUtils 
+from utils.column_utils import ColumnUtils
+from utils.name_utils import NameUtils
+from utils.country_utils import CountryUtils
+from utils.id_utils import IdUtils
+from utils.training_utils import TrainingUtils
+from utils.csv_utils import CSVUtils
 from utils.validation_utils import ValidationUtils
 from utils.json_utils import JSONUtils
+from utils.output_utils import OutputUtils
 
 from sdv.metadata import Metadata
-from sdv.single_table import CTGANSynthesizer
-from sdv.single_table import GaussianCopulaSynthesizer
+from sdv.sampling import Condition
+from services.synthesizers import TimeBoundedCTGANSynthesizer, SeededGaussianCopulaSynthesizer
+from services.openai_service import OpenAIServiceError
+
+
+class _LLMRowWriter:
+    """
+    Writes GOLD/REAL rows to a CSV as they are parsed, from any thread.
+    The first object pins the columns and later objects with other fields
+    are rejected. With `merge`, rows repeating another one (ignoring 'id')
+    are dropped and 'id' fields are renumbered. Rows beyond `rows` are
+    ignored and the file is only created once there is a row to write.
+    """
+
+    def __init__(self, output_file: str, rows: int, logger: logging.Logger, merge: bool = False):
+        self.output_file = output_file
+        self.rows = rows
+        self.logger = logger
+        self.merge = merge
+        self.schema = None
+        self.count = 0
+        self.rejected = 0
+        self._id_fields = []
+        self._seen = set()
+        self._file = None
+        self._writer = None
+        self._lock = threading.Lock()
+
+    def add(self, obj: dict) -> None:
+        with self._lock:
+            if self.count >= self.rows:
+                return
+            if self.schema is None:
+                self.schema = list(obj.keys())
+                self._id_fields = [field for field in self.schema if field.lower() == 'id']
+                self._file = open(self.output_file, 'w', newline='', encoding='utf-8-sig')
+                self._writer = csv.writer(self._file)
+                self._writer.writerow(self.schema)
+            elif obj.keys() != set(self.schema):
+                self.rejected += 1
+                return
+
+            if self.merge:
+                signature = json.dumps(
+                    [obj[field] for field in self.schema if field not in self._id_fields],
+                    sort_keys=True, default=str
+                )
+                if signature in self._seen:
+                    self.rejected += 1
+                    return
+                self._seen.add(signature)
+                for field in self._id_fields:
+                    obj[field] = self.count + 1
+
+            self._writer.writerow([obj[field] for field in self.schema])
+            self.count += 1
+
+    def close(self) -> None:
+        with self._lock:
+            if self._file is not None:
+                self._file.close()
+                self._file = None
 
 
 class DataGenerationService:
@@ -19,10 +94,31 @@ class DataGenerationService:
     either a configuration dictionary or direct JSONL responses from OpenAI.
     """
 
-    def __init__(self, translator_service, openai_service, logger: logging.Logger):
+    DEFAULT_CHUNK_SIZE = 100_000
+    # Rows per random stream: every (column, block) pair gets its own
+    # generator, so output does not depend on chunk size or worker count
+    SEED_BLOCK_ROWS = 10_000
+    # Tamaño del reservorio respecto a max_rows cuando se estratifica
+    STRATIFY_OVERSAMPLE = 5
+    # GOLD/REAL: filas por prompt, filas totales y llamadas simultáneas
+    LLM_MIN_ROWS = 1
+    LLM_BATCH_ROWS = 100
+    LLM_MAX_ROWS = 5000
+    LLM_MAX_CONCURRENCY = 8
+    # Semantics stored in string columns by classify_config
+    SEMANTICS = ('name', 'id', 'country', 'text')
+    CLASSIFY_THRESHOLD = 0.5
+    SDV_SYNTHESIZERS = {
+        'ctgan': TimeBoundedCTGANSynthesizer,
+        'gaussian': SeededGaussianCopulaSynthesizer,
+    }
+
+    def __init__(self, translator_service, openai_service, logger: logging.Logger, model_cache=None):
         self.translator_service = translator_service
         self.openai_service = openai_service
         self.logger = logger
+        # Optional ModelCacheService with fitted SDV synthesizers
+        self.model_cache = model_cache
 
     def generate_data_from_config(
         self, 
@@ -30,85 +126,620 @@ class DataGenerationService:
         vary_names: bool, 
         vary_countries: bool, 
         num_rows: int, 
-        output_file: str
+        output_file: str,
+        seed: int = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback=None,
+        workers: int = 1,
+        output_format: str = OutputUtils.DEFAULT_FORMAT
     ) -> None:
         """
         Generate a CSV file based on a configuration dictionary.
+        Columns are drawn as whole NumPy arrays. Every column gets an
+        independent random stream per block of SEED_BLOCK_ROWS rows, derived
+        from `seed` (see _column_rng), so the same (config, seed, rows) gives
+        a byte-identical file whatever the chunking. Rows are generated and
+        appended to the file in chunks of about `chunk_size` (whole blocks),
+        so memory stays bounded whatever `num_rows` is.
+        With `workers` > 1 the chunks are generated and formatted by a process
+        pool (see _iter_chunks); the file is the same either way.
+        `output_format` is one of OutputUtils.FORMATS: CSV (optionally gzip or
+        zstd compressed), or Parquet / Arrow IPC written one row group per
+        chunk with the column types of the config (see _plan_schema).
+        `progress_callback`, if given, is called with the fraction of rows done.
+        A multi-table config ({'tables': {...}}) produces a zip archive with
+        one file per table instead (see generate_tables_from_config).
+        """
+        output_format = OutputUtils.normalize_format(output_format)
+        if 'tables' in config:
+            self._generate_tables_zip(
+                config, vary_names, vary_countries, num_rows, output_file, seed, chunk_size, progress_callback,
+                output_format
+            )
+            return
+
+        plan, seed_sequence, chunk_size, workers = self._prepare_generation(
+            config, vary_names, vary_countries, num_rows, seed, chunk_size, workers
+        )
+        if OutputUtils.is_columnar(output_format):
+            schema = self._plan_schema(plan)
+            tables = self._iter_chunks(plan, seed_sequence, num_rows, chunk_size, workers, progress_callback, schema)
+            OutputUtils.write_tables(tables, output_file, output_format, schema)
+        else:
+            chunks = self._iter_csv_chunks(plan, seed_sequence, num_rows, chunk_size, workers, progress_callback)
+            OutputUtils.write_csv(chunks, output_file, output_format)
+
+        self.logger.info(f"Data generation complete. Output file: {output_file}")
+
+    def generate_tables_from_config(
+        self,
+        config: dict,
+        vary_names: bool,
+        vary_countries: bool,
+        num_rows: int,
+        output_dir: str,
+        seed: int = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        max_workers: int = None,
+        progress_callback=None,
+        output_format: str = OutputUtils.DEFAULT_FORMAT
+    ) -> dict:
+        """
+        Generate every table of a multi-table config as <table>.csv (or the
+        extension of `output_format`) in `output_dir` (see
+        ValidationUtils.validate_tables_config for the format).
+        Tables without 'rows' get `num_rows`; a table whose foreign key has
+        'per_parent' (and no 'rows') gets as many rows as that distribution
+        draws for the parent's rows. Int primary keys are numbered 1, 2, 3...
+        and stay numeric, as do the foreign keys that point at them. Row counts are resolved in dependency order; after
+        that only the parents' key spaces are needed (foreign keys are
+        recomputed from parent row numbers), so all tables are streamed in
+        parallel and referential integrity holds at any size.
+        Returns {table: (path, rows)}.
+        """
+        if not ValidationUtils.validate_tables_config(config):
+            raise ValueError("The provided multi-table config is invalid.")
+
+        tables = config['tables']
+        order = self._table_order(tables)
+        table_seeds = dict(zip(tables, self._seed_sequence(seed).spawn(len(tables))))
+
+        prepared, rows, data_seeds = {}, {}, {}
+        for table in order:
+            cardinality_seed, data_seeds[table] = table_seeds[table].spawn(2)
+            prepared[table], rows[table] = self._prepare_table(
+                table, tables, prepared, rows, num_rows, np.random.default_rng(cardinality_seed)
+            )
+            self.logger.info(f"Table '{table}': {rows[table]} rows.")
+
+        os.makedirs(output_dir, exist_ok=True)
+        extension = OutputUtils.extension(output_format)
+        paths = {table: os.path.join(output_dir, f"{table}{extension}") for table in order}
+        workers = max_workers or min(len(order), os.cpu_count() or 1)
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            futures = [
+                executor.submit(
+                    self.generate_data_from_config, prepared[table], vary_names, vary_countries,
+                    rows[table], paths[table], data_seeds[table], chunk_size, output_format=output_format
+                )
+                for table in order
+            ]
+            for done, future in enumerate(futures, start=1):
+                future.result()
+                self._report_progress(progress_callback, done / len(futures))
+
+        return {table: (paths[table], rows[table]) for table in order}
+
+    def _generate_tables_zip(self, config: dict, vary_names, vary_countries, num_rows, output_file, seed,
+                             chunk_size, progress_callback=None, output_format=OutputUtils.DEFAULT_FORMAT):
+        tables_dir = f"{output_file}.tables"
+        try:
+            outputs = self.generate_tables_from_config(
+                config, vary_names, vary_countries, num_rows, tables_dir, seed, chunk_size,
+                progress_callback=progress_callback, output_format=output_format
+            )
+            with zipfile.ZipFile(output_file, 'w', compression=zipfile.ZIP_DEFLATED) as archive:
+                for table, (path, _) in outputs.items():
+                    archive.write(path, arcname=os.path.basename(path))
+        finally:
+            shutil.rmtree(tables_dir, ignore_errors=True)
+        self.logger.info(f"Multi-table generation complete. Output file: {output_file}")
+
+    @staticmethod
+    def _table_order(tables: dict) -> list:
+        """
+        Tables sorted so that every parent comes before its children.
+        """
+        parents = {
+            table: {
+                props['references']['table']
+                for props in spec['columns'].values()
+                if 'table' in props.get('references', {})
+            }
+            for table, spec in tables.items()
+        }
+        order = []
+        ready = [table for table in tables if not parents[table]]
+        while ready:
+            table = ready.pop(0)
+            order.append(table)
+            for child in tables:
+                if child not in order and child not in ready and parents[child] <= set(order):
+                    ready.append(child)
+        if len(order) != len(tables):
+            cycle = sorted(set(tables) - set(order))
+            raise ValueError(f"Foreign keys between tables form a cycle: {cycle}")
+        return order
+
+    def _prepare_table(self, table: str, tables: dict, prepared: dict, rows: dict, num_rows: int,
+                       rng: np.random.Generator) -> tuple:
+        """
+        Single-table config for `table` (with its primary key as an ID column
+        and its foreign keys resolved to the parents' ID specs) and its rows.
+        """
+        spec = tables[table]
+        columns = {name: dict(props) for name, props in spec['columns'].items()}
+        table_rows = spec.get('rows', num_rows)
+
+        primary_key = spec.get('primary_key')
+        if primary_key:
+            columns[primary_key].setdefault('id_format', 'sequence')
+            columns[primary_key].setdefault('key', IdUtils.key(table, primary_key))
+
+        for properties in columns.values():
+            references = properties.get('references', {})
+            if 'table' not in references:
+                continue
+            parent = references['table']
+            parent_key = tables[parent]['primary_key']
+            parent_properties = prepared[parent]['columns'][parent_key]
+            resolved = dict(references, column=parent_key, rows=rows[parent])
+            resolved.update(IdUtils.column_spec(parent_key, parent_properties))
+            if self._is_int_sequence(parent_properties):
+                resolved['numeric'] = True
+
+            if 'per_parent' in references:
+                counts = self._draw_cardinality(rng, references['per_parent'], rows[parent])
+                resolved['offsets'] = np.cumsum(counts)
+                table_rows = int(resolved['offsets'][-1]) if rows[parent] else 0
+            properties['references'] = resolved
+
+        return {'columns': columns}, table_rows
+
+    @staticmethod
+    def _is_int_sequence(properties: dict) -> bool:
+        """
+        Int columns with sequential IDs keep their numeric type (1, 2, 3...).
+        """
+        return properties.get('type') == 'int' and properties.get('id_format', 'sequence') == 'sequence'
+
+    @staticmethod
+    def _draw_cardinality(rng: np.random.Generator, per_parent: dict, parent_rows: int) -> np.ndarray:
+        """
+        Number of child rows for each parent row.
+        """
+        distribution = per_parent.get('distribution', 'fixed')
+        if distribution == 'fixed':
+            return np.full(parent_rows, int(per_parent['count']), dtype=np.int64)
+        if distribution == 'uniform':
+            return rng.integers(int(per_parent['min']), int(per_parent['max']), size=parent_rows, endpoint=True)
+        return rng.poisson(float(per_parent['mean']), size=parent_rows)
+
+    def iter_csv_from_config(
+        self,
+        config: dict,
+        vary_names: bool,
+        vary_countries: bool,
+        num_rows: int,
+        seed: int = None,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback=None,
+        workers: int = 1
+    ):
+        """
+        Same as generate_data_from_config, but returns an iterator of CSV text
+        chunks (BOM and header first) instead of writing a file.
+        The config is validated and planned eagerly, so errors surface before
+        the first chunk is consumed.
+        """
+        plan, seed_sequence, chunk_size, workers = self._prepare_generation(
+            config, vary_names, vary_countries, num_rows, seed, chunk_size, workers
+        )
+        return self._iter_csv_chunks(plan, seed_sequence, num_rows, chunk_size, workers, progress_callback)
+
+    def _prepare_generation(
+        self,
+        config: dict,
+        vary_names: bool,
+        vary_countries: bool,
+        num_rows: int,
+        seed,
+        chunk_size: int,
+        workers: int
+    ) -> tuple:
+        """
+        Validate and plan a single-table config.
+        Returns (plan, seed_sequence, chunk_size, workers).
         """
         if not ValidationUtils.validate_config_dict(config):
             raise ValueError("The provided config dictionary is invalid.")
+        if chunk_size is None or chunk_size < 1:
+            chunk_size = max(num_rows, 1)
+        # Chunks are made of whole seed blocks
+        block = self.SEED_BLOCK_ROWS
+        chunk_size = max(1, round(chunk_size / block)) * block
 
-        data = {}
+        seed_sequence = self._seed_sequence(seed)
+        plan = self._plan_columns(config, vary_names, vary_countries, num_rows)
+        if workers is None or workers < 1:
+            workers = os.cpu_count() or 1
+        workers = min(workers, math.ceil(num_rows / chunk_size))
+        if workers > 1 and any(kind == 'name' and properties.get('unique') for _, kind, properties in plan):
+            # La unicidad entre bloques depende del orden: no se reparte
+            self.logger.info("Unique name columns are generated sequentially; ignoring workers.")
+            workers = 1
+        return plan, seed_sequence, chunk_size, max(workers, 1)
+
+    def _seed_sequence(self, seed) -> np.random.SeedSequence:
+        """
+        SeedSequence for `seed` (an int, an existing SeedSequence or None).
+        Without a seed fresh entropy is used and logged, so the run can
+        still be reproduced.
+        """
+        if isinstance(seed, np.random.SeedSequence):
+            return seed
+        seed_sequence = np.random.SeedSequence(seed)
+        if seed is None:
+            self.logger.info(f"No seed given; using seed {seed_sequence.entropy}.")
+        return seed_sequence
+
+    def _sampling_seed(self, seed) -> int:
+        """
+        Seed for an SDV synthesizer. Without one, fresh entropy is drawn and
+        logged: SDV's own default is a fixed seed, so every unseeded call
+        would give the same rows.
+        """
+        if seed is not None:
+            return seed
+        seed = int(np.random.SeedSequence().generate_state(1)[0])
+        self.logger.info(f"No seed given; sampling with seed {seed}.")
+        return seed
+
+    def _column_rng(self, seed_sequence: np.random.SeedSequence, column_name: str, block: int) -> np.random.Generator:
+        """
+        Independent generator for one column and one block of rows.
+        Keyed by the column name, so adding a column leaves the others unchanged.
+        """
+        return np.random.default_rng(np.random.SeedSequence(
+            seed_sequence.entropy,
+            spawn_key=tuple(seed_sequence.spawn_key) + (IdUtils.key(column_name), block)
+        ))
+
+    def _iter_csv_chunks(
+        self,
+        plan: list,
+        seed_sequence: np.random.SeedSequence,
+        num_rows: int,
+        chunk_size: int,
+        workers: int = 1,
+        progress_callback=None
+    ):
+        yield self._csv_header(plan)
+        yield from self._iter_chunks(plan, seed_sequence, num_rows, chunk_size, workers, progress_callback)
+
+    def _iter_chunks(
+        self,
+        plan: list,
+        seed_sequence: np.random.SeedSequence,
+        num_rows: int,
+        chunk_size: int,
+        workers: int = 1,
+        progress_callback=None,
+        schema=None
+    ):
+        """
+        Generate the rows chunk by chunk, as CSV text or, with an Arrow
+        `schema`, as pyarrow Tables (see _encode_chunk).
+
+        With `workers` > 1 the chunks are sharded across a process pool. The
+        plan, seed and schema are sent once per worker; each task is just a
+        row range and comes back encoded (Tables travel as Arrow buffers),
+        so the formatting, as costly as drawing the columns, is sharded too.
+        Every (column, block) has its own stream, so the output is identical
+        to the sequential one. At most two chunks per worker are in flight
+        and they are yielded in row order, so memory stays bounded.
+        """
+        ranges = [(offset, min(chunk_size, num_rows - offset)) for offset in range(0, num_rows, chunk_size)]
+
+        if workers <= 1:
+            seen_names = {
+                name: set() for name, kind, properties in plan if kind == 'name' and properties.get('unique')
+            }
+            for offset, size in ranges:
+                df = self._generate_chunk(plan, seed_sequence, offset, size, seen_names)
+                yield _encode_chunk(df, schema)
+                self.logger.debug(f"Generated rows {offset}-{offset + size}")
+                self._report_progress(progress_callback, (offset + size) / num_rows)
+            return
+
+        ranges = iter(ranges)
+        with ProcessPoolExecutor(
+            max_workers=workers, initializer=_init_chunk_worker, initargs=(plan, seed_sequence, schema)
+        ) as executor:
+            pending = deque()
+
+            def submit_next():
+                for offset, size in ranges:
+                    pending.append((offset, size, executor.submit(_generate_encoded_chunk, offset, size)))
+                    return
+
+            for _ in range(2 * workers):
+                submit_next()
+            while pending:
+                offset, size, future = pending.popleft()
+                chunk = future.result()
+                submit_next()
+                yield chunk
+                self.logger.debug(f"Generated rows {offset}-{offset + size}")
+                self._report_progress(progress_callback, (offset + size) / num_rows)
+
+    @staticmethod
+    def _csv_header(plan: list) -> str:
+        return '\ufeff' + pd.DataFrame(columns=[name for name, _, _ in plan]).to_csv(index=False)
+
+    @staticmethod
+    def _plan_schema(plan: list):
+        """
+        Arrow schema with the config type of every planned column.
+        """
+        column_types = {}
+        for column_name, kind, properties in plan:
+            if kind in ('int', 'float', 'boolean', 'date'):
+                column_types[column_name] = kind
+            elif kind == 'int_id' or (kind == 'foreign_key' and properties['references'].get('numeric')):
+                column_types[column_name] = 'int'
+            else:
+                column_types[column_name] = 'string'
+        return OutputUtils.config_schema(column_types)
+
+    @staticmethod
+    def _report_progress(progress_callback, fraction: float):
+        if progress_callback is not None:
+            progress_callback(fraction)
+
+    def classify_config(self, config: dict, detect_countries: bool = True) -> dict:
+        """
+        Copy of the config with the semantic of every string column stored
+        in it (`columns[...]['semantic']`, see classify_column), so a cached
+        or reused config does not need to be classified again (see
+        create_merlin_config). Columns that already have one are left alone.
+        """
+        config = dict(config)
+        config['columns'] = {name: dict(properties) for name, properties in config.get('columns', {}).items()}
+        for column_name, properties in config['columns'].items():
+            if 'references' in properties or 'id_format' in properties:
+                continue
+            if properties.get('type') == 'string' and properties.get('semantic') not in self.SEMANTICS:
+                semantic = self.classify_column(column_name, properties['values'], detect_countries)
+                if semantic is not None:
+                    properties['semantic'] = semantic
+        return config
+
+    def classify_column(self, column_name: str, values: list, detect_countries: bool = True):
+        """
+        Semantic of a string column: 'name' or 'country' when at least half
+        of the values are, 'id' for ID-like column names, 'text' otherwise.
+        Cheap detectors run first (names, then the column name) and each one
+        stops as soon as the threshold is reached or out of reach, checking
+        every distinct value once. Returns None when only country detection
+        could tell and `detect_countries` is off.
+        """
+        counts = Counter(values)
+        needed = math.ceil(self.CLASSIFY_THRESHOLD * len(values))
+
+        if self._count_until(counts, DataUtils.is_name, needed)[0]:
+            return 'name'
+        if DataUtils.is_id(column_name):
+            return 'id'
+        if not detect_countries:
+            return None
+        return 'country' if self._detect_countries(counts, needed) else 'text'
+
+    @staticmethod
+    def _count_until(counts: Counter, detector, needed: int, stop_when_unreachable: bool = True):
+        """
+        Walk the distinct values until the matching rows reach `needed` (or,
+        optionally, can no longer reach it).
+        Returns (reached, matched rows, distinct values that did not match).
+        """
+        matched = 0
+        remaining = sum(counts.values())
+        unmatched = []
+        for value, count in counts.items():
+            if detector(value):
+                matched += count
+                if matched >= needed:
+                    return True, matched, unmatched
+            else:
+                unmatched.append(value)
+            remaining -= count
+            if stop_when_unreachable and matched + remaining < needed:
+                break
+        return False, matched, unmatched
+
+    def _detect_countries(self, counts: Counter, needed: int) -> bool:
+        """
+        The offline index decides clear cases. The translator is only asked
+        (in one batch) about the unmatched values of a column where some,
+        but not enough, values matched offline.
+        """
+        translator = self.translator_service
+        reached, matched, unmatched = self._count_until(
+            counts, DataUtils.is_country, needed, stop_when_unreachable=translator is None
+        )
+        if reached or matched == 0 or translator is None:
+            return reached
+
+        translations = dict(zip(unmatched, translator.translate_batch([str(v) for v in unmatched])))
+        translated = Counter({v: counts[v] for v in unmatched})
+        return self._count_until(
+            translated, lambda v: bool(translations[v]) and DataUtils.is_country(translations[v]), needed - matched
+        )[0]
+
+    def _plan_columns(self, config: dict, vary_names: bool, vary_countries: bool, num_rows: int) -> list:
+        """
+        Decide once per config how each column will be generated.
+        String columns are classified first (see classify_config).
+        Returns a list of (column_name, kind, properties) tuples.
+        """
+        plan = []
+        config = self.classify_config(config, detect_countries=vary_countries)
         columns = config.get('columns', {})
 
         for column_name, properties in columns.items():
             col_type = properties.get('type')
 
-            if col_type == 'string':
-                values = properties['values']
-                # Basic checks to see if they're mostly names or mostly countries
-                name_count = sum(1 for v in values if DataUtils.is_name(v))
-                country_count = sum(1 for v in values if DataUtils.is_country(v, self.translator_service.translate_text))
-                threshold = 0.5
-                total_values = len(values)
-
-                if vary_names and (name_count / total_values) >= threshold:
-                    # Generate random names
-                    data[column_name] = [self._faker_name() for _ in range(num_rows)]
-                elif vary_countries and (country_count / total_values) >= threshold:
-                    # Generate random countries
-                    data[column_name] = [DataUtils.generate_country() for _ in range(num_rows)]
-                elif DataUtils.is_id(column_name):
-                    # Generate IDs
-                    data[column_name] = DataUtils.generate_ids(values[0], num_rows)
+            if 'references' in properties:
+                kind = 'foreign_key'
+
+            elif 'id_format' in properties:
+                kind = 'int_id' if self._is_int_sequence(properties) else 'id'
+
+            elif col_type == 'string':
+                semantic = properties.get('semantic')
+                if vary_names and semantic == 'name':
+                    kind = 'name'
+                elif vary_countries and semantic == 'country':
+                    kind = 'country'
+                elif semantic == 'id' or DataUtils.is_id(column_name):
+                    kind = 'id'
                 else:
-                    # Pick random from existing values
-                    data[column_name] = [random.choice(values) for _ in range(num_rows)]
+                    kind = 'choice'
 
             elif col_type == 'int':
-                if DataUtils.is_id(column_name):
-                    data[column_name] = DataUtils.generate_ids("0", num_rows)
-                else:
-                    # Generate random integers
-                    min_val = properties['min']
-                    max_val = properties['max']
-                    data[column_name] = [random.randint(min_val, max_val) for _ in range(num_rows)]
-
-            elif col_type == 'float':
-                min_val = properties['min']
-                max_val = properties['max']
-                data[column_name] = [
-                    round(random.uniform(min_val, max_val), 2) 
-                    for _ in range(num_rows)
-                ]
-
-            elif col_type == 'boolean':
-                data[column_name] = [random.choice([True, False]) for _ in range(num_rows)]
-
-            elif col_type == 'date':
-                start_str = properties['start']
-                end_str = properties['end']
-                data[column_name] = [
-                    DataUtils.generate_random_date(start_str, end_str) 
-                    for _ in range(num_rows)
-                ]
+                kind = 'int_id' if DataUtils.is_id(column_name) else 'int'
+
+            elif col_type in ('float', 'boolean', 'date'):
+                kind = col_type
             else:
                 self.logger.error(f"Unknown type '{col_type}' for column '{column_name}'")
                 continue
 
-        df = pd.DataFrame(data)
-        df.to_csv(output_file, index=False, encoding='utf-8-sig')
-        self.logger.info(f"Data generation complete. Output file: {output_file}")
+            if kind == 'country':
+                # Weights are resolved once here, so bad ones fail before any row is written
+                properties = dict(properties, probabilities=CountryUtils.probabilities(properties.get('weights')))
+
+            plan.append((column_name, kind, properties))
 
-    def _faker_name(self):
+        return self._resolve_references(plan, num_rows)
+
+    @staticmethod
+    def _resolve_references(plan: list, num_rows: int) -> list:
         """
-        Wrapper for generating a single fake name. 
-        (Alternatively, you could just inline Faker().name(), but 
-         it's useful to have a dedicated method in case you'd like to mock it in tests.)
+        Foreign keys that point at another column of the same config
+        ({'references': {'column': ..., 'rows': n}}) take that column's ID
+        spec, so their values are IDs of its first `rows` rows (numbers if
+        it is an 'int_id' column). `rows` is capped at `num_rows`, so they
+        never point at IDs that are not generated.
         """
-        
-        fake = Faker()
-        return fake.name()
+        planned = {column_name: (kind, properties) for column_name, kind, properties in plan}
+        resolved = []
+        for column_name, kind, properties in plan:
+            references = properties.get('references', {}) if kind == 'foreign_key' else {}
+            if 'column' in references and 'table' not in references:
+                parent = references['column']
+                parent_kind, parent_properties = planned.get(parent, (None, None))
+                if parent_kind == 'id':
+                    spec = IdUtils.column_spec(parent, parent_properties)
+                elif parent_kind == 'int_id':
+                    spec = {'id_format': 'sequence', 'template': '1', 'numeric': True}
+                else:
+                    raise ValueError(f"Column '{column_name}' references '{parent}', which is not an ID column.")
+                rows = min(references['rows'], max(num_rows, 1))
+                properties = dict(properties, references=dict(references, rows=rows, **spec))
+            resolved.append((column_name, kind, properties))
+        return resolved
+
+    def _generate_chunk(
+        self,
+        plan: list,
+        seed_sequence: np.random.SeedSequence,
+        offset: int,
+        num_rows: int,
+        seen_names: dict = None
+    ) -> pd.DataFrame:
+        """
+        Generate rows [offset, offset + num_rows) for a column plan, one seed
+        block at a time (`offset` must start a block). `seen_names`
+        (column -> set) keeps `unique` name columns unique across chunks.
+        """
+        block = self.SEED_BLOCK_ROWS
+        end = offset + num_rows
+        frames = [
+            self._generate_block(plan, seed_sequence, start, min(block, end - start), seen_names or {})
+            for start in range(offset, end, block)
+        ]
+        if len(frames) == 1:
+            return frames[0]
+        return pd.concat(frames, ignore_index=True)
+
+    def _generate_block(
+        self,
+        plan: list,
+        seed_sequence: np.random.SeedSequence,
+        offset: int,
+        num_rows: int,
+        seen_names: dict
+    ) -> pd.DataFrame:
+        """
+        Generate one seed block. `offset` keeps ID sequences continuous.
+        """
+        data = {}
+
+        for column_name, kind, properties in plan:
+            rng = self._column_rng(seed_sequence, column_name, offset // self.SEED_BLOCK_ROWS)
+            if kind == 'name':
+                # Generate random names from the seeded per-locale pools
+                data[column_name] = NameUtils.name_column(
+                    rng, num_rows, properties.get('locales'), properties.get('unique', False),
+                    seen_names.get(column_name)
+                )
+            elif kind == 'country':
+                # Generate random countries (optionally weighted)
+                data[column_name] = CountryUtils.country_column(rng, num_rows, p=properties['probabilities'])
+            elif kind == 'id':
+                # Generate IDs (a pure function of the row number, so unique across chunks)
+                data[column_name] = IdUtils.ids(IdUtils.column_spec(column_name, properties), num_rows, offset)
+            elif kind == 'foreign_key':
+                # IDs of random rows of the referenced table, recomputed from the row number
+                references = properties['references']
+                spec = IdUtils.column_spec(references.get('column', column_name), references)
+                if 'offsets' in references:
+                    # Children per parent were drawn up front: rows are grouped by parent
+                    rows = np.arange(offset, offset + num_rows)
+                    parents = np.searchsorted(references['offsets'], rows, side='right')
+                else:
+                    parents = IdUtils.foreign_key_rows(rng, references['rows'], num_rows)
+                if references.get('numeric'):
+                    data[column_name] = parents.astype(np.int64) + 1
+                else:
+                    data[column_name] = IdUtils.ids_at(spec, parents)
+            elif kind == 'choice':
+                # Pick random from existing values
+                data[column_name] = ColumnUtils.choice_column(rng, properties['values'], num_rows)
+            elif kind == 'int_id':
+                data[column_name] = np.arange(offset + 1, offset + num_rows + 1)
+            elif kind == 'int':
+                # Generate random integers
+                data[column_name] = ColumnUtils.int_column(rng, properties['min'], properties['max'], num_rows)
+            elif kind == 'float':
+                data[column_name] = ColumnUtils.float_column(rng, properties['min'], properties['max'], num_rows)
+            elif kind == 'boolean':
+                data[column_name] = ColumnUtils.boolean_column(rng, num_rows)
+            elif kind == 'date':
+                data[column_name] = ColumnUtils.date_column(rng, properties['start'], properties['end'], num_rows)
+
+        return pd.DataFrame(data)
 
     def generate_data_merlin(
         self, 
@@ -117,133 +748,158 @@ class DataGenerationService:
         rows: int = 1000, 
         vary_names: bool = True, 
         vary_countries: bool = True, 
-        output_file: str = "generations/synthetic_data_merlin.csv"
+        output_file: str = "generations/synthetic_data_merlin.csv",
+        progress_callback=None,
+        use_cache: bool = True,
+        seed: int = None,
+        workers: int = 1,
+        output_format: str = OutputUtils.DEFAULT_FORMAT
     ):
         """
         Generates data using a "Merlin" approach: obtains a JSON config from OpenAI, 
         then uses that config to create a CSV.
+        `seed` is sent to OpenAI (best effort) and seeds the rows.
+        `workers` processes generate the rows and `output_format` picks the
+        file format (see generate_data_from_config).
         """
         self.logger.info(f"Starting MERLIN generation for theme '{theme}' with {rows} rows.")
+        config_dict = self.create_merlin_config(theme, json_generation_service, use_cache, seed)
+        if config_dict is None:
+            return
+
+        self.generate_data_from_config(
+            config=config_dict,
+            vary_names=vary_names,
+            vary_countries=vary_countries,
+            num_rows=rows,
+            output_file=output_file,
+            seed=seed,
+            progress_callback=progress_callback,
+            workers=workers,
+            output_format=output_format
+        )
+
+    def create_merlin_config(self, theme: str, json_generation_service, use_cache: bool = True, seed: int = None):
+        """
+        Ask OpenAI for a Merlin config dictionary for the given theme.
+        The config comes back classified (see classify_config) and, when the
+        answer is cached, the classified config replaces it in the cache, so
+        requests that reuse it skip the classification.
+        Returns None if no valid config could be obtained.
+        """
         tries = 2
         config_dict = None
+        json_example = {
+            "columns": {
+                "name": { "type": "string", "values": ["Alice", "Bob", "Charlie"] },
+                "age": { "type": "int", "min": 18, "max": 65 },
+                "salary": { "type": "float", "min": 30000, "max": 120000 },
+                "is_manager": { "type": "boolean" },
+                "hire_date": { "type": "date", "start": "2010-01-01", "end": "2023-12-31" }
+            }
+        }
 
         while tries > 0:
+            params = self._llm_params(seed, tries)
             try:
                 config_dict = json_generation_service.create_response_final(
-                    theme, 
-                    json_example={
-                        "columns": {
-                            "name": { "type": "string", "values": ["Alice", "Bob", "Charlie"] },
-                            "age": { "type": "int", "min": 18, "max": 65 },
-                            "salary": { "type": "float", "min": 30000, "max": 120000 },
-                            "is_manager": { "type": "boolean" },
-                            "hire_date": { "type": "date", "start": "2010-01-01", "end": "2023-12-31" }
-                        }
-                    }
+                    theme,
+                    use_cache=use_cache,
+                    **params,
+                    json_example=json_example
                 )
                 if ValidationUtils.validate_config_dict(config_dict):
                     break
+            except OpenAIServiceError:
+                # Already retried by the OpenAI service
+                raise
             except Exception as e:
                 self.logger.error(f"Error creating config: {e}")
             tries -= 1
 
         if not config_dict or not ValidationUtils.validate_config_dict(config_dict):
             self.logger.error("Could not generate a valid configuration after multiple attempts.")
-            return
+            return None
 
-        self.generate_data_from_config(
-            config=config_dict,
-            vary_names=vary_names,
-            vary_countries=vary_countries,
-            num_rows=rows,
-            output_file=output_file
-        )
+        classified = self.classify_config(config_dict)
+        if use_cache and classified != config_dict:
+            json_generation_service.store_config(theme, json_example, classified, **params)
+        return classified
 
     def generate_data_gold(
         self, 
         theme: str, 
         rows: int = 50, 
-        output_file: str = "generations/synthetic_data_gold.csv"
+        output_file: str = "generations/synthetic_data_gold.csv",
+        batch_size: int = LLM_BATCH_ROWS,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        use_cache: bool = False,
+        seed: int = None,
+        output_format: str = OutputUtils.DEFAULT_FORMAT,
+        progress_callback=None
     ):
         """
         Generate a CSV file with "high-quality" synthetic data based on a theme 
         by directly requesting JSONL from OpenAI and then converting it to CSV.
+        Requests above `batch_size` rows are split into concurrent prompts
+        (see _generate_data_llm); `progress_callback`, if given, is called
+        with the fraction of rows written after every batch.
         """
         self.logger.info(f"Starting GOLD generation for theme '{theme}' with {rows} rows.")
-        # Constants
-        MAX_ROWS = 100
-        MIN_ROWS = 1
-
-        # Basic validation
-        if rows < MIN_ROWS:
-            error_message = "Number of rows cannot be < 1."
-            self.logger.error(error_message)
-            return
-        if rows > MAX_ROWS:
-            error_message = "Row limit exceeded (max 200 for GOLD)."
-            self.logger.error(error_message)
-            return
-
-        # Build prompt
-        prompt = (
-            f"Generate {rows} valid, newline-separated JSONL entries about: {theme}. "
-            f"All data must be synthetic, even if before was said otherwise, make sure if there are any names that you anonimize them for data compliance, make up a name."
-            f"Ensure each entry has the exact same fields."
-            f"including a unique 'id' field for each line. Each JSON entry should be on its own line."
-            f"Containing only simple key-value pairs. Do not include any nested dictionaries or arrays that contain objects."
+        self._generate_data_llm(
+            "GOLD", self._gold_prompt, theme, rows, output_file, batch_size, max_concurrency, use_cache, seed,
+            output_format, progress_callback
         )
-        result = self.openai_service.chat_openai(prompt)
-        # Extract multiple JSON objects from the raw text
-        try:
-            result = JSONUtils.format_result_for_jsonl(result)
-            self.logger.info("\nThis is the corrected JSON content:\n" + result)
-        except Exception as e:
-            error_message = f"Error processing the OpenAI response: {e}"
-            self.logger.error(error_message)
-            return
 
-        # Split into lines
-        jsonl_entries = result.strip().split("\n")
-        self.logger.info(f"Received {len(jsonl_entries)} JSONL entries from the model.")
-
-        # Convert to CSV
-        JSONUtils.jsonlist_to_csv(jsonl_entries, output_file, self.logger)
-
-        # (Optional) You could add a row-count check here
-        try:
-            df = pd.read_csv(output_file)
-            if len(df) < rows * 0.75:
-                self.logger.error("CSV does not meet the minimum row requirement (75%).")
-        except Exception as e:
-            self.logger.error(f"Error reading generated CSV: {e}")
-    
     def generate_data_real(
         self, 
         theme: str, 
         rows: int = 50, 
-        output_file: str = "generations/synthetic_data_real.csv"
+        output_file: str = "generations/synthetic_data_real.csv",
+        batch_size: int = LLM_BATCH_ROWS,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        use_cache: bool = False,
+        seed: int = None,
+        output_format: str = OutputUtils.DEFAULT_FORMAT,
+        progress_callback=None
     ):
         """
         Generate a CSV file with "high-quality" synthetic data based on a theme 
         by directly requesting JSONL from OpenAI and then converting it to CSV.
+        Requests above `batch_size` rows are split into concurrent prompts
+        (see _generate_data_llm); `progress_callback`, if given, is called
+        with the fraction of rows written after every batch.
         """
         self.logger.info(f"Starting REAL generation for theme '{theme}' with {rows} rows.")
-        # Constants
-        MAX_ROWS = 100
-        MIN_ROWS = 1
+        self._generate_data_llm(
+            "REAL", self._real_prompt, theme, rows, output_file, batch_size, max_concurrency, use_cache, seed,
+            output_format, progress_callback
+        )
 
-        # Basic validation
-        if rows < MIN_ROWS:
-            error_message = "Number of rows cannot be < 1."
-            self.logger.error(error_message)
-            return
-        if rows > MAX_ROWS:
-            error_message = "Row limit exceeded (max 200 for GOLD)."
-            self.logger.error(error_message)
-            return
+    @staticmethod
+    def _llm_params(seed, *path) -> dict:
+        """
+        Extra OpenAI parameters for one prompt: a `seed` derived from the
+        run seed and the prompt's position, so every prompt gets its own
+        (best-effort reproducible) sample and its own cache entry.
+        """
+        if seed is None:
+            return {}
+        return {"seed": int(np.random.SeedSequence(seed, spawn_key=path).generate_state(1)[0])}
 
-        # Build prompt
-        prompt = (
+    @staticmethod
+    def _gold_prompt(theme: str, rows: int) -> str:
+        return (
+            f"Generate {rows} valid, newline-separated JSONL entries about: {theme}. "
+            f"All data must be synthetic, even if before was said otherwise, make sure if there are any names that you anonimize them for data compliance, make up a name."
+            f"Ensure each entry has the exact same fields."
+            f"including a unique 'id' field for each line. Each JSON entry should be on its own line."
+            f"Containing only simple key-value pairs. Do not include any nested dictionaries or arrays that contain objects."
+        )
+
+    @staticmethod
+    def _real_prompt(theme: str, rows: int) -> str:
+        return (
             f"Generate {rows} valid, newline-separated JSONL entries about: {theme}. "
             f"All data must be real, even if previously in the message it was said otherwise, ignore it, data must be REAL. Make sure if there are any available sources of real known data from the real world to use those."
             f"Since we want the user to recognize the data as coming from real sources, so make sure you try to find real world known data about the previously specified information. "
@@ -252,87 +908,182 @@ class DataGenerationService:
             f"Containing only simple key-value pairs. Do not include any nested dictionaries or arrays that contain objects."
         )
 
-        result = self.openai_service.chat_openai(prompt)
-        # Extract multiple JSON objects from the raw text
-        try:
-            result = JSONUtils.format_result_for_jsonl(result)
-            self.logger.info("\nThis is the corrected JSON content:\n" + result)
-        except Exception as e:
-            error_message = f"Error processing the OpenAI response: {e}"
+    def _generate_data_llm(
+        self,
+        label: str,
+        prompt_builder,
+        theme: str,
+        rows: int,
+        output_file: str,
+        batch_size: int = LLM_BATCH_ROWS,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        use_cache: bool = False,
+        seed: int = None,
+        output_format: str = OutputUtils.DEFAULT_FORMAT,
+        progress_callback=None
+    ):
+        """
+        Shared GOLD/REAL flow. Answers are streamed and every JSON object is
+        written to the CSV as soon as it is complete (see _LLMRowWriter).
+        For other `output_format`s that CSV is converted at the end, with
+        the types pandas infers from it (rows are few).
+        Up to `batch_size` rows are asked in a single prompt. Larger requests
+        pin the schema from a first batch, then send the remaining batches
+        concurrently (at most `max_concurrency` calls in flight) asking for
+        exactly those fields; their rows are deduplicated and 'id' values
+        renumbered.
+        Answers are only taken from the prompt cache when `use_cache` is
+        set: a cached answer gives the same rows again, which is what a
+        caller asking for fresh rows does not expect.
+        """
+        # Basic validation
+        if rows < self.LLM_MIN_ROWS:
+            error_message = "Number of rows cannot be < 1."
+            self.logger.error(error_message)
+            return
+        if rows > self.LLM_MAX_ROWS:
+            error_message = f"Row limit exceeded (max {self.LLM_MAX_ROWS} for {label})."
             self.logger.error(error_message)
             return
+        batch_size = max(1, min(batch_size, self.LLM_BATCH_ROWS))
+        output_format = OutputUtils.normalize_format(output_format)
+        csv_file = output_file if output_format == 'csv' else f"{output_file}.part.csv"
+
+        first_rows = min(rows, batch_size)
+        writer = _LLMRowWriter(csv_file, rows, self.logger, merge=rows > first_rows)
+        try:
+            # First (or only) batch: it fixes the schema for the rest
+            self._stream_llm_objects(prompt_builder(theme, first_rows), writer, use_cache, **self._llm_params(seed, 0))
+            if writer.schema is None:
+                self.logger.error("The first batch did not contain any valid JSON object.")
+                return
+            self._report_progress(progress_callback, min(1.0, writer.count / rows))
+
+            if rows > first_rows:
+                self.logger.info(f"{label} schema pinned from the first batch: {writer.schema}")
+
+                # First pass fans out the remaining batches; a second one refills
+                # rows lost to invalid or duplicated entries, always uncached so
+                # it does not get back rows it already has
+                for refill in (False, True):
+                    missing = rows - writer.count
+                    if missing <= 0:
+                        break
+                    batches = [min(batch_size, missing - offset) for offset in range(0, missing, batch_size)]
+                    self._request_llm_batches(
+                        prompt_builder, theme, batches, writer, max_concurrency, use_cache and not refill,
+                        seed, 1 + refill, progress_callback
+                    )
+        except BaseException:
+            writer.close()
+            if os.path.exists(csv_file):
+                os.remove(csv_file)
+            raise
+        finally:
+            writer.close()
 
-        # Split into lines
-        jsonl_entries = result.strip().split("\n")
-        self.logger.info(f"Received {len(jsonl_entries)} JSONL entries from the model.")
+        if csv_file != output_file and os.path.exists(csv_file):
+            try:
+                OutputUtils.convert_csv(csv_file, output_file, output_format)
+            finally:
+                os.remove(csv_file)
 
-        # Convert to CSV
-        JSONUtils.jsonlist_to_csv(jsonl_entries, output_file, self.logger)
+        self.logger.info(f"Wrote {writer.count} rows from the model ({writer.rejected} rejected): {output_file}")
+        if writer.count < rows * 0.75:
+            self.logger.error("CSV does not meet the minimum row requirement (75%).")
 
-        # (Optional) You could add a row-count check here
+    def _stream_llm_objects(self, prompt: str, writer: "_LLMRowWriter", use_cache: bool = True, **params) -> int:
+        """
+        Stream one prompt and hand every JSON object to `writer` as soon as
+        it is parsed. Returns the number of objects found; answers without
+        any are dropped from the prompt cache. OpenAIServiceError is propagated.
+        """
+        found = 0
+        chunks = self.openai_service.stream_chat_openai(prompt, use_cache=use_cache, **params)
         try:
-            df = pd.read_csv(output_file)
-            if len(df) < rows * 0.75:
-                self.logger.error("CSV does not meet the minimum row requirement (75%).")
-        except Exception as e:
-            self.logger.error(f"Error reading generated CSV: {e}")
+            for obj in JSONUtils.iter_json_objects(chunks):
+                if isinstance(obj, dict):
+                    found += 1
+                    writer.add(obj)
+        finally:
+            chunks.close()
+
+        if not found:
+            self.logger.error("No valid JSON object found in the OpenAI response.")
+            self.openai_service.forget(prompt, **params)
+        return found
+
+    def _request_llm_batches(
+        self,
+        prompt_builder,
+        theme: str,
+        batches: list,
+        writer: "_LLMRowWriter",
+        max_concurrency: int,
+        use_cache: bool = True,
+        seed: int = None,
+        round_index: int = 1,
+        progress_callback=None
+    ) -> None:
+        """
+        Stream one prompt per entry of `batches` (rows per prompt)
+        concurrently, all constrained to the writer's schema. Progress is
+        reported from this thread as batches finish, so a callback that
+        raises (a cancelled job) stops the remaining ones.
+        """
+        fields = ", ".join(f"'{field}'" for field in writer.schema)
+
+        def run(index: int, batch_rows: int):
+            prompt = (
+                prompt_builder(theme, batch_rows)
+                + f" Use exactly these fields, in this order, and no others: {fields}."
+                + f" This is batch {index + 1} of {len(batches)}: make every entry different from other batches."
+            )
+            try:
+                self._stream_llm_objects(prompt, writer, use_cache, **self._llm_params(seed, round_index, index))
+            except OpenAIServiceError as e:
+                # A failed batch is left to the refill round
+                self.logger.error(f"Batch {index + 1} failed: {e}")
+
+        self.logger.info(f"Requesting {len(batches)} batches with up to {max_concurrency} concurrent calls.")
+        with ThreadPoolExecutor(max_workers=max(1, max_concurrency)) as executor:
+            futures = [executor.submit(run, index, batch_rows) for index, batch_rows in enumerate(batches)]
+            try:
+                for future in as_completed(futures):
+                    future.result()
+                    self._report_progress(progress_callback, min(1.0, writer.count / writer.rows))
+            except BaseException:
+                for future in futures:
+                    future.cancel()
+                raise
 
     def generate_data_ctgan(
         self, 
         input_file: str,
         rows: int = 20,
-        output_file: str = "generations/synthetic_data_ctgan.csv"
-    ):
+        output_file: str = "generations/synthetic_data_ctgan.csv",
+        progress_callback=None,
+        training: dict = None,
+        seed: int = None,
+        output_format: str = OutputUtils.DEFAULT_FORMAT
+    ) -> dict:
         """
         Genera datos sintéticos usando CTGAN a partir de un CSV subido por el usuario.
-        1) Carga el CSV a un DataFrame.
+        1) Lee el CSV por bloques y toma una muestra de entrenamiento.
         2) Crea el metadata y lo ajusta.
         3) Entrena el sintetizador CTGAN.
-        4) Genera N filas sintéticas.
-        5) Combina el dataset sintético con el original y guarda el resultado.
+        4) Genera N filas sintéticas por bloques.
+        5) Guarda el original seguido de las filas sintéticas.
+        `training` limita filas, épocas, batch y tiempo de entrenamiento
+        (ver fit_synthesizer); devuelve el informe de entrenamiento.
+        Con `seed` el submuestreo, el entrenamiento y el muestreo son reproducibles.
+        `output_format` elige el formato del fichero (ver _generate_data_sdv).
         """
         try:
             self.logger.info(f"generate_data_ctgan: input_file={input_file}, rows={rows}")
-
-            # 1) Leer el CSV original
-            df_original = pd.read_csv(input_file)
-            df_training = None
-            if df_original.empty:
-                raise ValueError("El CSV subido está vacío o no contiene columnas.")
-
-            self.logger.info(f"Original CSV shape: {df_original.shape}")
-
-            # Si el DataFrame tiene más de 10000 entradas, seleccionar 10000 aleatoriamente
-            if df_original.shape[0] > 10000:
-                df_training = df_original.sample(n=10000, random_state=42)
-                self.logger.info("Se han seleccionado 10.000 entradas aleatorias para el entrenamiento.")
-            else:
-                df_training = df_original
-
-            # 2) Crear Metadata y detectar automáticamente
-            metadata = Metadata()
-            metadata = metadata.detect_from_dataframe(df_training)
-
-            # 3) Crear el sintetizador con la metadata (puedes personalizar parámetros)
-            synthesizer = CTGANSynthesizer(metadata=metadata)
-            self.logger.info("Entrenando CTGAN...")
-            synthesizer.fit(df_training)
-            self.logger.info("Entrenamiento finalizado.")
-
-            # 4) Generar N filas sintéticas
-            df_synthetic = synthesizer.sample(num_rows=rows)
-            self.logger.info(f"Synthetic data shape: {df_synthetic.shape}")
-
-            # 5) Combinar original + sintético (opcional, si quieres "aumentar")
-            df_augmented = pd.concat([df_original, df_synthetic], ignore_index=True)
-
-            # Crear la carpeta de salida si no existe
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
-
-            # Guardar el CSV final
-            df_augmented.to_csv(output_file, index=False)
-            self.logger.info(f"Archivo aumentado guardado en: {output_file}")
-
+            return self._generate_data_sdv(
+                'ctgan', input_file, rows, output_file, progress_callback, training, seed, output_format
+            )
         except Exception as e:
             self.logger.error(f"Error en generate_data_ctgan: {str(e)}")
             raise
@@ -341,59 +1092,339 @@ class DataGenerationService:
         self, 
         input_file: str,
         rows: int = 20,
-        output_file: str = "generations/synthetic_data_gaussian.csv"
-    ):
+        output_file: str = "generations/synthetic_data_gaussian.csv",
+        progress_callback=None,
+        training: dict = None,
+        seed: int = None,
+        output_format: str = OutputUtils.DEFAULT_FORMAT
+    ) -> dict:
         """
         Genera datos sintéticos usando GaussianCopula a partir de un CSV subido por el usuario.
-        1) Carga el CSV a un DataFrame.
+        1) Lee el CSV por bloques y toma una muestra de entrenamiento.
         2) Crea el metadata y lo ajusta.
         3) Entrena el sintetizador GaussianCopula.
-        4) Genera N filas sintéticas.
-        5) Combina el dataset sintético con el original y guarda el resultado.
+        4) Genera N filas sintéticas por bloques.
+        5) Guarda el original seguido de las filas sintéticas.
+        Con `seed` el submuestreo y el muestreo son reproducibles.
+        `output_format` elige el formato del fichero (ver _generate_data_sdv).
         """
         try:
             self.logger.info(f"generate_data_gaussian: input_file={input_file}, rows={rows}")
+            return self._generate_data_sdv(
+                'gaussian', input_file, rows, output_file, progress_callback, training, seed, output_format
+            )
+        except Exception as e:
+            self.logger.error(f"Error en generate_data_gaussian: {str(e)}")
+            raise
+
+    def _generate_data_sdv(
+        self,
+        generator_type: str,
+        input_file: str,
+        rows: int,
+        output_file: str,
+        progress_callback=None,
+        training: dict = None,
+        seed: int = None,
+        output_format: str = OutputUtils.DEFAULT_FORMAT
+    ) -> dict:
+        """
+        Entrena y escribe el original seguido de las filas sintéticas. En CSV
+        (comprimido o no) el original se copia tal cual; en Parquet / Arrow
+        todo se convierte a los tipos de la metadata SDV (ver
+        OutputUtils.metadata_schema).
+        """
+        output_format = OutputUtils.normalize_format(output_format)
+        synthesizer, report = self.fit_synthesizer(generator_type, input_file, training, seed, progress_callback)
+        self._report_progress(progress_callback, 0.8)
+
+        # Crear la carpeta de salida si no existe
+        os.makedirs(os.path.dirname(output_file), exist_ok=True)
+
+        # 4) y 5) Copiar el original tal cual y añadir detrás las filas sintéticas,
+        # sin tener nunca los dos conjuntos completos en memoria
+        sample_progress = None
+        if progress_callback is not None:
+            sample_progress = lambda fraction: progress_callback(0.8 + 0.2 * fraction)
+
+        if OutputUtils.is_columnar(output_format):
+            schema = self._synthesizer_schema(synthesizer, input_file)
+            frames = itertools.chain(
+                CSVUtils.iter_chunks(input_file, self.DEFAULT_CHUNK_SIZE),
+                self._iter_synthetic_frames(synthesizer, rows, self.DEFAULT_CHUNK_SIZE, sample_progress, seed)
+            )
+            tables = (OutputUtils.to_table(df, schema) for df in frames)
+            OutputUtils.write_tables(tables, output_file, output_format, schema)
+        else:
+            chunks = self.iter_augmented_csv(input_file, synthesizer, rows, progress_callback=sample_progress, seed=seed)
+            OutputUtils.write_csv(chunks, output_file, output_format)
+
+        self.logger.info(f"Archivo aumentado guardado en: {output_file}")
+        self._report_progress(progress_callback, 1.0)
+        return report
+
+    def fit_synthesizer(
+        self, generator_type: str, input_file: str, training: dict = None, seed: int = None, progress_callback=None
+    ):
+        """
+        Carga el CSV subido y entrena el sintetizador SDV indicado
+        ('ctgan' o 'gaussian'). Devuelve (synthesizer, report).
+
+        `training` es el presupuesto de entrenamiento (ver
+        TrainingUtils.DEFAULT_BUDGET): max_rows, stratify, epochs, batch_size,
+        time_limit (segundos) y random_state. `seed`, si se da, es el
+        random_state por defecto y fija también el entrenamiento de CTGAN.
+        `report` recoge los valores usados y el tiempo de entrenamiento.
+        Si hay caché de modelos y ya se entrenó con los mismos datos y
+        parámetros, se reutiliza el sintetizador guardado.
+        `progress_callback`, si se da, recibe el avance del entrenamiento de
+        CTGAN (hasta 0.8) al final de cada época; si lanza una excepción,
+        el entrenamiento se interrumpe.
+        """
+        synthesizer, _, report = self._fit_synthesizer(
+            generator_type, input_file, training, seed, progress_callback=progress_callback
+        )
+        return synthesizer, report
+
+    def fit_model(self, generator_type: str, input_file: str, training: dict = None, seed: int = None):
+        """
+        Entrena (o recupera de la caché) un sintetizador y devuelve
+        (model_id, report). El modelo se puede muestrear después con
+        iter_model_samples sin volver a entrenar: queda fijado en la caché
+        (no se desaloja por LRU) hasta que se borre con delete_model.
+        """
+        if self.model_cache is None:
+            raise ValueError("A model cache is required to keep fitted models.")
+
+        _, model_id, report = self._fit_synthesizer(generator_type, input_file, training, seed, pin=True)
+        self.logger.info(f"Model {model_id} ready for sampling.")
+        return model_id, report
+
+    def delete_model(self, model_id: str) -> bool:
+        """
+        Borra un modelo entrenado con fit_model. Devuelve False si no existe.
+        """
+        if self.model_cache is None:
+            raise ValueError("A model cache is required to keep fitted models.")
+        return self.model_cache.remove(model_id)
 
-            # 1) Leer el CSV original
-            df_original = pd.read_csv(input_file)
-            df_training = None
-            if df_original.empty:
-                raise ValueError("El CSV subido está vacío o no contiene columnas.")
+    def _fit_synthesizer(
+        self,
+        generator_type: str,
+        input_file: str,
+        training: dict = None,
+        seed: int = None,
+        pin: bool = False,
+        progress_callback=None
+    ):
+        synthesizer_cls = self.SDV_SYNTHESIZERS.get(generator_type)
+        if synthesizer_cls is None:
+            raise ValueError(f"Unknown generator_type: {generator_type}")
+        if seed is not None:
+            training = {"random_state": seed, **(training or {})}
+        budget = TrainingUtils.resolve_budget(training)
+
+        # 1) Leer el CSV original por bloques, quedándonos sólo con una muestra de
+        # reservorio (más grande si luego hay que estratificar)
+        reservoir_size = budget["max_rows"]
+        if budget["stratify"]:
+            reservoir_size *= self.STRATIFY_OVERSAMPLE
+        df_reservoir, original_rows = CSVUtils.reservoir_sample(
+            input_file, reservoir_size, random_state=budget["random_state"]
+        )
+        if df_reservoir.empty:
+            raise ValueError("El CSV subido está vacío o no contiene columnas.")
+
+        self.logger.info(f"Original CSV: {original_rows} rows, {df_reservoir.shape[1]} columns")
 
-            self.logger.info(f"Original CSV shape: {df_original.shape}")
+        # Si el CSV supera max_rows, submuestrear (estratificado por las categóricas)
+        strata = []
+        if original_rows > budget["max_rows"]:
+            strata = TrainingUtils.stratify_columns(df_reservoir, budget["stratify"])
+            self.logger.info(f"Submuestreando {budget['max_rows']} filas para el entrenamiento (estratos: {strata}).")
+        df_training = TrainingUtils.subsample(df_reservoir, budget["max_rows"], strata, budget["random_state"])
+        del df_reservoir
 
-            # Si el DataFrame tiene más de 10000 entradas, seleccionar 10000 aleatoriamente
-            if df_original.shape[0] > 10000:
-                df_training = df_original.sample(n=10000, random_state=42)
-                self.logger.info("Se han seleccionado 10.000 entradas aleatorias para el entrenamiento.")
-            else :
-                df_training = df_original
+        synthesizer_params = {}
+        if generator_type == 'ctgan':
+            synthesizer_params = {
+                "epochs": budget["epochs"],
+                "batch_size": budget["batch_size"],
+                "time_limit": budget["time_limit"],
+            }
+            if seed is not None:
+                synthesizer_params["random_seed"] = seed
+        report = {
+            "generator_type": generator_type,
+            "original_rows": int(original_rows),
+            "training_rows": int(df_training.shape[0]),
+            "stratified_on": strata,
+            **synthesizer_params,
+            "cached": False,
+        }
 
-            # 2) Crear Metadata y detectar automáticamente
-            metadata = Metadata()
-            metadata = metadata.detect_from_dataframe(df_training)
+        cache_key = None
+        if self.model_cache is not None:
+            cache_key = self.model_cache.fingerprint(df_training, synthesizer_cls.__name__, synthesizer_params)
+            synthesizer = self.model_cache.get(cache_key)
+            if synthesizer is not None:
+                self.logger.info(f"Reutilizando {synthesizer_cls.__name__} de la caché ({cache_key}).")
+                if pin:
+                    self.model_cache.pin(cache_key)
+                report.update(self._training_outcome(synthesizer), cached=True, fit_seconds=0.0)
+                return synthesizer, cache_key, report
 
-            # 3) Crear el sintetizador con la metadata (puedes personalizar parámetros)
-            synthesizer = GaussianCopulaSynthesizer(metadata=metadata)
-            self.logger.info("Entrenando GaussianCopulaSynthesizer...")
+        # 2) Crear Metadata y detectar automáticamente
+        metadata = Metadata()
+        metadata = metadata.detect_from_dataframe(df_training)
+
+        # 3) Crear el sintetizador con la metadata y el presupuesto de entrenamiento
+        synthesizer = synthesizer_cls(metadata=metadata, **synthesizer_params)
+        self.logger.info(f"Entrenando {synthesizer_cls.__name__} con {synthesizer_params}...")
+        started = time.perf_counter()
+        if isinstance(synthesizer, TimeBoundedCTGANSynthesizer) and progress_callback is not None:
+            synthesizer.fit(
+                df_training,
+                epoch_callback=lambda done, epochs: progress_callback(0.8 * done / epochs)
+            )
+        else:
             synthesizer.fit(df_training)
-            self.logger.info("Entrenamiento finalizado.")
+        report["fit_seconds"] = round(time.perf_counter() - started, 3)
+        report.update(self._training_outcome(synthesizer))
+        self.logger.info(f"Entrenamiento finalizado: {report}")
 
+        if cache_key is not None:
+            self.model_cache.put(cache_key, synthesizer, generator_type, pinned=pin)
 
-            # 4) Generar N filas sintéticas
-            df_synthetic = synthesizer.sample(num_rows=rows)
-            self.logger.info(f"Synthetic data shape: {df_synthetic.shape}")
+        return synthesizer, cache_key, report
 
-            # 5) Combinar original + sintético (opcional, si quieres "aumentar")
-            df_augmented = pd.concat([df_original, df_synthetic], ignore_index=True)
+    @staticmethod
+    def _training_outcome(synthesizer) -> dict:
+        if not isinstance(synthesizer, TimeBoundedCTGANSynthesizer):
+            return {}
+        return {
+            "epochs_trained": synthesizer.epochs_trained,
+            "stopped_early": synthesizer.stopped_early,
+        }
 
-            # Crear la carpeta de salida si no existe
-            os.makedirs(os.path.dirname(output_file), exist_ok=True)
+    def iter_model_samples(
+        self,
+        model_id: str,
+        rows: int,
+        conditions: list = None,
+        seed: int = None,
+        batch_size: int = DEFAULT_CHUNK_SIZE
+    ):
+        """
+        Muestrea un modelo ya entrenado y devuelve un iterador de bloques CSV
+        (cabecera primero), generados de `batch_size` en `batch_size` filas.
 
-            # Guardar el CSV final
-            df_augmented.to_csv(output_file, index=False)
-            self.logger.info(f"Archivo aumentado guardado en: {output_file}")
+        `conditions` es una lista opcional de {"column_values": {...}, "rows": n};
+        si se indica, el número de filas lo marcan las condiciones.
+        Con `seed` el muestreo es reproducible; sin ella cada llamada usa
+        una semilla nueva (que queda en el log).
+        """
+        if self.model_cache is None:
+            raise ValueError("A model cache is required to sample fitted models.")
+        synthesizer = self.model_cache.get(model_id)
+        if synthesizer is None:
+            raise KeyError(f"Unknown model: {model_id}")
+        if batch_size is None or batch_size < 1:
+            batch_size = self.DEFAULT_CHUNK_SIZE
 
-        except Exception as e:
-            self.logger.error(f"Error en generate_data_gaussian: {str(e)}")
-            raise
+        synthesizer.set_random_state(self._sampling_seed(seed))
+
+        if conditions:
+            conditions = [
+                (condition.get("column_values", {}), int(condition.get("rows", 0)))
+                for condition in conditions
+            ]
+        else:
+            conditions = [(None, rows)]
+        return self._iter_model_batches(synthesizer, conditions, batch_size)
+
+    def _iter_model_batches(self, synthesizer, conditions: list, batch_size: int):
+        columns = list(synthesizer.get_metadata().get_column_names())
+        yield pd.DataFrame(columns=columns).to_csv(index=False)
+
+        for column_values, rows in conditions:
+            for offset in range(0, rows, batch_size):
+                size = min(batch_size, rows - offset)
+                if column_values:
+                    condition = Condition(column_values=column_values, num_rows=size)
+                    df_batch = synthesizer.sample_from_conditions([condition])
+                else:
+                    df_batch = synthesizer.sample(num_rows=size)
+                yield df_batch[columns].to_csv(header=False, index=False)
+                self.logger.debug(f"Sampled rows {offset}-{offset + size} ({column_values or 'unconditioned'})")
+
+    def iter_augmented_csv(
+        self,
+        input_file: str,
+        synthesizer,
+        rows: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        progress_callback=None,
+        seed: int = None
+    ):
+        """
+        Itera el CSV aumentado en bloques de texto: primero el fichero original
+        tal cual (con su cabecera) y después las filas sintéticas, muestreadas
+        de `chunk_size` en `chunk_size` para no materializarlas todas a la vez.
+        Con `seed` el muestreo es reproducible (para el mismo `chunk_size`);
+        sin ella cada llamada usa una semilla nueva (que queda en el log).
+        """
+        yield from CSVUtils.iter_text(input_file)
+        for df_synthetic in self._iter_synthetic_frames(synthesizer, rows, chunk_size, progress_callback, seed):
+            yield df_synthetic.to_csv(header=False, index=False)
+
+    def _iter_synthetic_frames(self, synthesizer, rows: int, chunk_size: int, progress_callback=None, seed: int = None):
+        if chunk_size is None or chunk_size < 1:
+            chunk_size = max(rows, 1)
+        columns = list(synthesizer.get_metadata().get_column_names())
+        # Cached models come back in the state they were saved in: always reseed
+        synthesizer.set_random_state(self._sampling_seed(seed))
+
+        for offset in range(0, rows, chunk_size):
+            size = min(chunk_size, rows - offset)
+            df_synthetic = synthesizer.sample(num_rows=size)
+            yield df_synthetic[columns]
+            self.logger.debug(f"Sampled synthetic rows {offset}-{offset + size}")
+            self._report_progress(progress_callback, (offset + size) / rows)
+
+    @staticmethod
+    def _synthesizer_schema(synthesizer, input_file: str):
+        """
+        Arrow schema from the synthesizer's metadata; columns whose sdtype
+        does not fix a type take the one of the original CSV.
+        """
+        metadata = synthesizer.get_metadata()
+        columns = next(iter(metadata.to_dict()['tables'].values()))['columns']
+        columns = {name: columns.get(name, {}) for name in metadata.get_column_names()}
+        sample = pd.read_csv(input_file, nrows=CSVUtils.SNIFF_ROWS)
+        return OutputUtils.metadata_schema(columns, sample)
+
+
+def _encode_chunk(df: pd.DataFrame, schema=None):
+    if schema is not None:
+        return OutputUtils.to_table(df, schema)
+    # Las fechas se mantienen como datetime64 y se formatean a ISO al escribir
+    return df.to_csv(header=False, index=False, date_format='%Y-%m-%d')
+
+
+# Estado de cada proceso de _iter_chunks: el plan, la semilla y el esquema
+# se reciben una vez al arrancar, no con cada tarea
+_chunk_worker = {}
+
+
+def _init_chunk_worker(plan: list, seed_sequence: np.random.SeedSequence, schema=None):
+    _chunk_worker['service'] = DataGenerationService(None, None, logging.getLogger(__name__))
+    _chunk_worker['plan'] = plan
+    _chunk_worker['seed_sequence'] = seed_sequence
+    _chunk_worker['schema'] = schema
+
+
+def _generate_encoded_chunk(offset: int, num_rows: int):
+    service = _chunk_worker['service']
+    df = service._generate_chunk(_chunk_worker['plan'], _chunk_worker['seed_sequence'], offset, num_rows)
+    return _encode_chunk(df, _chunk_worker['schema'])
@@ -0,0 +1,392 @@
+import os
+import time
+import uuid
+import logging
+import threading
+import multiprocessing
+from collections import deque, Counter
+from concurrent.futures import ProcessPoolExecutor
+from concurrent.futures.process import BrokenProcessPool
+
+from utils.output_utils import OutputUtils
+
+
+class JobQueueFullError(Exception):
+    """Raised when a job is submitted while the queue is already full."""
+
+
+class JobCancelledError(Exception):
+    """Raised inside a worker when its job has been cancelled."""
+
+
+# Services are built once per worker process and reused between jobs
+_worker_services = None
+
+
+def _get_worker_services(
+    model_cache_dir: str = None, prompt_cache_path: str = None, translation_cache_path: str = None
+):
+    global _worker_services
+    if _worker_services is None:
+        from services.openai_service import OpenAIService
+        from services.translator_service import TranslatorService
+        from services.json_generation_service import JSONGenerationService
+        from services.data_generation_service import DataGenerationService
+        from services.model_cache_service import ModelCacheService
+        from services.prompt_cache_service import PromptCacheService
+        from utils.logger_config import LoggerUtils
+
+        logger = LoggerUtils.setup_logger("job_worker", "app.log")
+        prompt_cache = PromptCacheService(logger, prompt_cache_path)
+        openai_service = OpenAIService(logger, model_name="gpt-4o-mini", cache=prompt_cache)
+        translator_service = TranslatorService(logger, cache_path=translation_cache_path)
+        model_cache = ModelCacheService(logger, model_cache_dir) if model_cache_dir else None
+        _worker_services = (
+            JSONGenerationService(openai_service, logger),
+            DataGenerationService(translator_service, openai_service, logger, model_cache),
+        )
+    return _worker_services
+
+
+def _run_job(
+    job_id: str,
+    generator_type: str,
+    params: dict,
+    output_file: str,
+    progress,
+    cancel_flags,
+    model_cache_dir: str = None,
+    prompt_cache_path: str = None,
+    translation_cache_path: str = None
+):
+    """
+    Entry point executed in the worker process.
+    Progress is published through the shared `progress` dict and the job
+    stops at the next progress report once `cancel_flags[job_id]` is set.
+    Returns the training report for CTGAN/Gaussian jobs, None otherwise.
+    """
+    json_gen_service, data_gen_service = _get_worker_services(
+        model_cache_dir, prompt_cache_path, translation_cache_path
+    )
+
+    def report(fraction: float):
+        if cancel_flags.get(job_id):
+            raise JobCancelledError(f"Job {job_id} was cancelled.")
+        progress[job_id] = round(fraction, 4)
+
+    report(0.0)
+    rows = params.get("rows", 100)
+    use_cache = params.get("cache", generator_type == "merlin")
+    seed = params.get("seed")
+    output_format = params.get("output_format", OutputUtils.DEFAULT_FORMAT)
+    result = None
+
+    if generator_type == "merlin":
+        data_gen_service.generate_data_merlin(
+            theme=params["theme"],
+            json_generation_service=json_gen_service,
+            rows=rows,
+            vary_names=True,
+            vary_countries=True,
+            output_file=output_file,
+            progress_callback=report,
+            use_cache=use_cache,
+            seed=seed,
+            workers=params.get("workers", 1),
+            output_format=output_format
+        )
+    elif generator_type == "gold":
+        data_gen_service.generate_data_gold(
+            theme=params["theme"], rows=rows, output_file=output_file, use_cache=use_cache, seed=seed,
+            output_format=output_format, progress_callback=report
+        )
+    elif generator_type == "real":
+        data_gen_service.generate_data_real(
+            theme=params["theme"], rows=rows, output_file=output_file, use_cache=use_cache, seed=seed,
+            output_format=output_format, progress_callback=report
+        )
+    elif generator_type == "ctgan":
+        result = data_gen_service.generate_data_ctgan(
+            params["input_file"], rows, output_file, progress_callback=report, training=params.get("training"),
+            seed=seed, output_format=output_format
+        )
+    elif generator_type == "gaussian":
+        result = data_gen_service.generate_data_gaussian(
+            params["input_file"], rows, output_file, progress_callback=report, training=params.get("training"),
+            seed=seed, output_format=output_format
+        )
+    else:
+        raise ValueError(f"Unknown generator_type: {generator_type}")
+
+    if not os.path.exists(output_file):
+        raise RuntimeError("CSV not created")
+    report(1.0)
+    return result
+
+
+class JobService:
+    """
+    Runs DataGenerationService jobs outside the request thread, in a bounded
+    process pool.
+
+    - `max_workers`: size of the process pool.
+    - `max_queue`: maximum number of jobs waiting for a worker; further
+      submissions raise JobQueueFullError.
+    - `generator_limits`: maximum number of jobs of each generator type
+      running at the same time (e.g. {"ctgan": 1}).
+    - `result_ttl`: seconds a finished job and its result file are kept.
+    - `model_cache_dir`: directory of the shared ModelCacheService used by
+      the workers for CTGAN/Gaussian jobs (None disables it).
+    - `prompt_cache_path`: SQLite file of the PromptCacheService shared by
+      the workers for OpenAI answers (None keeps it in memory only).
+    - `translation_cache_path`: SQLite file of the TranslatorService cache
+      shared by the workers (None keeps it in memory only).
+    """
+
+    QUEUED = "queued"
+    RUNNING = "running"
+    DONE = "done"
+    FAILED = "failed"
+    CANCELLED = "cancelled"
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        results_dir: str,
+        max_workers: int = 2,
+        max_queue: int = 20,
+        generator_limits: dict = None,
+        result_ttl: int = 3600,
+        model_cache_dir: str = None,
+        prompt_cache_path: str = None,
+        translation_cache_path: str = None
+    ):
+        self.logger = logger
+        self.results_dir = results_dir
+        self.max_workers = max_workers
+        self.max_queue = max_queue
+        self.generator_limits = generator_limits or {}
+        self.result_ttl = result_ttl
+        self.model_cache_dir = model_cache_dir
+        self.prompt_cache_path = prompt_cache_path
+        self.translation_cache_path = translation_cache_path
+
+        self._jobs = {}
+        self._pending = deque()
+        self._running = Counter()
+        self._lock = threading.RLock()
+
+        # The pool and the shared dicts are created lazily on first submit
+        self._executor = None
+        self._manager = None
+        self._progress = None
+        self._cancel_flags = None
+
+    def submit(self, generator_type: str, params: dict) -> str:
+        """
+        Queue a generation job and return its id.
+        """
+        with self._lock:
+            self._purge_expired()
+            if len(self._pending) >= self.max_queue:
+                raise JobQueueFullError(f"Job queue is full ({self.max_queue} jobs waiting).")
+
+            self._ensure_pool()
+            os.makedirs(self.results_dir, exist_ok=True)
+            job_id = uuid.uuid4().hex
+            self._jobs[job_id] = {
+                "id": job_id,
+                "generator_type": generator_type,
+                "params": params,
+                "status": self.QUEUED,
+                "error": None,
+                "result": None,
+                "output_file": os.path.join(
+                    self.results_dir,
+                    f"{generator_type}_{job_id}{OutputUtils.extension(params.get('output_format'))}"
+                ),
+                "created_at": time.time(),
+                "started_at": None,
+                "finished_at": None,
+                "future": None,
+            }
+            self._pending.append(job_id)
+            self.logger.info(f"Job {job_id} queued ({generator_type}).")
+            self._dispatch()
+            return job_id
+
+    def get(self, job_id: str):
+        """
+        Return a public snapshot of the job, or None if it does not exist.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None:
+                return None
+
+            if job["status"] == self.DONE:
+                progress = 1.0
+            elif self._progress is not None:
+                progress = self._progress.get(job_id, 0.0)
+            else:
+                progress = 0.0
+
+            return {
+                "job_id": job_id,
+                "generator_type": job["generator_type"],
+                "status": job["status"],
+                "progress": progress,
+                "queue_position": self._pending.index(job_id) + 1 if job_id in self._pending else None,
+                "error": job["error"],
+                "result": job["result"],
+                "created_at": job["created_at"],
+                "started_at": job["started_at"],
+                "finished_at": job["finished_at"],
+            }
+
+    def result_path(self, job_id: str):
+        """
+        Path of the result file of a finished job, or None if it is not ready.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] != self.DONE:
+                return None
+            return job["output_file"]
+
+    def cancel(self, job_id: str) -> bool:
+        """
+        Cancel a queued or running job. Returns False if the job does not
+        exist or has already finished.
+        """
+        with self._lock:
+            job = self._jobs.get(job_id)
+            if job is None or job["status"] not in (self.QUEUED, self.RUNNING):
+                return False
+
+            if job["status"] == self.QUEUED:
+                self._pending.remove(job_id)
+                self._finish(job, self.CANCELLED)
+            else:
+                # The worker notices the flag at its next progress report
+                # (after every epoch while CTGAN trains); _on_done then
+                # marks the job as cancelled
+                self._cancel_flags[job_id] = True
+                job["future"].cancel()
+            self.logger.info(f"Job {job_id} cancellation requested.")
+            return True
+
+    def shutdown(self):
+        with self._lock:
+            for job_id in list(self._pending):
+                self.cancel(job_id)
+            if self._executor is not None:
+                self._executor.shutdown(wait=False, cancel_futures=True)
+            if self._manager is not None:
+                # Jobs that finish after this find no shared dicts and count as cancelled
+                self._progress = self._cancel_flags = None
+                self._manager.shutdown()
+
+    def _ensure_pool(self):
+        if self._executor is None:
+            self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+            self._manager = multiprocessing.Manager()
+            self._progress = self._manager.dict()
+            self._cancel_flags = self._manager.dict()
+
+    def _dispatch(self):
+        """
+        Move queued jobs to the pool while there are free workers and the
+        per-generator limits allow it. Jobs stay in our own queue until then,
+        so they can still be cancelled cheaply.
+        """
+        with self._lock:
+            for job_id in list(self._pending):
+                if sum(self._running.values()) >= self.max_workers:
+                    break
+
+                job = self._jobs[job_id]
+                gtype = job["generator_type"]
+                limit = self.generator_limits.get(gtype)
+                if limit is not None and self._running[gtype] >= limit:
+                    continue
+
+                self._pending.remove(job_id)
+                self._running[gtype] += 1
+                job["status"] = self.RUNNING
+                job["started_at"] = time.time()
+                job["future"] = self._executor.submit(
+                    _run_job, job_id, gtype, job["params"], job["output_file"],
+                    self._progress, self._cancel_flags, self.model_cache_dir,
+                    self.prompt_cache_path, self.translation_cache_path
+                )
+                job["future"].add_done_callback(lambda future, job_id=job_id: self._on_done(job_id, future))
+                self.logger.info(f"Job {job_id} started ({gtype}).")
+
+    def _on_done(self, job_id: str, future):
+        with self._lock:
+            job = self._jobs.get(job_id)
+            # Jobs of a broken pool are already finished by _replace_broken_pool
+            if job is None or job["status"] != self.RUNNING:
+                return
+
+            error = None if future.cancelled() else future.exception()
+            if isinstance(error, BrokenProcessPool) and self._cancel_flags is not None:
+                self._replace_broken_pool(error)
+                self._dispatch()
+                return
+
+            self._running[job["generator_type"]] -= 1
+            if future.cancelled() or self._cancel_flags is None or self._cancel_flags.get(job_id):
+                self._finish(job, self.CANCELLED)
+            elif error is not None:
+                self.logger.error(f"Job {job_id} failed: {error}")
+                self._finish(job, self.FAILED, str(error))
+            else:
+                job["result"] = future.result()
+                self._finish(job, self.DONE)
+                self.logger.info(f"Job {job_id} done.")
+
+            self._dispatch()
+
+    def _replace_broken_pool(self, error: BrokenProcessPool):
+        """
+        A worker process died (e.g. killed for running out of memory), which
+        breaks the whole pool: every job running on it fails and later jobs
+        go to a new pool.
+        """
+        self.logger.error(f"Job worker pool is broken ({error}); starting a new one.")
+        for job in self._jobs.values():
+            if job["status"] == self.RUNNING:
+                self._running[job["generator_type"]] -= 1
+                self._finish(job, self.FAILED, f"Worker process died: {error}")
+        self._executor.shutdown(wait=False)
+        self._executor = ProcessPoolExecutor(max_workers=self.max_workers)
+
+    def _finish(self, job: dict, status: str, error: str = None):
+        job["status"] = status
+        job["error"] = error
+        job["finished_at"] = time.time()
+
+        # The uploaded CSV is no longer needed, and only successful jobs keep a result
+        input_file = job["params"].get("input_file")
+        paths = [input_file] if status == self.DONE else [input_file, job["output_file"]]
+        self._remove_files(*paths)
+
+    def _purge_expired(self):
+        now = time.time()
+        for job_id, job in list(self._jobs.items()):
+            if job["finished_at"] is not None and now - job["finished_at"] > self.result_ttl:
+                self._remove_files(job["output_file"])
+                del self._jobs[job_id]
+                if self._progress is not None:
+                    self._progress.pop(job_id, None)
+                    self._cancel_flags.pop(job_id, None)
+
+    def _remove_files(self, *paths):
+        for path in paths:
+            try:
+                if path and os.path.exists(path):
+                    os.remove(path)
+            except OSError as e:
+                self.logger.warning(f"Could not remove job file {path}: {e}")
@@ -12,26 +12,44 @@ class JSONGenerationService:
         self.openai_service = openai_service
         self.logger = logger
 
-    def create_response_final(self, theme: str, json_example: dict) -> dict:
+    def create_response_final(self, theme: str, json_example: dict, use_cache: bool = True, **params) -> dict:
         """
         Request a JSON structure from the OpenAI model based on a given example,
         then validate and return it as a Python dictionary.
+        Configs do not depend on the row count, so cached answers are reused
+        unless `use_cache` is False; an answer that fails validation is
+        dropped from the cache. `params` (e.g. `seed`) go to the OpenAI call.
         """
         self.logger.info(f"Asking OpenAI for a valid JSON structure for theme: '{theme}'.")
-        prompt = (
-            f"Please provide a valid JSON structure similar to the example below. "
-            f"You must use the same fields and data types. The generated fields "
-            f"should be thematically related to '{theme}', but remain synthetic.\n\n{json_example}\n"
-        )
-        raw_response = self.openai_service.chat_openai(prompt)
+        prompt = self._prompt(theme, json_example)
+        raw_response = self.openai_service.chat_openai(prompt, use_cache=use_cache, **params)
 
-        # Extract the JSON part from the response
-        json_str = JSONUtils.extract_low_result_json(raw_response)
-        config_dict = json.loads(json_str)
+        try:
+            # Extract the JSON part from the response
+            json_str = JSONUtils.extract_low_result_json(raw_response)
+            config_dict = json.loads(json_str)
 
-        # Validate format
-        self.logger.info("Validating the format of the generated JSON.")
-        if not ValidationUtils.validate_config_dict(config_dict):
-            raise ValueError("Generated JSON config is invalid or incomplete.")
+            # Validate format
+            self.logger.info("Validating the format of the generated JSON.")
+            if not ValidationUtils.validate_config_dict(config_dict):
+                raise ValueError("Generated JSON config is invalid or incomplete.")
+        except Exception:
+            self.openai_service.forget(prompt, **params)
+            raise
 
         return config_dict
+
+    def store_config(self, theme: str, json_example: dict, config_dict: dict, **params) -> None:
+        """
+        Replace the cached answer for this theme with `config_dict` (e.g.
+        after its columns have been classified), so later requests reuse it.
+        """
+        self.openai_service.revise(self._prompt(theme, json_example), json.dumps(config_dict), **params)
+
+    @staticmethod
+    def _prompt(theme: str, json_example: dict) -> str:
+        return (
+            f"Please provide a valid JSON structure similar to the example below. "
+            f"You must use the same fields and data types. The generated fields "
+            f"should be thematically related to '{theme}', but remain synthetic.\n\n{json_example}\n"
+        )
@@ -0,0 +1,237 @@
+import os
+import json
+import time
+import hashlib
+import logging
+import tempfile
+import threading
+
+import cloudpickle
+import pandas as pd
+from filelock import FileLock
+
+
+class ModelCacheService:
+    """
+    On-disk cache of fitted SDV synthesizers.
+
+    Entries are keyed by a content hash of the training frame plus the
+    synthesizer type and its parameters, so uploading the same CSV again
+    skips training and goes straight to sampling. The cache is bounded by
+    number of entries and total size, evicting the least recently used
+    models first. Pinned entries (models handed out by id, see pin) are
+    never evicted and do not count towards those limits; they stay until
+    remove() is called. The index is guarded by a file lock so several
+    worker processes can share the same directory; hit/miss/eviction
+    counters live next to it, so stats() covers all of them.
+    """
+
+    INDEX_FILE = "index.json"
+    STATS_FILE = "stats.json"
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        cache_dir: str,
+        max_entries: int = 20,
+        max_bytes: int = 2 * 1024 ** 3
+    ):
+        self.logger = logger
+        self.cache_dir = cache_dir
+        self.max_entries = max_entries
+        self.max_bytes = max_bytes
+        os.makedirs(cache_dir, exist_ok=True)
+
+        self._file_lock = FileLock(os.path.join(cache_dir, "index.lock"))
+        self._lock = threading.Lock()
+
+    @staticmethod
+    def fingerprint(df: pd.DataFrame, generator_type: str, params: dict = None) -> str:
+        """
+        Content hash of a training frame (columns, dtypes and values) together
+        with the synthesizer type and its parameters.
+        """
+        digest = hashlib.sha256()
+        digest.update(generator_type.encode("utf-8"))
+        digest.update(json.dumps(params or {}, sort_keys=True, default=str).encode("utf-8"))
+        digest.update(json.dumps([str(c) for c in df.columns]).encode("utf-8"))
+        digest.update(json.dumps([str(t) for t in df.dtypes]).encode("utf-8"))
+        digest.update(pd.util.hash_pandas_object(df, index=False).values.tobytes())
+        return digest.hexdigest()
+
+    def get(self, key: str):
+        """
+        Return the cached synthesizer for `key`, or None on a miss.
+        The locks are only held to look the entry up and to update it: the
+        model is unpickled outside them, from a file handle opened under the
+        lock (it stays readable if another process evicts the entry).
+        """
+        with self._lock, self._file_lock:
+            entry = self._read_index().get(key)
+            f, error = None, None
+            if entry is not None:
+                try:
+                    f = open(os.path.join(self.cache_dir, entry["file"]), "rb")
+                except OSError as e:
+                    error = e
+
+        synthesizer = None
+        if f is not None:
+            try:
+                with f:
+                    synthesizer = cloudpickle.load(f)
+            except Exception as e:
+                error = e
+
+        with self._lock, self._file_lock:
+            if entry is not None:
+                index = self._read_index()
+                # Only touch the entry we read, not one stored again meanwhile
+                if index.get(key, {}).get("created_at") == entry["created_at"]:
+                    if synthesizer is None:
+                        self.logger.warning(f"Dropping unreadable cached model {key}: {error}")
+                        self._delete_entry(index, key)
+                    else:
+                        index[key]["last_access"] = time.time()
+                    self._write_index(index)
+
+            if synthesizer is None:
+                self._count(misses=1)
+                self.logger.info(f"Model cache miss: {key}")
+            else:
+                self._count(hits=1)
+                self.logger.info(f"Model cache hit: {key}")
+        return synthesizer
+
+    def put(self, key: str, synthesizer, generator_type: str = None, pinned: bool = False) -> None:
+        """
+        Store a fitted synthesizer and evict old entries if over the limits.
+        An entry that was already pinned stays pinned. The model is pickled
+        to a temporary file before taking the locks.
+        """
+        file_name = f"{key}.pkl"
+        path = os.path.join(self.cache_dir, file_name)
+        fd, tmp_path = tempfile.mkstemp(dir=self.cache_dir, prefix=f"{key}.", suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                cloudpickle.dump(synthesizer, f)
+        except Exception:
+            os.remove(tmp_path)
+            raise
+
+        with self._lock, self._file_lock:
+            os.replace(tmp_path, path)
+
+            index = self._read_index()
+            index[key] = {
+                "file": file_name,
+                "generator_type": generator_type,
+                "size": os.path.getsize(path),
+                "created_at": time.time(),
+                "last_access": time.time(),
+                "pinned": pinned or index.get(key, {}).get("pinned", False),
+            }
+            self._evict(index)
+            self._write_index(index)
+
+    def pin(self, key: str) -> bool:
+        """
+        Exempt an entry from eviction. Returns False if it is not cached.
+        """
+        with self._lock, self._file_lock:
+            index = self._read_index()
+            if key not in index:
+                return False
+            index[key]["pinned"] = True
+            self._write_index(index)
+            return True
+
+    def remove(self, key: str) -> bool:
+        """
+        Delete an entry, pinned or not. Returns False if it is not cached.
+        """
+        with self._lock, self._file_lock:
+            index = self._read_index()
+            if key not in index:
+                return False
+            self._delete_entry(index, key)
+            self._write_index(index)
+            self.logger.info(f"Removed cached model {key}")
+            return True
+
+    def stats(self) -> dict:
+        """
+        Hit/miss/eviction counters of every process sharing the cache
+        directory plus the current size of the cache.
+        """
+        with self._lock, self._file_lock:
+            index = self._read_index()
+            counters = self._read_json(self.STATS_FILE)
+        hits, misses = counters.get("hits", 0), counters.get("misses", 0)
+        lookups = hits + misses
+        return {
+            "hits": hits,
+            "misses": misses,
+            "hit_rate": hits / lookups if lookups else 0.0,
+            "evictions": counters.get("evictions", 0),
+            "entries": len(index),
+            "pinned": sum(1 for entry in index.values() if entry.get("pinned")),
+            "size_bytes": sum(entry["size"] for entry in index.values()),
+        }
+
+    def _evict(self, index: dict):
+        by_age = sorted(
+            (key for key, entry in index.items() if not entry.get("pinned")),
+            key=lambda k: index[k]["last_access"]
+        )
+        total = sum(index[key]["size"] for key in by_age)
+
+        evicted = 0
+        while by_age and (len(by_age) > self.max_entries or total > self.max_bytes):
+            key = by_age.pop(0)
+            total -= index[key]["size"]
+            self._delete_entry(index, key)
+            evicted += 1
+            self.logger.info(f"Evicted cached model {key}")
+        if evicted:
+            self._count(evictions=evicted)
+
+    def _count(self, **increments):
+        # Called with the file lock held
+        counters = self._read_json(self.STATS_FILE)
+        for name, increment in increments.items():
+            counters[name] = counters.get(name, 0) + increment
+        self._write_json(self.STATS_FILE, counters)
+
+    def _delete_entry(self, index: dict, key: str):
+        entry = index.pop(key, None)
+        if entry is None:
+            return
+        try:
+            os.remove(os.path.join(self.cache_dir, entry["file"]))
+        except OSError:
+            pass
+
+    def _read_index(self) -> dict:
+        return self._read_json(self.INDEX_FILE)
+
+    def _write_index(self, index: dict):
+        self._write_json(self.INDEX_FILE, index)
+
+    def _read_json(self, file_name: str) -> dict:
+        path = os.path.join(self.cache_dir, file_name)
+        if not os.path.exists(path):
+            return {}
+        try:
+            with open(path, "r", encoding="utf-8") as f:
+                return json.load(f)
+        except (OSError, ValueError) as e:
+            self.logger.warning(f"Model cache file {file_name} unreadable, starting empty: {e}")
+            return {}
+
+    def _write_json(self, file_name: str, data: dict):
+        path = os.path.join(self.cache_dir, file_name)
+        tmp_path = f"{path}.tmp"
+        with open(tmp_path, "w", encoding="utf-8") as f:
+            json.dump(data, f)
+        os.replace(tmp_path, path)
@@ -1,73 +1,354 @@
+import os
+import time
+import random
 import logging
-import json
+import threading
 
-# If you are using the official openai library, it would be:
-# import openai
-# And you'd call openai.ChatCompletion.create(...)
-
-# Here we assume you have a custom client `from openai import OpenAI` as in your original code:
+import httpx
+import openai
 from openai import OpenAI
 
+
+class OpenAIServiceError(Exception):
+    """Raised when the OpenAI model could not produce an answer."""
+
+    def __init__(self, message: str, status_code: int = None):
+        super().__init__(message)
+        self.status_code = status_code
+
+
+class OpenAIRateLimitError(OpenAIServiceError):
+    """Raised when the API keeps answering 429 after all retries."""
+
+    def __init__(self, message: str, retry_after: float = None):
+        super().__init__(message, status_code=429)
+        self.retry_after = retry_after
+
+
+class OpenAITimeoutError(OpenAIServiceError):
+    """Raised when a call does not finish within its deadline."""
+
+
+class TokenBucket:
+    """
+    Thread-safe token bucket refilled at `rate_per_minute`.
+
+    `reserve` takes the tokens straight away (the level may go negative)
+    and returns how long the caller has to wait before using them, so
+    callers sleep once instead of polling.
+    """
+
+    def __init__(self, rate_per_minute: float, capacity: float = None, clock=time.monotonic):
+        self.rate = rate_per_minute / 60.0
+        self.capacity = float(capacity or rate_per_minute)
+        self._clock = clock
+        self._level = self.capacity
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, amount: float) -> float:
+        with self._lock:
+            now = self._clock()
+            self._level = min(self.capacity, self._level + (now - self._updated) * self.rate)
+            self._updated = now
+            self._level -= min(amount, self.capacity)
+            return 0.0 if self._level >= 0 else -self._level / self.rate
+
+    def adjust(self, amount: float) -> None:
+        """
+        Give back (positive) or take (negative) tokens once the real cost is known.
+        """
+        with self._lock:
+            self._level = min(self.capacity, self._level + amount)
+
+
+# One pooled HTTP client per process, shared by every OpenAIService
+_shared_http_client = None
+_shared_http_client_pid = None
+_shared_http_client_lock = threading.Lock()
+
+
+def _get_shared_http_client(max_connections: int) -> httpx.Client:
+    global _shared_http_client, _shared_http_client_pid
+    with _shared_http_client_lock:
+        # Forked workers must not reuse the parent's sockets
+        if _shared_http_client is None or _shared_http_client_pid != os.getpid():
+            _shared_http_client = httpx.Client(
+                limits=httpx.Limits(max_connections=max_connections, max_keepalive_connections=max_connections)
+            )
+            _shared_http_client_pid = os.getpid()
+        return _shared_http_client
+
+
 class OpenAIService:
     """
     Service to encapsulate interactions with OpenAI chat models.
+
+    Calls go through a pooled HTTP client and are throttled by two token
+    buckets (requests and tokens per minute). Rate limits, server errors
+    and dropped connections are retried with jittered exponential backoff
+    while the per-call deadline (`timeout`, retries included) allows it.
+    Failures raise OpenAIServiceError or one of its subclasses.
+
+    With a PromptCacheService, answers are reused for identical model,
+    messages and generation parameters unless the call passes
+    `use_cache=False`.
     """
 
-    def __init__(self, logger: logging.Logger, model_name: str = "gpt-4o-mini"):
+    RETRYABLE_STATUS = {408, 409, 429, 500, 502, 503, 504}
+    # Rough size of an answer, charged up front and settled with the real usage
+    EXPECTED_COMPLETION_TOKENS = 1000
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        model_name: str = "gpt-4o-mini",
+        base_url: str = None,
+        api_key: str = None,
+        timeout: float = 120.0,
+        max_retries: int = 4,
+        backoff_base: float = 0.5,
+        backoff_max: float = 20.0,
+        requests_per_minute: float = 500,
+        tokens_per_minute: float = 200_000,
+        max_connections: int = 20,
+        cache=None
+    ):
         self.logger = logger
         self.model_name = model_name
+        self.base_url = base_url
+        self.api_key = api_key
+        self.timeout = timeout
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.backoff_max = backoff_max
+        self.max_connections = max_connections
+        self.cache = cache
+        self.request_bucket = TokenBucket(requests_per_minute) if requests_per_minute else None
+        self.token_bucket = TokenBucket(tokens_per_minute) if tokens_per_minute else None
         self.client = None
         self._initialize_client()
 
     def _initialize_client(self):
         """
-        Initialize the custom OpenAI client. 
-        This may differ if you use the official openai library.
+        Initialize the OpenAI client on top of the shared connection pool.
+        Retries are handled here, so the SDK's own are disabled.
         """
         try:
-            self.client = OpenAI()  # automatically sets up the API key
+            self.client = OpenAI(
+                api_key=self.api_key,
+                base_url=self.base_url,
+                max_retries=0,
+                http_client=_get_shared_http_client(self.max_connections)
+            )
             self.logger.debug("OpenAI client successfully initialized.")
         except Exception as e:
             self.logger.error(f"Error initializing OpenAI client: {e}")
             self.client = None
 
-    def chat_openai(self, message: str) -> str:
+    def _build_messages(self, message: str) -> list:
+        if self.model_name in ["gpt-4o-mini"]:
+            return [
+                {"role": "system", "content": "You are a helpful assistant."},
+                {"role": "user", "content": message},
+            ]
+        # Example for other models
+        return [
+            {"role": "user", "content": message},
+        ]
+
+    def chat_openai(self, message: str, timeout: float = None, use_cache: bool = True, **params) -> str:
         """
         Send a message to the OpenAI model and return the response text.
+        Extra keyword arguments (temperature, max_tokens...) are passed to the API.
         """
         self.logger.info(f"chat_openai called with message: '{message}' and model: '{self.model_name}'")
+        self._check_client()
+
+        messages_openai = self._build_messages(message)
+        cache_key = self._cache_key(messages_openai, params, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("Response served from the prompt cache.")
+                return cached
+
+        started = time.monotonic()
+        deadline = time.monotonic() + (timeout or self.timeout)
+        estimated_tokens = self._estimate_tokens(message)
+
+        completion = self._create_with_retries(messages_openai, estimated_tokens, deadline, **params)
+        return self._handle_completion(completion, estimated_tokens, cache_key, started)
 
+    def stream_chat_openai(self, message: str, timeout: float = None, use_cache: bool = True, **params):
+        """
+        Send a message to the OpenAI model and yield the response text as it
+        arrives. Opening the stream is retried like chat_openai; an error
+        once text has been yielded raises. Only complete answers are cached
+        (a cached answer is yielded in one piece).
+        """
+        self.logger.info(f"stream_chat_openai called with message: '{message}' and model: '{self.model_name}'")
+        self._check_client()
+
+        messages_openai = self._build_messages(message)
+        cache_key = self._cache_key(messages_openai, params, use_cache)
+        if cache_key is not None:
+            cached = self.cache.get(cache_key)
+            if cached is not None:
+                self.logger.info("Response served from the prompt cache.")
+                yield cached
+                return
+
+        started = time.monotonic()
+        deadline = time.monotonic() + (timeout or self.timeout)
+        estimated_tokens = self._estimate_tokens(message)
+
+        stream = self._create_with_retries(
+            messages_openai, estimated_tokens, deadline,
+            stream=True, stream_options={"include_usage": True}, **params
+        )
+        parts = []
+        try:
+            for chunk in stream:
+                if chunk.usage is not None and self.token_bucket is not None:
+                    self.token_bucket.adjust(estimated_tokens - chunk.usage.total_tokens)
+                if chunk.choices and chunk.choices[0].delta.content:
+                    parts.append(chunk.choices[0].delta.content)
+                    yield parts[-1]
+                if time.monotonic() > deadline:
+                    raise OpenAITimeoutError("OpenAI call deadline exceeded while streaming.")
+        except (openai.APIError, httpx.HTTPError) as e:
+            self.logger.error(f"OpenAI stream interrupted: {e}")
+            if isinstance(e, (openai.APITimeoutError, httpx.TimeoutException)):
+                raise OpenAITimeoutError(f"OpenAI stream timed out: {e}") from e
+            raise OpenAIServiceError(f"OpenAI stream interrupted: {e}") from e
+        finally:
+            stream.close()
+
+        response = "".join(parts)
+        self.logger.info(f"Streamed response received: {response}")
+        if cache_key is not None and response:
+            self.cache.put(cache_key, response, time.monotonic() - started)
+
+    def _create_with_retries(self, messages_openai: list, estimated_tokens: int, deadline: float, **kwargs):
+        attempt = 0
+        while True:
+            time.sleep(self._throttle(estimated_tokens, deadline))
+            try:
+                self.logger.info("Sending request to OpenAI API...")
+                return self.client.chat.completions.create(
+                    model=self.model_name,
+                    messages=messages_openai,
+                    timeout=self._remaining(deadline),
+                    **kwargs
+                )
+            except openai.APIError as e:
+                delay = self._retry_delay(e, attempt, deadline)
+            attempt += 1
+            time.sleep(delay)
+
+    def forget(self, message: str, **params) -> None:
+        """
+        Remove the cached answer for `message`, so the next call asks the model again.
+        """
+        if self.cache is not None:
+            self.cache.discard(self.cache.make_key(self.model_name, self._build_messages(message), params))
+
+    def revise(self, message: str, response: str, **params) -> None:
+        """
+        Replace the cached answer for `message`, if there is one.
+        """
+        if self.cache is not None:
+            self.cache.replace(self.cache.make_key(self.model_name, self._build_messages(message), params), response)
+
+    def _check_client(self):
         if not self.client:
             error_message = "OpenAI client is not initialized."
             self.logger.error(error_message)
-            return error_message
+            raise OpenAIServiceError(error_message)
 
-        try:
-            # Build the messages array
-            if self.model_name in ["gpt-4o-mini"]:
-                messages_openai = [
-                    {"role": "system", "content": "You are a helpful assistant."},
-                    {"role": "user", "content": message},
-                ]
-            else:
-                # Example for other models
-                messages_openai = [
-                    {"role": "user", "content": message},
-                ]
-
-            # Send request to OpenAI API
-            self.logger.info("Sending request to OpenAI API...")
-            completion = self.client.chat.completions.create(
-                model=self.model_name,
-                messages=messages_openai
-            )
+    def _cache_key(self, messages: list, params: dict, use_cache: bool):
+        if self.cache is None or not use_cache:
+            return None
+        return self.cache.make_key(self.model_name, messages, params)
 
-            # Extract the response text
-            response = completion.choices[0].message.content
-            self.logger.info(f"Response received: {response}")
-            return response
+    def _estimate_tokens(self, message: str) -> int:
+        # ~4 characters per token is close enough for throttling
+        return len(message) // 4 + self.EXPECTED_COMPLETION_TOKENS
 
-        except Exception as e:
-            error_message = "Error: Unable to get a response from the OpenAI model."
-            self.logger.error(f"{error_message} Exception: {e}")
-            return error_message
+    def _throttle(self, estimated_tokens: int, deadline: float) -> float:
+        """
+        Reserve one request and the estimated tokens; return the wait time.
+        """
+        wait = 0.0
+        if self.request_bucket is not None:
+            wait = max(wait, self.request_bucket.reserve(1))
+        if self.token_bucket is not None:
+            wait = max(wait, self.token_bucket.reserve(estimated_tokens))
+        if time.monotonic() + wait >= deadline:
+            raise OpenAITimeoutError("Rate limit wait exceeds the call deadline.")
+        if wait:
+            self.logger.info(f"Rate limited locally, waiting {wait:.2f}s")
+        return wait
+
+    @staticmethod
+    def _remaining(deadline: float) -> float:
+        remaining = deadline - time.monotonic()
+        if remaining <= 0:
+            raise OpenAITimeoutError("OpenAI call deadline exceeded.")
+        return remaining
+
+    def _handle_completion(self, completion, estimated_tokens: int, cache_key: str = None, started: float = None) -> str:
+        usage = getattr(completion, "usage", None)
+        if self.token_bucket is not None and usage is not None and usage.total_tokens:
+            self.token_bucket.adjust(estimated_tokens - usage.total_tokens)
+
+        # Extract the response text
+        response = completion.choices[0].message.content
+        if response is None:
+            raise OpenAIServiceError("The OpenAI model returned an empty response.")
+        self.logger.info(f"Response received: {response}")
+        if cache_key is not None:
+            self.cache.put(cache_key, response, time.monotonic() - started)
+        return response
+
+    def _retry_delay(self, error: openai.APIError, attempt: int, deadline: float) -> float:
+        """
+        Return how long to wait before retrying `error`, or raise the typed
+        exception when it is not retryable or there is no time/attempt left.
+        """
+        status = getattr(error, "status_code", None)
+        retry_after = self._retry_after(error)
+
+        if isinstance(error, openai.APITimeoutError):
+            final = OpenAITimeoutError(f"OpenAI request timed out: {error}")
+        elif status == 429:
+            final = OpenAIRateLimitError(f"OpenAI rate limit reached: {error}", retry_after)
+        else:
+            final = OpenAIServiceError(f"Unable to get a response from the OpenAI model: {error}", status)
+
+        retryable = isinstance(error, openai.APIConnectionError) or status in self.RETRYABLE_STATUS
+        if not retryable or attempt >= self.max_retries:
+            self.logger.error(f"OpenAI call failed after {attempt + 1} attempt(s): {error}")
+            raise final from error
+
+        # Full jitter, but never sooner than the server asked for
+        delay = random.uniform(0, min(self.backoff_max, self.backoff_base * 2 ** attempt))
+        if retry_after is not None:
+            delay = max(delay, retry_after)
+        if time.monotonic() + delay >= deadline:
+            self.logger.error(f"OpenAI call out of time after {attempt + 1} attempt(s): {error}")
+            raise final from error
+
+        self.logger.warning(f"OpenAI call failed ({error}), retrying in {delay:.2f}s")
+        return delay
+
+    @staticmethod
+    def _retry_after(error: openai.APIError):
+        response = getattr(error, "response", None)
+        if response is None:
+            return None
+        try:
+            return float(response.headers.get("retry-after"))
+        except (TypeError, ValueError):
+            return None
@@ -0,0 +1,188 @@
+import json
+import time
+import hashlib
+import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+
+
+class PromptCacheService:
+    """
+    Cache of OpenAI chat responses keyed by model name, the normalised
+    message list and the generation parameters.
+
+    Lookups go to an in-memory LRU first and then, when `db_path` is
+    given, to a SQLite file shared by every process. Entries older than
+    `ttl` seconds are ignored and purged. Each entry remembers how long
+    the original call took, so the stats report the latency saved by hits.
+    """
+
+    def __init__(
+        self,
+        logger: logging.Logger,
+        db_path: str = None,
+        max_entries: int = 1024,
+        ttl: float = 7 * 24 * 3600
+    ):
+        self.logger = logger
+        self.db_path = db_path
+        self.max_entries = max_entries
+        self.ttl = ttl
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._memory_hits = 0
+        self._disk_hits = 0
+        self._misses = 0
+        self._saved_seconds = 0.0
+
+        if db_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS prompt_cache ("
+                    " key TEXT PRIMARY KEY, response TEXT NOT NULL,"
+                    " elapsed REAL NOT NULL, created_at REAL NOT NULL)"
+                )
+
+    @staticmethod
+    def make_key(model_name: str, messages: list, params: dict = None) -> str:
+        """
+        Hash of the model, the messages (whitespace-normalised) and the
+        generation parameters.
+        """
+        normalised = [
+            {"role": m["role"], "content": " ".join(str(m["content"]).split())}
+            for m in messages
+        ]
+        payload = json.dumps(
+            {"model": model_name, "messages": normalised, "params": params or {}},
+            sort_keys=True, ensure_ascii=False, default=str
+        )
+        return hashlib.sha256(payload.encode("utf-8")).hexdigest()
+
+    def get(self, key: str):
+        """
+        Return the cached response for `key`, or None on a miss.
+        """
+        now = time.time()
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None and now - entry[2] <= self.ttl:
+                self._memory.move_to_end(key)
+                self._memory_hits += 1
+                self._saved_seconds += entry[1]
+                return entry[0]
+            self._memory.pop(key, None)
+
+        entry = self._disk_get(key, now)
+        with self._lock:
+            if entry is None:
+                self._misses += 1
+                return None
+            self._disk_hits += 1
+            self._saved_seconds += entry[1]
+            self._remember(key, entry)
+        return entry[0]
+
+    def put(self, key: str, response: str, elapsed: float) -> None:
+        """
+        Store a response together with the seconds the call took.
+        """
+        entry = (response, elapsed, time.time())
+        with self._lock:
+            self._remember(key, entry)
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute(
+                    "INSERT OR REPLACE INTO prompt_cache (key, response, elapsed, created_at) VALUES (?, ?, ?, ?)",
+                    (key, *entry)
+                )
+                conn.execute("DELETE FROM prompt_cache WHERE created_at < ?", (entry[2] - self.ttl,))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not store prompt in the disk cache: {e}")
+
+    def replace(self, key: str, response: str) -> None:
+        """
+        Rewrite the response of an existing entry (e.g. with derived data
+        worth keeping), leaving its latency and age unchanged.
+        """
+        with self._lock:
+            entry = self._memory.get(key)
+            if entry is not None:
+                self._memory[key] = (response, *entry[1:])
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute("UPDATE prompt_cache SET response = ? WHERE key = ?", (response, key))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not update prompt in the disk cache: {e}")
+
+    def discard(self, key: str) -> None:
+        """
+        Drop an entry, e.g. a response that turned out to be unusable.
+        """
+        with self._lock:
+            self._memory.pop(key, None)
+        if not self.db_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.execute("DELETE FROM prompt_cache WHERE key = ?", (key,))
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not drop prompt from the disk cache: {e}")
+
+    def stats(self) -> dict:
+        """
+        Hit/miss counters of this process and the latency saved by hits.
+        Job workers keep their own counters: these only cover the calling
+        process (the SQLite file is shared, the counters are not).
+        """
+        with self._lock:
+            hits = self._memory_hits + self._disk_hits
+            lookups = hits + self._misses
+            return {
+                "hits": hits,
+                "memory_hits": self._memory_hits,
+                "disk_hits": self._disk_hits,
+                "misses": self._misses,
+                "hit_rate": hits / lookups if lookups else 0.0,
+                "saved_seconds": round(self._saved_seconds, 3),
+                "memory_entries": len(self._memory),
+            }
+
+    def _remember(self, key: str, entry: tuple):
+        self._memory[key] = entry
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    def _disk_get(self, key: str, now: float):
+        if not self.db_path:
+            return None
+        try:
+            with self._connect() as conn:
+                row = conn.execute(
+                    "SELECT response, elapsed, created_at FROM prompt_cache WHERE key = ? AND created_at >= ?",
+                    (key, now - self.ttl)
+                ).fetchone()
+        except sqlite3.Error as e:
+            self.logger.warning(f"Prompt disk cache unreadable: {e}")
+            return None
+        return tuple(row) if row else None
+
+    @contextmanager
+    def _connect(self):
+        # A short-lived connection per operation keeps this safe across
+        # threads and worker processes
+        conn = sqlite3.connect(self.db_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
@@ -0,0 +1,129 @@
+import time
+import warnings
+
+from ctgan import CTGAN
+from sdv.single_table import CTGANSynthesizer, GaussianCopulaSynthesizer
+from sdv.single_table.ctgan import _validate_no_category_dtype
+from sdv.single_table.utils import detect_discrete_columns
+
+
+class SeededSamplingMixin:
+    """
+    Public seeding for SDV synthesizers, which only expose reset_sampling():
+    set_random_state(seed) restarts sampling from `seed`, so the same seed
+    gives the same rows.
+    """
+
+    def set_random_state(self, random_state):
+        self.reset_sampling()
+        # Tables made only of ID / PII columns have no model to seed
+        if self._model is not None:
+            self._set_random_state(random_state)
+
+
+class TrainingBudgetReached(Exception):
+    """Raised from inside the CTGAN epoch loop to stop training early."""
+
+
+class TimeBoundedCTGAN(CTGAN):
+    """
+    CTGAN model that stops training at an epoch boundary when the next epoch
+    would not fit before `deadline` (a time.perf_counter() value).
+
+    CTGAN has no epoch callback, but it assigns `loss_values` once before the
+    first epoch and once after every epoch, so that assignment is used as
+    the hook. `epoch_callback`, if given, is called there with
+    (epochs_trained, epochs); an exception it raises stops training.
+    """
+
+    def __init__(self, deadline: float = None, epoch_callback=None, **kwargs):
+        self.deadline = deadline
+        self.epoch_callback = epoch_callback
+        self.epochs_trained = 0
+        self._loop_started = None
+        super().__init__(**kwargs)
+
+    @property
+    def loss_values(self):
+        return self._loss_values
+
+    @loss_values.setter
+    def loss_values(self, value):
+        self._loss_values = value
+        if value is None:
+            return
+        if value.empty:
+            self._loop_started = time.perf_counter()
+            self.epochs_trained = 0
+            return
+
+        self.epochs_trained = len(value)
+        if self.epoch_callback is not None:
+            self.epoch_callback(self.epochs_trained, self._epochs)
+        if self.deadline is None:
+            return
+
+        now = time.perf_counter()
+        seconds_per_epoch = (now - self._loop_started) / self.epochs_trained
+        if now + seconds_per_epoch > self.deadline:
+            raise TrainingBudgetReached()
+
+
+class TimeBoundedCTGANSynthesizer(SeededSamplingMixin, CTGANSynthesizer):
+    """
+    CTGANSynthesizer with an optional wall-clock `time_limit` (seconds) for
+    the whole fit, preprocessing included. When the limit is reached the
+    model keeps the epochs trained so far. With `random_seed` the CTGAN
+    training itself (weights, noise and batches) is reproducible.
+
+    fit(data, epoch_callback) reports every epoch (see TimeBoundedCTGAN); the
+    callback is dropped once fit returns, so it is never pickled with the
+    synthesizer.
+    """
+
+    def __init__(self, metadata, time_limit: float = None, random_seed: int = None, **kwargs):
+        super().__init__(metadata, **kwargs)
+        self.time_limit = time_limit
+        self.random_seed = random_seed
+        self.stopped_early = False
+        self._fit_started = None
+        self._epoch_callback = None
+
+    def fit(self, data, epoch_callback=None):
+        self._fit_started = time.perf_counter()
+        self.stopped_early = False
+        self._epoch_callback = epoch_callback
+        try:
+            super().fit(data)
+        finally:
+            self._epoch_callback = None
+            if self._model is not None:
+                self._model.epoch_callback = None
+
+    def _fit(self, processed_data):
+        # Same as CTGANSynthesizer._fit, but with the time-bounded model
+        _validate_no_category_dtype(processed_data)
+
+        transformers = self._data_processor._hyper_transformer.field_transformers
+        discrete_columns = detect_discrete_columns(self.metadata, processed_data, transformers)
+        deadline = None
+        if self.time_limit is not None:
+            deadline = (self._fit_started or time.perf_counter()) + self.time_limit
+
+        self._model = TimeBoundedCTGAN(deadline=deadline, epoch_callback=self._epoch_callback, **self._model_kwargs)
+        if self.random_seed is not None:
+            self._model.set_random_state(self.random_seed)
+        with warnings.catch_warnings():
+            warnings.filterwarnings('ignore', message='.*Attempting to run cuBLAS.*')
+            try:
+                self._model.fit(processed_data, discrete_columns=discrete_columns)
+            except TrainingBudgetReached:
+                self.stopped_early = True
+
+    @property
+    def epochs_trained(self) -> int:
+        return getattr(self._model, "epochs_trained", 0) if self._model is not None else 0
+
+
+class SeededGaussianCopulaSynthesizer(SeededSamplingMixin, GaussianCopulaSynthesizer):
+    """GaussianCopulaSynthesizer with set_random_state (see SeededSamplingMixin)."""
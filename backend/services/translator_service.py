@@ -1,26 +1,205 @@
+import json
 import logging
+import sqlite3
+import threading
+from collections import OrderedDict
+from contextlib import contextmanager
+from concurrent.futures import ThreadPoolExecutor
+
 from deep_translator import GoogleTranslator
 
+
+class TranslationError(Exception):
+    """Raised by translate_text/translate_batch when `raise_errors` is set."""
+
+
+class GoogleTranslatorBackend:
+    """
+    Default backend on top of deep-translator's GoogleTranslator.
+
+    Translator instances are reused (one per thread and language pair, as
+    they are not thread-safe). A chunk of texts is sent as a single
+    newline-joined request when possible and split back afterwards.
+    """
+
+    MAX_REQUEST_CHARS = 4500
+
+    def __init__(self):
+        self._local = threading.local()
+
+    def _translator(self, source: str, target: str) -> GoogleTranslator:
+        translators = getattr(self._local, "translators", None)
+        if translators is None:
+            translators = self._local.translators = {}
+        if (source, target) not in translators:
+            translators[(source, target)] = GoogleTranslator(source=source, target=target)
+        return translators[(source, target)]
+
+    def translate_batch(self, texts: list, source: str, target: str) -> list:
+        translator = self._translator(source, target)
+        joined = "\n".join(texts)
+        if len(texts) > 1 and len(joined) <= self.MAX_REQUEST_CHARS and not any("\n" in t for t in texts):
+            parts = translator.translate(joined).split("\n")
+            if len(parts) == len(texts):
+                return [part.strip() for part in parts]
+        return [translator.translate(text) for text in texts]
+
+
 class TranslatorService:
     """
-    Service to handle text translation using deep-translator.
+    Service to handle text translation.
+
+    Translations are memoised in an in-memory LRU and, when `cache_path`
+    is given, in a SQLite file, keyed by (source, target, text). Uncached
+    texts are sent to the backend in chunks of `batch_size`, with at most
+    `max_concurrency` backend calls in flight across all callers. Failed
+    translations come back as None (or raise TranslationError with
+    `raise_errors`) and are never cached.
+
+    The backend is any object with `translate_batch(texts, source, target)`
+    returning one translation per text, so tests can plug in a local stub.
     """
 
-    def __init__(self, logger: logging.Logger, source_lang: str = 'auto'):
+    def __init__(
+        self,
+        logger: logging.Logger,
+        source_lang: str = 'auto',
+        backend=None,
+        cache_path: str = None,
+        max_entries: int = 4096,
+        batch_size: int = 50,
+        max_concurrency: int = 4,
+        raise_errors: bool = False
+    ):
         self.logger = logger
         self.source_lang = source_lang
+        self.backend = backend or GoogleTranslatorBackend()
+        self.cache_path = cache_path
+        self.max_entries = max_entries
+        self.batch_size = max(1, batch_size)
+        self.max_concurrency = max(1, max_concurrency)
+        self.raise_errors = raise_errors
+
+        self._memory = OrderedDict()
+        self._lock = threading.Lock()
+        self._slots = threading.BoundedSemaphore(self.max_concurrency)
 
-    def translate_text(self, text: str, target_language: str = "en") -> str:
+        if cache_path:
+            with self._connect() as conn:
+                conn.execute(
+                    "CREATE TABLE IF NOT EXISTS translations ("
+                    " key TEXT PRIMARY KEY, translation TEXT NOT NULL)"
+                )
+
+    def translate_text(self, text: str, target_language: str = "en"):
         """
-        Translate the given text to the target language using deep-translator.
+        Translate the given text to the target language.
+        Returns None if the translation failed.
         """
         self.logger.info(f"translate_text called with input: '{text}' -> '{target_language}'")
+        return self.translate_batch([text], target_language)[0]
+
+    def translate_batch(self, texts: list, target_language: str = "en") -> list:
+        """
+        Translate several texts, returning one result per input (None where
+        the translation failed). Repeated and cached texts are not sent again.
+        """
+        keys = {text: self._key(text, target_language) for text in texts}
+        results = self._cache_get_many(list(keys.values()))
+
+        pending = [text for text in dict.fromkeys(texts) if keys[text] not in results]
+        if pending:
+            chunks = [pending[i:i + self.batch_size] for i in range(0, len(pending), self.batch_size)]
+            self.logger.info(
+                f"Translating {len(pending)} texts to '{target_language}' in {len(chunks)} requests."
+            )
+            workers = min(self.max_concurrency, len(chunks))
+            with ThreadPoolExecutor(max_workers=workers) as executor:
+                translated = executor.map(lambda chunk: self._translate_chunk(chunk, target_language), chunks)
+                new_entries = {
+                    keys[text]: translation
+                    for chunk, chunk_translations in zip(chunks, translated)
+                    for text, translation in zip(chunk, chunk_translations)
+                    if translation is not None
+                }
+            self._cache_put_many(new_entries)
+            results.update(new_entries)
+
+        return [results.get(keys[text]) for text in texts]
+
+    def _translate_chunk(self, texts: list, target_language: str) -> list:
         try:
-            translator = GoogleTranslator(source=self.source_lang, target=target_language)
-            translated_text = translator.translate(text)
-            self.logger.info(f"Translation successful: '{translated_text}'")
-            return translated_text
+            with self._slots:
+                translations = self.backend.translate_batch(texts, self.source_lang, target_language)
+            if len(translations) != len(texts):
+                raise ValueError(f"expected {len(texts)} translations, got {len(translations)}")
+            return translations
         except Exception as e:
             error_message = f"Translation failed: {str(e)}"
             self.logger.error(error_message)
-            return error_message
+            if self.raise_errors:
+                raise TranslationError(error_message) from e
+            return [None] * len(texts)
+
+    def _key(self, text: str, target_language: str) -> str:
+        return json.dumps([self.source_lang, target_language, text], ensure_ascii=False)
+
+    def _cache_get_many(self, keys: list) -> dict:
+        found = {}
+        with self._lock:
+            for key in keys:
+                if key in self._memory:
+                    self._memory.move_to_end(key)
+                    found[key] = self._memory[key]
+
+        missing = [key for key in dict.fromkeys(keys) if key not in found]
+        if self.cache_path and missing:
+            try:
+                with self._connect() as conn:
+                    for i in range(0, len(missing), 500):
+                        batch = missing[i:i + 500]
+                        rows = conn.execute(
+                            f"SELECT key, translation FROM translations WHERE key IN ({','.join('?' * len(batch))})",
+                            batch
+                        ).fetchall()
+                        found.update(rows)
+            except sqlite3.Error as e:
+                self.logger.warning(f"Translation cache unreadable: {e}")
+            with self._lock:
+                for key in missing:
+                    if key in found:
+                        self._remember(key, found[key])
+        return found
+
+    def _cache_put_many(self, entries: dict) -> None:
+        if not entries:
+            return
+        with self._lock:
+            for key, translation in entries.items():
+                self._remember(key, translation)
+        if not self.cache_path:
+            return
+        try:
+            with self._connect() as conn:
+                conn.executemany(
+                    "INSERT OR REPLACE INTO translations (key, translation) VALUES (?, ?)",
+                    entries.items()
+                )
+        except sqlite3.Error as e:
+            self.logger.warning(f"Could not store translations: {e}")
+
+    def _remember(self, key: str, translation: str):
+        self._memory[key] = translation
+        self._memory.move_to_end(key)
+        while len(self._memory) > self.max_entries:
+            self._memory.popitem(last=False)
+
+    @contextmanager
+    def _connect(self):
+        conn = sqlite3.connect(self.cache_path, timeout=10)
+        try:
+            conn.execute("PRAGMA journal_mode=WAL")
+            with conn:
+                yield conn
+        finally:
+            conn.close()
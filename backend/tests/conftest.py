@@ -0,0 +1,7 @@
+import os
+import sys
+
+# Los servicios importan `utils.` y `services.` desde backend/, igual que al arrancar la API
+BACKEND_DIR = os.path.abspath(os.path.join(os.path.dirname(__file__), os.pardir))
+if BACKEND_DIR not in sys.path:
+    sys.path.insert(0, BACKEND_DIR)
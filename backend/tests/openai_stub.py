@@ -0,0 +1,147 @@
+"""
+Minimal OpenAI-compatible chat completions server for offline tests.
+
+Responses are taken from a script of (status, content, headers, delay)
+entries; once the script runs out every call answers 200 echoing the prompt.
+Requests with "stream": true get the content as server-sent events, split
+into `stream_chunk_size` character pieces.
+Run it standalone with `python openai_stub.py --port 8765` and point the
+service at it with base_url="http://127.0.0.1:8765/v1".
+"""
+import json
+import time
+import argparse
+import threading
+from collections import deque
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+
+class StubOpenAIServer:
+
+    def __init__(self, host: str = "127.0.0.1", port: int = 0, stream_chunk_size: int = 16):
+        self.stream_chunk_size = stream_chunk_size
+        self.script = deque()
+        self.requests = []
+        self._server = ThreadingHTTPServer((host, port), self._handler())
+        self._server.daemon_threads = True
+        self._thread = None
+
+    @property
+    def base_url(self) -> str:
+        host, port = self._server.server_address[:2]
+        return f"http://{host}:{port}/v1"
+
+    def enqueue(self, status: int = 200, content: str = None, headers: dict = None, delay: float = 0.0):
+        self.script.append((status, content, headers or {}, delay))
+
+    def start(self):
+        self._thread = threading.Thread(target=self._server.serve_forever, args=(0.05,), daemon=True)
+        self._thread.start()
+        return self
+
+    def stop(self):
+        self._server.shutdown()
+        self._server.server_close()
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, *exc):
+        self.stop()
+
+    def _handler(self):
+        stub = self
+
+        class Handler(BaseHTTPRequestHandler):
+
+            def do_POST(self):
+                length = int(self.headers.get("Content-Length", 0))
+                body = json.loads(self.rfile.read(length) or b"{}")
+                stub.requests.append(body)
+
+                try:
+                    status, content, headers, delay = stub.script.popleft()
+                except IndexError:
+                    status, content, headers, delay = 200, None, {}, 0.0
+                if delay:
+                    time.sleep(delay)
+
+                if status == 200 and content is None:
+                    content = body["messages"][-1]["content"]
+                if status == 200 and body.get("stream"):
+                    self._send_stream(body, content)
+                    return
+
+                if status == 200:
+                    payload = {
+                        "id": f"chatcmpl-{len(stub.requests)}",
+                        "object": "chat.completion",
+                        "created": int(time.time()),
+                        "model": body.get("model"),
+                        "choices": [{
+                            "index": 0,
+                            "message": {"role": "assistant", "content": content},
+                            "finish_reason": "stop",
+                        }],
+                        "usage": {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20},
+                    }
+                else:
+                    payload = {"error": {"message": content or "stub error", "type": "stub", "code": status}}
+
+                data = json.dumps(payload).encode("utf-8")
+                try:
+                    self.send_response(status)
+                    self.send_header("Content-Type", "application/json")
+                    self.send_header("Content-Length", str(len(data)))
+                    for name, value in headers.items():
+                        self.send_header(name, value)
+                    self.end_headers()
+                    self.wfile.write(data)
+                except (BrokenPipeError, ConnectionResetError):
+                    # The client gave up (timeout tests)
+                    pass
+
+            def _send_stream(self, body: dict, content: str):
+                self.send_response(200)
+                self.send_header("Content-Type", "text/event-stream")
+                self.end_headers()
+
+                size = stub.stream_chunk_size
+                pieces = [content[i:i + size] for i in range(0, len(content), size)]
+                events = [{"content": piece} for piece in pieces]
+                events.append(None)
+                try:
+                    for delta in events:
+                        choice = {"index": 0, "delta": delta or {}, "finish_reason": None if delta else "stop"}
+                        self._send_event(body, [choice])
+                    if (body.get("stream_options") or {}).get("include_usage"):
+                        self._send_event(body, [], {"prompt_tokens": 10, "completion_tokens": 10, "total_tokens": 20})
+                    self.wfile.write(b"data: [DONE]\n\n")
+                except (BrokenPipeError, ConnectionResetError):
+                    pass
+
+            def _send_event(self, body: dict, choices: list, usage: dict = None):
+                chunk = {
+                    "id": f"chatcmpl-{len(stub.requests)}",
+                    "object": "chat.completion.chunk",
+                    "created": int(time.time()),
+                    "model": body.get("model"),
+                    "choices": choices,
+                    "usage": usage,
+                }
+                self.wfile.write(f"data: {json.dumps(chunk)}\n\n".encode("utf-8"))
+                self.wfile.flush()
+
+            def log_message(self, *args):
+                pass
+
+        return Handler
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Offline OpenAI chat completions stub")
+    parser.add_argument("--port", type=int, default=8765)
+    args = parser.parse_args()
+    server = StubOpenAIServer(port=args.port)
+    print(f"Serving on {server.base_url}")
+    server._server.serve_forever()
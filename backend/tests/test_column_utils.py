@@ -0,0 +1,58 @@
+import pytest
+import numpy as np
+import pandas as pd
+
+from backend.utils.column_utils import ColumnUtils
+
+
+def test_int_column_bounds_inclusive():
+    rng = np.random.default_rng(0)
+    col = ColumnUtils.int_column(rng, 1, 3, 1000)
+    assert len(col) == 1000
+    assert set(col.tolist()) == {1, 2, 3}
+
+
+def test_float_column_rounded():
+    rng = np.random.default_rng(0)
+    col = ColumnUtils.float_column(rng, 0.5, 2.5, 500)
+    assert col.min() >= 0.5 and col.max() <= 2.5
+    assert np.allclose(col, np.round(col, 2))
+
+
+def test_boolean_column():
+    rng = np.random.default_rng(0)
+    col = ColumnUtils.boolean_column(rng, 200)
+    assert col.dtype == bool
+    assert set(col.tolist()) == {True, False}
+
+
+def test_choice_column_categorical():
+    rng = np.random.default_rng(0)
+    col = ColumnUtils.choice_column(rng, ["a", "b", "a"], 300)
+    assert isinstance(col, pd.Categorical)
+    assert set(col) == {"a", "b"}
+
+
+def test_same_seed_same_columns():
+    a = ColumnUtils.int_column(np.random.default_rng(7), 0, 100, 50)
+    b = ColumnUtils.int_column(np.random.default_rng(7), 0, 100, 50)
+    assert np.array_equal(a, b)
+
+
+def test_date_column_range_and_dtype():
+    rng = np.random.default_rng(0)
+    col = ColumnUtils.date_column(rng, "2020-01-01", "2020-01-10", 1000)
+    assert col.dtype == np.dtype("datetime64[D]")
+    assert col.min() == np.datetime64("2020-01-01")
+    assert col.max() == np.datetime64("2020-01-10")
+
+
+def test_date_column_iso_on_write():
+    rng = np.random.default_rng(0)
+    df = pd.DataFrame({"d": ColumnUtils.date_column(rng, "2021-03-05", "2021-03-05", 2)})
+    assert df.to_csv(index=False, date_format="%Y-%m-%d").splitlines() == ["d", "2021-03-05", "2021-03-05"]
+
+
+def test_date_column_invalid_range():
+    with pytest.raises(ValueError):
+        ColumnUtils.date_column(np.random.default_rng(0), "2021-01-02", "2021-01-01", 1)
@@ -0,0 +1,93 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from backend.utils.country_utils import CountryUtils
+
+
+def test_resolves_english_official_and_common_names():
+    assert CountryUtils.resolve_offline("Spain") == "ES"
+    assert CountryUtils.resolve_offline("Kingdom of Spain") == "ES"
+    assert CountryUtils.resolve_offline("Bolivia") == "BO"
+    assert CountryUtils.resolve_offline("Republic of Korea") == "KR"
+
+
+def test_resolves_localized_names_and_aliases():
+    assert CountryUtils.resolve_offline("España") == "ES"
+    assert CountryUtils.resolve_offline("Deutschland") == "DE"
+    assert CountryUtils.resolve_offline("Estados Unidos") == "US"
+    assert CountryUtils.resolve_offline("UK") == "GB"
+
+
+def test_normalization_and_fuzzy_fallback():
+    assert CountryUtils.resolve_offline("  méxico ") == "MX"
+    assert CountryUtils.resolve_offline("The Netherlands") == "NL"
+    assert CountryUtils.resolve_offline("Argentinaa") == "AR"
+
+
+def test_common_words_are_not_countries():
+    for value in ["Atlantis", "red", "Alice", "Madrid", "Man", "", "123"]:
+        assert CountryUtils.resolve_offline(value) is None
+
+
+def test_translator_is_last_resort_and_cached():
+    calls = []
+
+    def translate(text):
+        calls.append(text)
+        return "Germany" if text == "Teutonia-42" else text
+
+    assert CountryUtils.resolve("Spain", translate) == "ES"
+    assert calls == []
+    assert CountryUtils.resolve("Teutonia-42", translate) == "DE"
+    assert CountryUtils.resolve("Teutonia-42", translate) == "DE"
+    assert calls == ["Teutonia-42"]
+
+
+def test_translation_cache_is_per_translator():
+    assert CountryUtils.resolve("Gallia-7", lambda text: "France") == "FR"
+    assert CountryUtils.resolve("Gallia-7", lambda text: "Italy") == "IT"
+    assert CountryUtils.resolve("Gallia-7", lambda text: None) is None
+
+
+def test_failed_translations_are_not_cached():
+    answers = iter([RuntimeError("offline"), "Peru"])
+
+    def translate(text):
+        answer = next(answers)
+        if isinstance(answer, Exception):
+            raise answer
+        return answer
+
+    assert CountryUtils.resolve("Incaland-3", translate) is None
+    assert CountryUtils.resolve("Incaland-3", translate) == "PE"
+
+
+def test_table_is_built_once_and_clean():
+    table = CountryUtils.table()
+    assert table is CountryUtils.table()
+    assert isinstance(table, tuple)
+    assert all('"' not in country.name for country in table)
+    assert CountryUtils.categories().categories.tolist() == [country.name for country in table]
+
+
+def test_country_column_is_categorical_and_reproducible():
+    a = CountryUtils.country_column(np.random.default_rng(5), 1000)
+    b = CountryUtils.country_column(np.random.default_rng(5), 1000)
+    assert isinstance(a, pd.Categorical)
+    assert a.tolist() == b.tolist()
+    assert set(a) <= {country.name for country in CountryUtils.table()}
+
+
+def test_country_column_weights_by_name_or_code():
+    col = CountryUtils.country_column(np.random.default_rng(0), 4000, {"España": 3, "fr": 1, "UK": 0})
+    counts = pd.Series(col).value_counts()
+    assert set(counts[counts > 0].index) == {"Spain", "France"}
+    assert 2.5 < counts["Spain"] / counts["France"] < 3.5
+
+
+def test_country_column_invalid_weights():
+    with pytest.raises(ValueError):
+        CountryUtils.probabilities({"Atlantis": 1})
+    with pytest.raises(ValueError):
+        CountryUtils.probabilities({"ES": 0})
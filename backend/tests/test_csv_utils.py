@@ -0,0 +1,52 @@
+import numpy as np
+import pandas as pd
+
+from backend.utils.csv_utils import CSVUtils
+
+
+def _write_csv(tmp_path, rows=1000):
+    df = pd.DataFrame({
+        "kind": ["a", "b", "c", "d"] * (rows // 4),
+        "amount": np.arange(rows),
+        "price": np.linspace(0, 1, rows),
+        "name": [f"n{i}" for i in range(rows)],
+    })
+    path = tmp_path / "in.csv"
+    df.to_csv(path, index=False)
+    return path, df
+
+
+def test_sniff_dtypes_marks_low_cardinality_text(tmp_path):
+    path, _ = _write_csv(tmp_path)
+    assert CSVUtils.sniff_dtypes(str(path)) == {"kind": "category"}
+
+
+def test_downcast_integers_and_lossless_floats():
+    df = CSVUtils.downcast(pd.DataFrame({"i": [1, 2, 3], "f": [0.5, 1.5, 2.0], "g": [0.1, 0.2, 0.3]}))
+    assert df["i"].dtype == np.int8
+    assert df["f"].dtype == np.float32
+    assert df["g"].dtype == np.float64
+
+
+def test_reservoir_sample_size_order_and_total(tmp_path):
+    path, original = _write_csv(tmp_path)
+    sample, total = CSVUtils.reservoir_sample(str(path), 100, chunk_size=64, random_state=1)
+    assert total == len(original)
+    assert len(sample) == 100
+    assert sample["amount"].is_monotonic_increasing
+    assert sample["kind"].dtype == object
+    again, _ = CSVUtils.reservoir_sample(str(path), 100, chunk_size=64, random_state=1)
+    assert sample.equals(again)
+
+
+def test_reservoir_sample_small_file_returns_everything(tmp_path):
+    path, original = _write_csv(tmp_path, rows=40)
+    sample, total = CSVUtils.reservoir_sample(str(path), 100)
+    assert total == 40
+    assert sample["amount"].tolist() == original["amount"].tolist()
+
+
+def test_iter_text_adds_trailing_newline(tmp_path):
+    path = tmp_path / "raw.csv"
+    path.write_text("a,b\n1,2", encoding="utf-8")
+    assert "".join(CSVUtils.iter_text(str(path), block_size=3)) == "a,b\n1,2\n"
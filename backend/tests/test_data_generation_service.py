@@ -0,0 +1,397 @@
+import io
+import json
+import logging
+import threading
+
+import pandas as pd
+import pytest
+
+from backend.services import data_generation_service
+from backend.services.data_generation_service import DataGenerationService, _LLMRowWriter
+
+
+@pytest.fixture
+def service():
+    return DataGenerationService(None, None, logging.getLogger("test"))
+
+
+def read_csv(chunks) -> pd.DataFrame:
+    return pd.read_csv(io.StringIO("".join(chunks)), encoding="utf-8-sig", dtype=str)
+
+
+def test_foreign_keys_reference_ids_of_the_same_config(service):
+    config = {"columns": {
+        "user_id": {"type": "string", "values": ["U1"], "id_format": "ulid"},
+        "owner_id": {"type": "string", "references": {"column": "user_id", "rows": 10}},
+        "row_id": {"type": "int", "min": 1, "max": 9},
+        "parent_row": {"type": "int", "references": {"column": "row_id", "rows": 20}},
+    }}
+    df = read_csv(service.iter_csv_from_config(config, False, False, 100, seed=1))
+
+    assert set(df["owner_id"]) <= set(df["user_id"].head(10))
+    assert set(df["parent_row"]) <= set(df["row_id"].head(20))
+    assert df["parent_row"].str.isdigit().all()
+
+
+def test_self_references_only_point_at_generated_ids(service):
+    config = {"columns": {
+        "employee_id": {"type": "string", "values": ["E001"], "semantic": "id"},
+        "manager_id": {"type": "string", "references": {"column": "employee_id", "rows": 1000}},
+    }}
+    df = read_csv(service.iter_csv_from_config(config, False, False, 30, seed=2))
+
+    assert set(df["manager_id"]) <= set(df["employee_id"])
+
+
+def test_foreign_key_to_a_non_id_column_is_rejected(service):
+    config = {"columns": {
+        "status": {"type": "string", "values": ["new", "paid"], "semantic": "text"},
+        "ref": {"type": "string", "references": {"column": "status", "rows": 2}},
+    }}
+    with pytest.raises(ValueError):
+        service.iter_csv_from_config(config, False, False, 10, seed=1)
+
+
+class StubTranslator:
+    def __init__(self, translations=None):
+        self.translations = translations or {}
+        self.calls = []
+
+    def translate_batch(self, texts, target_language="en"):
+        self.calls.append(list(texts))
+        return [self.translations.get(text) for text in texts]
+
+
+class StubJSONGeneration:
+    def __init__(self, config):
+        self.config = config
+        self.stored = []
+
+    def create_response_final(self, theme, json_example, use_cache=True, **params):
+        return json.loads(json.dumps(self.config))
+
+    def store_config(self, theme, json_example, config_dict, **params):
+        self.stored.append(config_dict)
+
+
+def test_clear_cut_columns_do_not_call_the_translator():
+    translator = StubTranslator()
+    service = DataGenerationService(translator, None, logging.getLogger("test"))
+    assert service.classify_column("origin", ["Spain", "France", "Germany", "Qwerty"]) == 'country'
+    assert service.classify_column("colour", ["red", "green", "blue"]) == 'text'
+    assert translator.calls == []
+
+
+def test_borderline_columns_are_translated_once():
+    translator = StubTranslator({"Zorgland": "Germany", "Blorvia": "Spain"})
+    service = DataGenerationService(translator, None, logging.getLogger("test"))
+    assert service.classify_column("origin", ["France", "Zorgland", "Blorvia", "Qwerty"]) == 'country'
+    assert translator.calls == [["Zorgland", "Blorvia", "Qwerty"]]
+
+
+def test_id_column_names_win_over_countries(service):
+    assert service.classify_column("country_id", ["Spain", "France"]) == 'id'
+
+
+def test_without_country_detection_undecided_columns_stay_unclassified(service):
+    assert service.classify_column("origin", ["Spain", "France"], detect_countries=False) is None
+    config = {"columns": {"origin": {"type": "string", "values": ["Spain", "France"]}}}
+    assert 'semantic' not in service.classify_config(config, detect_countries=False)["columns"]["origin"]
+
+
+def test_classified_merlin_config_is_stored_and_reused():
+    translator = StubTranslator()
+    service = DataGenerationService(translator, None, logging.getLogger("test"))
+    config = {"columns": {
+        "origin": {"type": "string", "values": ["Spain", "France"]},
+        "age": {"type": "int", "min": 1, "max": 9},
+    }}
+    json_service = StubJSONGeneration(config)
+
+    classified = service.create_merlin_config("travel", json_service)
+    assert classified["columns"]["origin"]["semantic"] == 'country'
+    assert 'semantic' not in config["columns"]["origin"]
+    assert json_service.stored == [classified]
+
+    # A config that comes back classified is not classified (nor stored) again
+    json_service.config = classified
+    assert service.create_merlin_config("travel", json_service) == classified
+    assert len(json_service.stored) == 1
+
+
+class StubOpenAI:
+    """Answers every prompt with `rows_per_answer` new JSONL entries."""
+
+    def __init__(self, rows_per_answer=5):
+        self.rows_per_answer = rows_per_answer
+        self.prompts = []
+        self.cached = []
+        self._lock = threading.Lock()
+
+    def stream_chat_openai(self, prompt, use_cache=True, **params):
+        with self._lock:
+            start = len(self.prompts) * self.rows_per_answer
+            self.prompts.append(prompt)
+            self.cached.append(use_cache)
+        for n in range(start, start + self.rows_per_answer):
+            yield json.dumps({"id": n, "name": f"item {n}"}) + "\n"
+
+    def forget(self, prompt, **params):
+        pass
+
+
+def test_gold_reports_progress_per_batch(tmp_path):
+    service = DataGenerationService(None, StubOpenAI(), logging.getLogger("test"))
+    progress = []
+    path = str(tmp_path / "gold.csv")
+    service.generate_data_gold("tools", rows=20, output_file=path, batch_size=5, max_concurrency=1,
+                               progress_callback=progress.append)
+
+    assert progress[0] == 0.25 and progress[-1] == 1.0
+    assert len(progress) == 4 and progress == sorted(progress)
+    # Rows are not taken from the prompt cache unless asked for
+    assert not any(service.openai_service.cached)
+    assert len(pd.read_csv(path, encoding="utf-8-sig")) == 20
+
+
+def test_gold_stops_when_the_progress_callback_raises(tmp_path):
+    openai_service = StubOpenAI()
+    service = DataGenerationService(None, openai_service, logging.getLogger("test"))
+    path = tmp_path / "gold.csv"
+
+    class Cancelled(Exception):
+        pass
+
+    def cancel_after_two_batches(fraction):
+        if fraction >= 0.1:
+            raise Cancelled()
+
+    with pytest.raises(Cancelled):
+        service.generate_data_gold("tools", rows=100, output_file=str(path), batch_size=5, max_concurrency=1,
+                                   progress_callback=cancel_after_two_batches)
+    assert len(openai_service.prompts) < 20
+    assert not path.exists()
+
+
+def test_unknown_locales_fail_before_streaming(service):
+    config = {"columns": {
+        "who": {"type": "string", "values": ["Ana"], "semantic": "name", "locales": {"xx_XX": 1}},
+    }}
+    with pytest.raises(ValueError):
+        service.iter_csv_from_config(config, True, False, 10, seed=1)
+
+
+def test_country_weights_are_resolved_once_before_streaming(service, monkeypatch):
+    country_utils = data_generation_service.CountryUtils
+    probabilities = country_utils.probabilities
+    calls = []
+    monkeypatch.setattr(country_utils, "probabilities", lambda weights=None: calls.append(weights) or probabilities(weights))
+
+    config = {"columns": {
+        "origin": {"type": "string", "values": ["Spain"], "semantic": "country", "weights": {"ES": 3, "FR": 1}},
+    }}
+    df = read_csv(service.iter_csv_from_config(config, False, True, 25_000, seed=1, chunk_size=10_000))
+    assert set(df["origin"]) == {"Spain", "France"}
+    assert calls == [{"ES": 3, "FR": 1}]
+
+    config["columns"]["origin"]["weights"] = {"Atlantis": 1}
+    with pytest.raises(ValueError):
+        service.iter_csv_from_config(config, False, True, 10, seed=1)
+
+
+SHOP_TABLES = {"tables": {
+    "customers": {
+        "rows": 40,
+        "primary_key": "customer_id",
+        "columns": {
+            "customer_id": {"type": "string", "values": ["C1"], "id_format": "ulid"},
+            "city": {"type": "string", "values": ["Lima", "Quito"], "semantic": "text"},
+        },
+    },
+    "orders": {
+        "primary_key": "order_id",
+        "columns": {
+            "order_id": {"type": "int", "min": 1, "max": 9},
+            "customer_id": {"type": "string", "references": {
+                "table": "customers", "per_parent": {"distribution": "uniform", "min": 1, "max": 4},
+            }},
+        },
+    },
+    "items": {
+        "primary_key": "item_id",
+        "columns": {
+            "item_id": {"type": "string", "values": ["I1"], "id_format": "uuid4"},
+            "order_id": {"type": "int", "references": {
+                "table": "orders", "per_parent": {"distribution": "fixed", "count": 3},
+            }},
+            "quantity": {"type": "int", "min": 1, "max": 5},
+        },
+    },
+}}
+
+
+def test_multi_table_keys_and_children_per_parent(service, tmp_path):
+    outputs = service.generate_tables_from_config(SHOP_TABLES, False, False, 100, str(tmp_path), seed=3)
+    customers, orders, items = (
+        pd.read_csv(outputs[table][0], encoding="utf-8-sig", dtype=str) for table in ("customers", "orders", "items")
+    )
+
+    # Every foreign key is a primary key of its parent
+    assert customers["customer_id"].is_unique and orders["order_id"].is_unique
+    assert set(orders["customer_id"]) <= set(customers["customer_id"])
+    assert set(items["order_id"]) <= set(orders["order_id"])
+
+    # Children per parent follow each 'per_parent' distribution
+    per_customer = orders["customer_id"].value_counts().reindex(customers["customer_id"], fill_value=0)
+    assert per_customer.between(1, 4).all()
+    assert (items["order_id"].value_counts().reindex(orders["order_id"], fill_value=0) == 3).all()
+    assert outputs["orders"][1] == len(orders) == per_customer.sum()
+    assert outputs["items"][1] == len(items) == 3 * len(orders)
+
+
+def test_int_primary_keys_stay_numeric(service, tmp_path):
+    outputs = service.generate_tables_from_config(
+        SHOP_TABLES, False, False, 100, str(tmp_path), seed=3, output_format="parquet"
+    )
+    orders, items = (pd.read_parquet(outputs[table][0]) for table in ("orders", "items"))
+
+    assert orders["order_id"].tolist() == list(range(1, len(orders) + 1))
+    assert pd.api.types.is_integer_dtype(items["order_id"])
+    assert set(items["order_id"]) == set(orders["order_id"])
+
+
+def test_foreign_key_cycles_are_rejected(service, tmp_path):
+    config = {"tables": {
+        "a": {"primary_key": "id", "columns": {
+            "id": {"type": "int", "min": 1, "max": 9},
+            "b_id": {"type": "int", "references": {"table": "b"}},
+        }},
+        "b": {"primary_key": "id", "columns": {
+            "id": {"type": "int", "min": 1, "max": 9},
+            "a_id": {"type": "int", "references": {"table": "a"}},
+        }},
+    }}
+    with pytest.raises(ValueError, match="cycle"):
+        service.generate_tables_from_config(config, False, False, 10, str(tmp_path), seed=1)
+
+
+def test_process_pool_output_matches_a_single_worker(service, tmp_path):
+    config = {"columns": {
+        "order_id": {"type": "string", "values": ["ORD-000001"], "semantic": "id"},
+        "customer": {"type": "string", "values": ["Alice Smith"], "semantic": "name",
+                     "locales": {"en_US": 0.7, "es_ES": 0.3}},
+        "country": {"type": "string", "values": ["Spain"], "semantic": "country", "weights": {"ES": 2, "PT": 1}},
+        "amount": {"type": "float", "min": 1.0, "max": 99.0},
+        "ordered_on": {"type": "date", "start": "2020-01-01", "end": "2024-12-31"},
+    }}
+    outputs = []
+    for workers in (1, 2):
+        path = tmp_path / f"workers_{workers}.csv"
+        service.generate_data_from_config(config, True, True, 25_000, str(path), seed=11, chunk_size=10_000,
+                                          workers=workers)
+        outputs.append(path.read_bytes())
+
+    assert outputs[0] == outputs[1]
+    assert outputs[0].count(b"\n") == 25_001
+
+
+def test_same_seed_gives_the_same_rows_for_any_chunk_size(service):
+    config = {"columns": {
+        "user_id": {"type": "string", "values": ["U1"], "id_format": "ulid"},
+        "customer": {"type": "string", "values": ["Alice Smith"], "semantic": "name"},
+        "country": {"type": "string", "values": ["Spain"], "semantic": "country"},
+        "score": {"type": "float", "min": 0.0, "max": 1.0},
+        "active": {"type": "boolean"},
+    }}
+    outputs = {
+        chunk_size: "".join(service.iter_csv_from_config(config, True, True, 23_000, seed=5, chunk_size=chunk_size))
+        for chunk_size in (1, 10_000, 20_000, 50_000)
+    }
+    assert len(set(outputs.values())) == 1
+    other = "".join(service.iter_csv_from_config(config, True, True, 23_000, seed=6))
+    assert other != outputs[1]
+
+
+def test_seed_makes_countries_and_dates_reproducible(service):
+    config = {"columns": {
+        "country": {"type": "string", "values": ["Spain"], "semantic": "country"},
+        "joined_on": {"type": "date", "start": "2020-01-01", "end": "2020-12-31"},
+    }}
+
+    def rows(seed):
+        return "".join(service.iter_csv_from_config(config, False, True, 50, seed=seed))
+
+    assert rows(11) == rows(11) != rows(12)
+
+
+def test_llm_writer_pins_the_schema_from_the_first_object(tmp_path):
+    path = tmp_path / "rows.csv"
+    writer = _LLMRowWriter(str(path), 10, logging.getLogger("test"))
+    assert not path.exists()
+
+    writer.add({"id": 7, "name": "a", "price": 1})
+    writer.add({"price": 2, "name": "b", "id": 8})          # Same fields in another order
+    writer.add({"id": 9, "name": "c"})                      # Missing field
+    writer.add({"id": 10, "name": "d", "price": 3, "x": 0})  # Extra field
+    writer.add({"id": 7, "name": "a", "price": 1})          # Repeated: kept without merge
+    writer.close()
+
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    assert writer.schema == ["id", "name", "price"] and list(df.columns) == writer.schema
+    assert df.values.tolist() == [[7, "a", 1], [8, "b", 2], [7, "a", 1]]
+    assert (writer.count, writer.rejected) == (3, 2)
+
+
+def test_llm_writer_merge_drops_repeats_and_renumbers_ids(tmp_path):
+    path = tmp_path / "rows.csv"
+    writer = _LLMRowWriter(str(path), 3, logging.getLogger("test"), merge=True)
+    for obj in (
+        {"ID": 1, "name": "a"},
+        {"ID": 1, "name": "b"},
+        {"ID": 5, "name": "a"},     # Same row as the first once 'ID' is ignored
+        {"ID": 2, "name": "c"},
+        {"ID": 3, "name": "d"},     # Beyond `rows`
+    ):
+        writer.add(obj)
+    writer.close()
+
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    assert df.values.tolist() == [[1, "a"], [2, "b"], [3, "c"]]
+    assert (writer.count, writer.rejected) == (3, 1)
+
+
+def test_llm_writer_renumbers_ids_across_threads(tmp_path):
+    path = tmp_path / "rows.csv"
+    writer = _LLMRowWriter(str(path), 150, logging.getLogger("test"), merge=True)
+
+    def batch(start):
+        for n in range(start, start + 50):
+            writer.add({"id": 1, "name": f"item {n % 120}"})
+
+    threads = [threading.Thread(target=batch, args=(start,)) for start in range(0, 200, 50)]
+    for thread in threads:
+        thread.start()
+    for thread in threads:
+        thread.join()
+    writer.close()
+
+    df = pd.read_csv(path, encoding="utf-8-sig")
+    assert df["id"].tolist() == list(range(1, 121))
+    assert df["name"].is_unique and writer.rejected == 80
+
+
+def test_unseeded_augmentation_draws_new_rows(service, tmp_path):
+    from sdv.metadata import Metadata
+    from backend.services.synthesizers import SeededGaussianCopulaSynthesizer
+
+    df = pd.DataFrame({"age": [20 + i % 30 for i in range(90)], "score": [i / 7 for i in range(90)]})
+    path = tmp_path / "in.csv"
+    df.to_csv(path, index=False)
+    synthesizer = SeededGaussianCopulaSynthesizer(Metadata.detect_from_dataframe(df))
+    synthesizer.fit(df)
+
+    def augmented(seed=None):
+        return "".join(service.iter_augmented_csv(str(path), synthesizer, 20, seed=seed))
+
+    assert augmented() != augmented()
+    assert augmented(seed=3) == augmented(seed=3)
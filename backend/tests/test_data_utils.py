@@ -67,7 +67,7 @@ def test_generate_ids_pattern():
 
 def test_generate_ids_no_digits():
     result = DataUtils.generate_ids("abc", 3)
-    assert result == ["abc", "abc", "abc"]
+    assert result == ["abc1", "abc2", "abc3"]
 
 # Tests for generate_random_date
 
@@ -88,3 +88,9 @@ def test_generate_country_reproducible(monkeypatch):
     dummy_list = [DummyCountry("TestLand")]
     monkeypatch.setattr(random, "choice", lambda x: dummy_list[0])
     assert DataUtils.generate_country() == "TestLand"
+
+
+def test_generate_ids_offset_continues_sequence():
+    first = DataUtils.generate_ids("item01A", 2)
+    second = DataUtils.generate_ids("item01A", 2, offset=2)
+    assert first + second == ["item01A", "item02A", "item03A", "item04A"]
@@ -0,0 +1,59 @@
+import uuid
+
+import numpy as np
+import pytest
+
+from backend.utils.id_utils import IdUtils
+
+
+def test_sequence_templates():
+    assert IdUtils.sequence("INV-0098", 3).tolist() == ["INV-0001", "INV-0002", "INV-0003"]
+    assert IdUtils.sequence("2023-A01b", 2).tolist() == ["2023-A01b", "2023-A02b"]
+    assert IdUtils.sequence("abc", 2, offset=9).tolist() == ["abc10", "abc11"]
+
+
+def test_sequence_grows_past_template_width():
+    assert IdUtils.sequence("X-9", 3, offset=8).tolist() == ["X-9", "X-10", "X-11"]
+
+
+@pytest.mark.parametrize("id_format", IdUtils.FORMATS)
+def test_chunks_match_single_pass_and_are_unique(id_format):
+    spec = {"id_format": id_format, "template": "usr_001", "key": IdUtils.key("user_id")}
+    whole = IdUtils.ids(spec, 5000)
+    chunks = np.concatenate([IdUtils.ids(spec, min(1234, 5000 - offset), offset) for offset in range(0, 5000, 1234)])
+    assert whole.tolist() == chunks.tolist()
+    assert len(set(whole.tolist())) == 5000
+
+
+def test_uuid_versions_and_ordering():
+    assert {uuid.UUID(value).version for value in IdUtils.ids({"id_format": "uuid4"}, 50)} == {4}
+    v7 = IdUtils.ids({"id_format": "uuid7", "timestamp": "2025-05-01T00:00:00"}, 50).tolist()
+    assert {uuid.UUID(value).version for value in v7} == {7}
+    assert v7 == sorted(v7)
+
+
+def test_ulid_format_and_monotonic():
+    ulids = IdUtils.ids({"id_format": "ulid"}, 100, offset=2 ** 40).tolist()
+    assert all(len(value) == 26 for value in ulids)
+    assert ulids == sorted(ulids)
+
+
+def test_hash_ids_keyed_permutation():
+    a = IdUtils.ids({"id_format": "hash", "key": 1}, 100)
+    b = IdUtils.ids({"id_format": "hash", "key": 2}, 100)
+    assert all(len(value) == IdUtils.HASH_LENGTH for value in a)
+    assert a.tolist() != b.tolist()
+    assert IdUtils.permute(np.arange(256, dtype=np.uint64), 8, 7).tolist() != list(range(256))
+    assert sorted(IdUtils.permute(np.arange(256, dtype=np.uint64), 8, 7).tolist()) == list(range(256))
+
+
+def test_foreign_keys_reference_parent_ids():
+    spec = {"id_format": "hash", "key": IdUtils.key("customer_id")}
+    parent = set(IdUtils.ids(spec, 20).tolist())
+    keys = IdUtils.foreign_keys(np.random.default_rng(0), spec, 20, 500)
+    assert set(keys.tolist()) <= parent
+
+
+def test_unknown_format():
+    with pytest.raises(ValueError):
+        IdUtils.ids({"id_format": "snowflake"}, 1)
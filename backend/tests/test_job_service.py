@@ -0,0 +1,118 @@
+import logging
+import os
+import time
+
+import pytest
+
+from backend.services import job_service
+from backend.services.job_service import JobService, JobQueueFullError
+
+
+class StubDataService:
+    """
+    Stands in for DataGenerationService in the worker processes: "slow"
+    themes report progress for a few seconds, "crash" kills the worker and
+    the rest finish at once.
+    """
+
+    def generate_data_merlin(self, theme, output_file, progress_callback, **kwargs):
+        if theme == "crash":
+            os._exit(1)
+        steps = 250 if theme == "slow" else 2
+        for step in range(steps):
+            progress_callback(step / steps)
+            time.sleep(0.02)
+        with open(output_file, "w", encoding="utf-8") as f:
+            f.write(f"theme\n{theme}\n")
+
+
+@pytest.fixture
+def make_service(tmp_path, monkeypatch):
+    # Workers are forked when the pool starts, so they inherit the stub
+    monkeypatch.setattr(job_service, "_worker_services", (None, StubDataService()))
+    services = []
+
+    def make(**kwargs):
+        service = JobService(logging.getLogger("test"), str(tmp_path / "jobs"), **kwargs)
+        services.append(service)
+        return service
+
+    yield make
+    for service in services:
+        service.shutdown()
+
+
+def wait_for(service, job_id, *statuses, timeout=20):
+    deadline = time.time() + timeout
+    while time.time() < deadline:
+        job = service.get(job_id)
+        if job is None or job["status"] in statuses:
+            return job
+        time.sleep(0.02)
+    raise AssertionError(f"Job {job_id} did not reach {statuses}: {service.get(job_id)}")
+
+
+def test_submitted_job_produces_its_result(make_service):
+    service = make_service(max_workers=1)
+    job_id = service.submit("merlin", {"theme": "cars"})
+
+    job = wait_for(service, job_id, JobService.DONE, JobService.FAILED)
+    assert job["status"] == JobService.DONE
+    assert job["progress"] == 1.0
+    with open(service.result_path(job_id), encoding="utf-8") as f:
+        assert f.read() == "theme\ncars\n"
+
+
+def test_cancel_queued_and_running_jobs(make_service):
+    service = make_service(max_workers=1)
+    running = service.submit("merlin", {"theme": "slow"})
+    queued = service.submit("merlin", {"theme": "cars"})
+    assert service.get(queued)["queue_position"] == 1
+
+    assert service.cancel(queued)
+    assert service.get(queued)["status"] == JobService.CANCELLED
+
+    # The worker stops at its next progress report
+    wait_for(service, running, JobService.RUNNING)
+    while service.get(running)["progress"] == 0.0:
+        time.sleep(0.02)
+    assert service.cancel(running)
+    job = wait_for(service, running, JobService.CANCELLED, JobService.DONE, JobService.FAILED)
+    assert job["status"] == JobService.CANCELLED
+    assert job["finished_at"] - job["started_at"] < 4
+    assert service.result_path(running) is None
+    assert not service.cancel(running)
+
+
+def test_full_queue_rejects_new_jobs(make_service):
+    service = make_service(max_workers=1, max_queue=1)
+    service.submit("merlin", {"theme": "slow"})
+    service.submit("merlin", {"theme": "cars"})
+
+    with pytest.raises(JobQueueFullError):
+        service.submit("merlin", {"theme": "cars"})
+
+
+def test_expired_jobs_are_purged_with_their_result(make_service):
+    service = make_service(max_workers=1, result_ttl=0)
+    job_id = service.submit("merlin", {"theme": "cars"})
+    wait_for(service, job_id, JobService.DONE)
+    path = service.result_path(job_id)
+    assert os.path.exists(path)
+
+    service.submit("merlin", {"theme": "cars"})
+    assert service.get(job_id) is None
+    assert not os.path.exists(path)
+
+
+def test_a_dead_worker_fails_its_job_and_the_pool_is_replaced(make_service):
+    service = make_service(max_workers=1)
+    crashed = service.submit("merlin", {"theme": "crash"})
+    queued = service.submit("merlin", {"theme": "cars"})
+
+    job = wait_for(service, crashed, JobService.DONE, JobService.FAILED)
+    assert job["status"] == JobService.FAILED
+    assert "Worker process died" in job["error"]
+    assert wait_for(service, queued, JobService.DONE, JobService.FAILED)["status"] == JobService.DONE
+    later = service.submit("merlin", {"theme": "cars"})
+    assert wait_for(service, later, JobService.DONE, JobService.FAILED)["status"] == JobService.DONE
@@ -3,7 +3,9 @@
 import pytest
 import logging
 import csv
-from backend.utils.json_utils import JSONUtils
+import json
+import random
+from backend.utils.json_utils import JSONUtils, JSONScanner
 
 def test_format_result_for_jsonl_basic():
     raw = "prefix {\"a\":1}\n\n{\"b\":2}\n suffix"
@@ -64,3 +66,99 @@ def test_jsonlist_to_csv_partial_invalid(tmp_path, caplog):
         rows = list(reader)
     assert rows == [{'k':'1'}]
     assert "JSON decode error" in caplog.text
+
+def test_iter_json_objects_across_chunk_boundaries():
+    text = 'Sure:\n```json\n{"a": 1, "s": "x}{\\"y"}\n{"a": 2, "n": N/A}\n{"broken": }\n```'
+    pieces = [text[i:i + 3] for i in range(0, len(text), 3)]
+    objects = list(JSONUtils.iter_json_objects(pieces))
+    assert objects == [{"a": 1, "s": 'x}{"y'}, {"a": 2, "n": "N/A"}]
+
+def test_iter_json_objects_yields_before_stream_ends():
+    def chunks():
+        yield '{"a": 1}\n{"a"'
+        raise RuntimeError("stream cut")
+    objects = JSONUtils.iter_json_objects(chunks())
+    assert next(objects) == {"a": 1}
+    with pytest.raises(RuntimeError):
+        next(objects)
+
+def _random_llm_output(rnd, count):
+    """Objetos con cadenas "difíciles" separados por texto suelto."""
+    alphabet = 'ab {}[]",:\\\n\té€😀'
+    noise = ['', 'Sure!\n', '```json\n', '\n```\n', 'Entry "x":\n', ']\n[', ', ']
+    objects, parts = [], []
+    for i in range(count):
+        obj = {
+            "id": i,
+            "text": ''.join(rnd.choice(alphabet) for _ in range(rnd.randint(0, 20))),
+            "nested": {"values": [rnd.random(), None, True]},
+        }
+        objects.append(obj)
+        parts.append(rnd.choice(noise))
+        parts.append(json.dumps(obj, ensure_ascii=rnd.random() < 0.5, indent=rnd.choice([None, 2])))
+    parts.append(rnd.choice(noise))
+    return objects, ''.join(parts)
+
+def test_scanner_fuzz_random_chunking():
+    for seed in range(50):
+        rnd = random.Random(seed)
+        objects, text = _random_llm_output(rnd, rnd.randint(1, 30))
+        cuts = sorted(rnd.sample(range(len(text) + 1), min(len(text), rnd.randint(0, 60))))
+        pieces = [text[a:b] for a, b in zip([0] + cuts, cuts + [len(text)])]
+        assert list(JSONUtils.iter_json_objects(pieces)) == objects
+        lines = JSONUtils.format_result_for_jsonl(text).splitlines()
+        assert [json.loads(line) for line in lines] == objects
+
+def test_scanner_lenient_repairs_outside_strings_only():
+    text = '{"a": N/A, "b": [1, 2,], "c": None, "d": "None, N/A,]", "e": True,}'
+    assert JSONScanner.parse(text) == {"a": "N/A", "b": [1, 2], "c": None, "d": "None, N/A,]", "e": True}
+    assert JSONScanner.parse(text, lenient=False) is None
+
+def test_scanner_keeps_unfinished_object_pending():
+    scanner = JSONScanner()
+    assert scanner.feed('{"a": "}\\') == []
+    assert scanner.pending
+    # La comilla va escapada: la cadena sigue abierta
+    assert scanner.feed('"}') == []
+    assert scanner.feed('"}') == ['{"a": "}\\"}"}']
+    assert not scanner.pending
+
+def test_extract_low_result_json_ignores_braces_in_strings():
+    raw = 'Config: {"columns": {"name": {"type": "string", "values": ["{x}"]}}} and {"other": 1}'
+    assert json.loads(JSONUtils.extract_low_result_json(raw)) == {"columns": {"name": {"type": "string", "values": ["{x}"]}}}
+
+def test_scanner_unclosed_braces_do_not_backtrack():
+    raw = "{" * 200_000
+    with pytest.raises(ValueError):
+        JSONUtils.format_result_for_jsonl(raw)
+
+def test_jsonlist_to_csv_unions_keys_and_keeps_gaps(tmp_path):
+    jsonl = ['{"a":1}', '{"a":2,"b":"x"}', '', '{"c":true}']
+    out_file = tmp_path / "union.csv"
+    assert JSONUtils.jsonlist_to_csv(jsonl, str(out_file), logging.getLogger("test")) == 3
+    with open(out_file, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.DictReader(f))
+    assert rows == [
+        {'a': '1', 'b': '', 'c': ''},
+        {'a': '2', 'b': 'x', 'c': ''},
+        {'a': '', 'b': '', 'c': 'True'},
+    ]
+
+def test_jsonlist_to_csv_pinned_schema_drops_extra_keys(tmp_path, caplog):
+    caplog.set_level(logging.WARNING)
+    jsonl = ['{"a":1,"b":2}', '{"b":3,"extra":4}']
+    out_file = tmp_path / "pinned.csv"
+    JSONUtils.jsonlist_to_csv(jsonl, str(out_file), logging.getLogger("test"), schema=["b", "a"])
+    with open(out_file, newline='', encoding='utf-8-sig') as f:
+        rows = list(csv.reader(f))
+    assert rows == [['b', 'a'], ['2', '1'], ['3', '']]
+    assert "extra" in caplog.text
+
+def test_jsonlist_to_csv_writes_parquet(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    jsonl = ['{"a":1,"b":"x"}', '{"a":2,"b":3}']
+    out_file = tmp_path / "out.parquet"
+    JSONUtils.jsonlist_to_csv(jsonl, str(out_file), logging.getLogger("test"))
+    table = pq.read_table(out_file)
+    assert table.column("a").to_pylist() == [1, 2]
+    assert table.column("b").to_pylist() == ["x", "3"]
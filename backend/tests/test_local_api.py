@@ -0,0 +1,217 @@
+import io
+import json
+import time
+
+import pandas as pd
+import pytest
+
+from services import job_service
+from backend.api.local_api import WebAPI
+from backend.tests.test_job_service import StubDataService
+
+
+@pytest.fixture
+def make_api(tmp_path, monkeypatch):
+    # Caches, uploads and job results go to the test's own directory
+    monkeypatch.setattr(WebAPI, "_tmp_dir", lambda self: str(tmp_path))
+    apis = []
+
+    def make(**kwargs):
+        api = WebAPI(log_file=str(tmp_path / "app.log"), **kwargs)
+        apis.append(api)
+        return api
+
+    yield make
+    for api in apis:
+        api.job_service.shutdown()
+
+
+@pytest.fixture
+def make_client(make_api):
+    return lambda **kwargs: make_api(**kwargs).app.test_client()
+
+
+def training_csv(rows=60) -> bytes:
+    df = pd.DataFrame({
+        "age": [20 + i % 30 for i in range(rows)],
+        "plan": [["basic", "pro", "team"][i % 3] for i in range(rows)],
+    })
+    return df.to_csv(index=False).encode("utf-8")
+
+
+def test_jobs_answer_429_when_the_queue_is_full(make_client):
+    client = make_client(job_queue_size=0)
+    response = client.post("/jobs", json={"generator_type": "merlin", "theme": "cars"})
+    assert response.status_code == 429
+    assert "full" in response.json["error"]
+
+
+def test_unknown_jobs_answer_404(make_client):
+    client = make_client()
+    assert client.get("/jobs/nope").status_code == 404
+    assert client.get("/jobs/nope/result").status_code == 404
+    assert client.delete("/jobs/nope").status_code == 404
+
+
+def test_job_lifecycle_over_http(make_client, monkeypatch):
+    # The API imports `services.job_service`; its workers inherit the stub when forked
+    monkeypatch.setattr(job_service, "_worker_services", (None, StubDataService()))
+    client = make_client(job_workers=1)
+
+    response = client.post("/jobs", json={"generator_type": "merlin", "theme": "cars"})
+    assert response.status_code == 202
+    status_url = response.json["status_url"]
+    deadline = time.time() + 20
+    while client.get(status_url).json["status"] != "done" and time.time() < deadline:
+        time.sleep(0.02)
+
+    result = client.get(client.get(status_url).json["result_url"])
+    assert result.status_code == 200
+    assert result.data == b"theme\ncars\n"
+    assert client.delete(status_url).status_code == 409
+
+    slow_url = client.post("/jobs", json={"generator_type": "merlin", "theme": "slow"}).json["status_url"]
+    assert client.delete(slow_url).json["status"] in ("cancelled", "running")
+    assert client.get(f"{slow_url}/result").status_code == 409
+
+
+def test_fitted_models_are_pinned_until_deleted(make_api):
+    api = make_api()
+    client = api.app.test_client()
+    response = client.post("/models", data={"generator_type": "gaussian", "file": (io.BytesIO(training_csv()), "in.csv")},
+                           content_type="multipart/form-data")
+    assert response.status_code == 201
+    sample_url = response.json["sample_url"]
+
+    # Unpinned entries beyond the limit are evicted, the fitted model is not
+    api.model_cache.max_entries = 1
+    for key in ("a", "b", "c"):
+        api.model_cache.put(key, object())
+    assert api.model_cache.stats()["entries"] == 2
+
+    def sample(**body):
+        return client.post(sample_url, json=body, buffered=True)
+
+    first, again, other = sample(rows=25, seed=7), sample(rows=25, seed=7), sample(rows=25, seed=8)
+    assert first.status_code == 200
+    assert len(pd.read_csv(io.BytesIO(first.data))) == 25
+    assert first.data == again.data != other.data
+    # Without a seed every call draws new rows
+    assert sample(rows=25).data != sample(rows=25).data
+
+    model_url = sample_url.rsplit("/", 1)[0]
+    assert client.delete(model_url).status_code == 204
+    assert sample(rows=5).status_code == 404
+    assert client.delete(model_url).status_code == 404
+
+
+def test_prompt_cache_is_opt_in_except_for_merlin():
+    assert WebAPI._use_cache("merlin", None)
+    assert not WebAPI._use_cache("gold", None)
+    assert not WebAPI._use_cache("real", None)
+    assert WebAPI._use_cache("gold", "true")
+    assert not WebAPI._use_cache("merlin", False)
+
+
+@pytest.mark.parametrize("seed", ["abc", -1, "-5", 1.5, True, [1], 2 ** 32, str(2 ** 40)])
+def test_invalid_seeds_answer_400(make_client, seed):
+    client = make_client()
+    response = client.post("/generate", json={"generator_type": "merlin", "theme": "cars", "seed": seed})
+    assert response.status_code == 400
+    assert "seed" in response.json["error"]
+    response = client.post("/jobs", json={"generator_type": "merlin", "theme": "cars", "seed": seed})
+    assert response.status_code == 400
+    response = client.post("/models/nope/sample", json={"seed": seed})
+    assert response.status_code == 400
+
+
+def test_seed_accepts_integers_and_numeric_text():
+    assert WebAPI._seed(None) is None and WebAPI._seed(" ") is None
+    assert WebAPI._seed("42") == 42 and WebAPI._seed(7) == 7 and WebAPI._seed(3.0) == 3
+    assert WebAPI._seed(2 ** 32 - 1) == 2 ** 32 - 1
+
+
+def test_largest_seed_reaches_sdv(make_client):
+    client = make_client()
+    response = client.post("/generate", data={
+        "generator_type": "gaussian", "rows": "5", "seed": str(2 ** 32 - 1),
+        "file": (io.BytesIO(training_csv()), "in.csv"),
+    }, content_type="multipart/form-data")
+    assert response.status_code == 200
+
+
+class StubJSONGeneration:
+    """Returns a fixed, already classified MERLIN config."""
+
+    CONFIG = {"columns": {
+        "customer": {"type": "string", "values": ["Ana Ruiz"], "semantic": "name"},
+        "country": {"type": "string", "values": ["Peru"], "semantic": "country"},
+        "age": {"type": "int", "min": 18, "max": 90},
+    }}
+
+    def create_response_final(self, theme, json_example, use_cache=True, **params):
+        return json.loads(json.dumps(self.CONFIG))
+
+
+def test_streamed_merlin_csv_starts_with_bom_and_header(make_api):
+    api = make_api()
+    api.json_gen_service = StubJSONGeneration()
+    response = api.app.test_client().post(
+        "/generate", json={"generator_type": "merlin", "theme": "customers", "rows": 30, "stream": True, "seed": 1},
+        buffered=True
+    )
+
+    assert response.status_code == 200
+    assert response.mimetype == "text/csv"
+    assert response.data.startswith("\ufeffcustomer,country,age\n".encode("utf-8"))
+    assert len(pd.read_csv(io.BytesIO(response.data), encoding="utf-8-sig")) == 30
+
+
+def test_streamed_gaussian_csv_keeps_the_original_and_removes_the_upload(make_api, tmp_path):
+    client = make_api().app.test_client()
+    original = b"\xef\xbb\xbf" + training_csv(40)
+    response = client.post("/generate", data={
+        "generator_type": "gaussian", "rows": "25", "stream": "true", "seed": "3",
+        "file": (io.BytesIO(original), "in.csv"),
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 200
+    assert json.loads(response.headers["X-Training-Report"])["training_rows"] == 40
+    # The upload is only needed while streaming: it goes away when the response is closed
+    assert list(tmp_path.glob("*_input.csv"))
+    body = response.get_data()
+    response.close()
+    assert not list(tmp_path.glob("*_input.csv"))
+
+    assert body.startswith(original)
+    assert body.count(b"age,plan") == 1
+    assert len(pd.read_csv(io.BytesIO(body), encoding="utf-8-sig")) == 40 + 25
+
+
+def test_failed_generation_removes_the_upload_and_the_partial_output(make_api, tmp_path):
+    api = make_api()
+
+    def fail(in_path, rows, out_path, **kwargs):
+        with open(out_path, "w") as f:
+            f.write("age\n")
+        raise RuntimeError("boom")
+
+    api.data_gen_service.generate_data_gaussian = fail
+    response = api.app.test_client().post("/generate", data={
+        "generator_type": "gaussian", "file": (io.BytesIO(training_csv()), "in.csv"),
+    }, content_type="multipart/form-data")
+
+    assert response.status_code == 500
+    assert not list(tmp_path.glob("gaussian_*"))
+
+
+def test_job_workers_use_the_web_app_caches(make_api, monkeypatch):
+    api = make_api()
+    monkeypatch.setattr(job_service, "_worker_services", None)
+    json_service, data_service = job_service._get_worker_services(
+        api.job_service.model_cache_dir, api.job_service.prompt_cache_path, api.job_service.translation_cache_path
+    )
+
+    assert data_service.translator_service.cache_path == api.translator_service.cache_path
+    assert data_service.openai_service.cache.db_path == api.prompt_cache.db_path
+    assert data_service.model_cache.cache_dir == api.model_cache.cache_dir
@@ -0,0 +1,111 @@
+import logging
+import multiprocessing
+
+import pandas as pd
+
+from backend.services.model_cache_service import ModelCacheService
+
+
+def _cache(tmp_path, **kwargs):
+    return ModelCacheService(logging.getLogger("test"), str(tmp_path / "models"), **kwargs)
+
+
+def _put_many(cache_dir: str, prefix: str, count: int = 10):
+    cache = ModelCacheService(logging.getLogger("test"), cache_dir, max_entries=100)
+    for i in range(count):
+        cache.put(f"{prefix}{i}", {"model": prefix, "i": i})
+
+
+def test_fingerprint_covers_data_type_and_params():
+    df = pd.DataFrame({"a": [1, 2, 3], "b": ["x", "y", "z"]})
+    key = ModelCacheService.fingerprint(df, "ctgan", {"epochs": 10})
+
+    assert key == ModelCacheService.fingerprint(df.copy(), "ctgan", {"epochs": 10})
+    assert key != ModelCacheService.fingerprint(df.assign(a=[1, 2, 4]), "ctgan", {"epochs": 10})
+    assert key != ModelCacheService.fingerprint(df.astype({"a": float}), "ctgan", {"epochs": 10})
+    assert key != ModelCacheService.fingerprint(df[["b", "a"]], "ctgan", {"epochs": 10})
+    assert key != ModelCacheService.fingerprint(df, "gaussian", {"epochs": 10})
+    assert key != ModelCacheService.fingerprint(df, "ctgan", {"epochs": 20})
+
+
+def test_least_recently_used_entries_are_evicted(tmp_path):
+    cache = _cache(tmp_path, max_entries=2)
+    cache.put("a", "model a")
+    cache.put("b", "model b")
+    assert cache.get("a") == "model a"
+
+    cache.put("c", "model c")
+    assert cache.get("b") is None
+    assert (cache.get("a"), cache.get("c")) == ("model a", "model c")
+    assert cache.stats()["evictions"] == 1
+
+
+def test_eviction_by_total_size_spares_pinned_entries(tmp_path):
+    cache = _cache(tmp_path, max_bytes=2500)
+    cache.put("pinned", b"p" * 1000, pinned=True)
+    cache.put("a", b"a" * 1000)
+    cache.put("b", b"b" * 1000)
+    cache.put("c", b"c" * 1000)
+
+    assert cache.get("a") is None
+    assert cache.get("pinned") == b"p" * 1000
+    stats = cache.stats()
+    assert (stats["entries"], stats["pinned"]) == (3, 1)
+
+    assert cache.remove("pinned") and not cache.remove("pinned")
+    assert cache.get("pinned") is None
+
+
+def test_unreadable_entries_are_dropped(tmp_path):
+    cache = _cache(tmp_path)
+    cache.put("a", "model a")
+    (tmp_path / "models" / "a.pkl").write_bytes(b"not a pickle")
+
+    assert cache.get("a") is None
+    assert cache.stats()["entries"] == 0
+
+
+def test_processes_share_the_index_and_the_counters(tmp_path):
+    cache_dir = str(tmp_path / "models")
+    processes = [multiprocessing.Process(target=_put_many, args=(cache_dir, prefix)) for prefix in "abcd"]
+    for process in processes:
+        process.start()
+    for process in processes:
+        process.join()
+
+    # No entry written by one process is lost by another rewriting the index
+    cache, other = _cache(tmp_path, max_entries=100), _cache(tmp_path, max_entries=100)
+    assert cache.stats()["entries"] == 40
+    assert cache.get("c7") == {"model": "c", "i": 7}
+    assert other.get("missing") is None
+    stats = other.stats()
+    assert (stats["hits"], stats["misses"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+
+# Caches by directory and the lock state seen each time an entry was unpickled
+_open_caches = {}
+_locks_held_while_loading = []
+
+
+def _record_locks(cache_dir):
+    cache = _open_caches[cache_dir]
+    _locks_held_while_loading.append((cache._lock.locked(), cache._file_lock.is_locked))
+    return "model"
+
+
+class _RecordsLocks:
+    def __init__(self, cache_dir):
+        self.cache_dir = cache_dir
+
+    def __reduce__(self):
+        return _record_locks, (self.cache_dir,)
+
+
+def test_models_are_unpickled_outside_the_locks(tmp_path):
+    cache = _cache(tmp_path)
+    _open_caches[cache.cache_dir] = cache
+    cache.put("a", _RecordsLocks(cache.cache_dir))
+
+    assert cache.get("a") == "model"
+    assert _locks_held_while_loading == [(False, False)]
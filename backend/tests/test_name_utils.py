@@ -0,0 +1,47 @@
+import numpy as np
+import pytest
+
+from backend.utils.name_utils import NameUtils
+
+
+def test_same_seed_same_names():
+    a = NameUtils.name_column(np.random.default_rng(3), 200)
+    b = NameUtils.name_column(np.random.default_rng(3), 200)
+    assert a.tolist() == b.tolist()
+    assert all(len(name.split(" ")) == 2 for name in a)
+
+
+def test_pools_reused_per_locale():
+    assert NameUtils.faker("es_ES") is NameUtils.faker("es_ES")
+    assert NameUtils.pools("es_ES") is NameUtils.pools("es_ES")
+
+
+def test_locale_mix_weights():
+    rng = np.random.default_rng(0)
+    col = NameUtils.name_column(rng, 2000, {"en_US": 1, "ja_JP": 3})
+    ja_last_names = set(NameUtils.distinct_pools("ja_JP")[1])
+    share = np.mean([name.split(" ")[0] in ja_last_names for name in col])
+    assert 0.65 < share < 0.85
+
+
+def test_parse_locales_invalid():
+    with pytest.raises(ValueError):
+        NameUtils.parse_locales({"en_US": 0})
+    with pytest.raises(ValueError):
+        NameUtils.parse_locales(["en_US", "xx_XX"])
+
+
+def test_unique_across_calls():
+    rng = np.random.default_rng(0)
+    seen = set()
+    a = NameUtils.name_column(rng, 1000, "ja_JP", unique=True, seen=seen)
+    b = NameUtils.name_column(rng, 1000, "ja_JP", unique=True, seen=seen)
+    names = a.tolist() + b.tolist()
+    assert len(set(names)) == 2000
+    assert seen == set(names)
+
+
+def test_unique_over_capacity():
+    capacity = NameUtils.capacity("ja_JP")
+    with pytest.raises(ValueError):
+        NameUtils.name_column(np.random.default_rng(0), capacity + 1, "ja_JP", unique=True)
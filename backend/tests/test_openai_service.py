@@ -0,0 +1,98 @@
+import logging
+
+import pytest
+
+from backend.services.openai_service import (
+    OpenAIService,
+    OpenAIServiceError,
+    OpenAIRateLimitError,
+    OpenAITimeoutError,
+    TokenBucket,
+)
+from backend.services.prompt_cache_service import PromptCacheService
+from backend.tests.openai_stub import StubOpenAIServer
+
+
+@pytest.fixture
+def stub():
+    with StubOpenAIServer() as server:
+        yield server
+
+
+def _service(stub, **kwargs):
+    kwargs.setdefault("backoff_base", 0.01)
+    return OpenAIService(logging.getLogger("test"), base_url=stub.base_url, api_key="test", **kwargs)
+
+
+def test_chat_returns_content(stub):
+    stub.enqueue(content="hello")
+    assert _service(stub).chat_openai("hi") == "hello"
+    assert stub.requests[0]["messages"][-1]["content"] == "hi"
+
+
+def test_retries_server_errors_then_succeeds(stub):
+    stub.enqueue(status=500)
+    stub.enqueue(status=503)
+    stub.enqueue(content="ok")
+    assert _service(stub).chat_openai("hi") == "ok"
+    assert len(stub.requests) == 3
+
+
+def test_rate_limit_raises_typed_error_after_retries(stub):
+    for _ in range(3):
+        stub.enqueue(status=429, headers={"Retry-After": "0"})
+    with pytest.raises(OpenAIRateLimitError):
+        _service(stub, max_retries=2).chat_openai("hi")
+    assert len(stub.requests) == 3
+
+
+def test_client_errors_are_not_retried(stub):
+    stub.enqueue(status=400)
+    with pytest.raises(OpenAIServiceError) as info:
+        _service(stub).chat_openai("hi")
+    assert info.value.status_code == 400
+    assert len(stub.requests) == 1
+
+
+def test_deadline_raises_timeout(stub):
+    stub.enqueue(content="late", delay=1.0)
+    with pytest.raises(OpenAITimeoutError):
+        _service(stub).chat_openai("hi", timeout=0.3)
+
+
+def test_token_bucket_reserve_reports_wait():
+    now = [0.0]
+    bucket = TokenBucket(60, capacity=2, clock=lambda: now[0])
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == 0.0
+    assert bucket.reserve(1) == pytest.approx(1.0)
+    now[0] = 3.0
+    assert bucket.reserve(1) == 0.0
+
+
+def test_prompt_cache_skips_repeated_calls(stub):
+    cache = PromptCacheService(logging.getLogger("test"))
+    service = _service(stub, cache=cache)
+    stub.enqueue(content="first")
+    stub.enqueue(content="second")
+    assert service.chat_openai("hi") == "first"
+    assert service.chat_openai("hi") == "first"
+    assert service.chat_openai("hi", use_cache=False) == "second"
+    assert len(stub.requests) == 2
+
+    service.forget("hi")
+    assert service.chat_openai("hi") == "hi"
+    assert cache.stats()["hits"] == 1
+
+
+def test_stream_yields_pieces_and_caches_full_answer():
+    with StubOpenAIServer(stream_chunk_size=4) as stub:
+        cache = PromptCacheService(logging.getLogger("test"))
+        service = _service(stub, cache=cache)
+        stub.enqueue(status=503)
+        stub.enqueue(content="streamed answer")
+        pieces = list(service.stream_chat_openai("hi"))
+        assert pieces[0] == "stre"
+        assert "".join(pieces) == "streamed answer"
+        assert list(service.stream_chat_openai("hi")) == ["streamed answer"]
+        assert len(stub.requests) == 2
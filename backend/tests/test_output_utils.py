@@ -0,0 +1,93 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+import pytest
+
+from backend.utils.output_utils import OutputUtils
+
+
+def test_normalize_format_and_aliases():
+    assert OutputUtils.normalize_format(None) == "csv"
+    assert OutputUtils.normalize_format("Parquet") == "parquet"
+    assert OutputUtils.normalize_format("zstd") == "csv.zst"
+    assert OutputUtils.normalize_format(".csv.gz") == "csv.gz"
+    assert OutputUtils.normalize_format("feather") == "arrow"
+    with pytest.raises(ValueError):
+        OutputUtils.normalize_format("xlsx")
+
+
+def test_format_of_uses_the_longest_extension():
+    assert OutputUtils.format_of("out/merlin_1.csv.gz") == "csv.gz"
+    assert OutputUtils.format_of("out/merlin_1.csv") == "csv"
+    assert OutputUtils.format_of("out/merlin_1.arrow") == "arrow"
+
+
+@pytest.mark.parametrize("output_format", ["csv", "csv.gz", "csv.zst"])
+def test_compressed_csv_round_trip(tmp_path, output_format):
+    chunks = ["\ufeffa,b\n", "1,x\n", "2,y\n"]
+    path = str(tmp_path / f"out{OutputUtils.extension(output_format)}")
+    OutputUtils.write_csv(iter(chunks), path, output_format)
+
+    compression = OutputUtils.CSV_COMPRESSION.get(output_format)
+    stream = pa.CompressedInputStream(path, compression) if compression else open(path, "rb")
+    with stream:
+        assert stream.read().decode("utf-8") == "".join(chunks)
+
+
+def test_parquet_keeps_config_types_in_row_groups(tmp_path):
+    schema = OutputUtils.config_schema({
+        "name": "string", "age": "int", "score": "float", "active": "boolean", "joined": "date",
+    })
+    df = pd.DataFrame({
+        "name": pd.Categorical(["Ana", "Luis"]),
+        "age": [30, 41],
+        "score": [1.5, 2.25],
+        "active": [True, False],
+        "joined": pd.to_datetime(["2020-01-02", "2021-03-04"]),
+    })
+    path = str(tmp_path / "out.parquet")
+    rows = OutputUtils.write_tables(
+        (OutputUtils.to_table(df, schema) for _ in range(3)), path, "parquet", schema
+    )
+
+    assert rows == 6
+    parquet = pq.ParquetFile(path)
+    assert parquet.num_row_groups == 3
+    assert parquet.schema_arrow == schema
+    assert parquet.read().column("joined").to_pylist()[1].isoformat() == "2021-03-04"
+
+
+def test_to_table_coerces_text_values():
+    schema = pa.schema([("n", pa.int64()), ("flag", pa.bool_()), ("when", pa.timestamp("us"))])
+    df = pd.DataFrame({"n": ["1", "x"], "flag": ["True", "no"], "when": ["2020-01-01", "bad"]})
+    table = OutputUtils.to_table(df, schema)
+    assert table.column("n").to_pylist() == [1, None]
+    assert table.column("flag").to_pylist() == [True, False]
+    assert table.column("when").null_count == 1
+
+
+def test_metadata_schema_falls_back_to_sample_types():
+    columns = {
+        "age": {"sdtype": "numerical", "computer_representation": "Int64"},
+        "price": {"sdtype": "numerical"},
+        "size": {"sdtype": "categorical"},
+        "city": {"sdtype": "categorical"},
+        "born": {"sdtype": "datetime", "datetime_format": "%Y-%m-%d"},
+    }
+    sample = pd.DataFrame({"age": [1], "price": [2.5], "size": [3], "city": ["Lima"], "born": ["2000-01-01"]})
+    schema = OutputUtils.metadata_schema(columns, sample)
+    assert [field.type for field in schema] == [
+        pa.int64(), pa.float64(), pa.int64(), pa.string(), pa.timestamp("us")
+    ]
+
+
+def test_convert_csv_to_arrow(tmp_path):
+    csv_path = tmp_path / "rows.csv"
+    csv_path.write_text("\ufeffid,name,price\n1,Ana,2.5\n2,Luis,3\n", encoding="utf-8")
+    path = str(tmp_path / "rows.arrow")
+    OutputUtils.convert_csv(str(csv_path), path, "arrow")
+
+    with pa.ipc.open_file(path) as reader:
+        table = reader.read_all()
+    assert table.schema.types == [pa.int64(), pa.string(), pa.float64()]
+    assert table.column("name").to_pylist() == ["Ana", "Luis"]
@@ -0,0 +1,66 @@
+import logging
+
+from backend.services.prompt_cache_service import PromptCacheService
+
+
+MESSAGES = [{"role": "user", "content": "Generate  a config\nfor cars"}]
+
+
+def _cache(tmp_path=None, **kwargs):
+    db_path = str(tmp_path / "prompts.sqlite3") if tmp_path else None
+    return PromptCacheService(logging.getLogger("test"), db_path, **kwargs)
+
+
+def test_key_normalises_whitespace_and_includes_params():
+    key = PromptCacheService.make_key("m", MESSAGES)
+    same = PromptCacheService.make_key("m", [{"role": "user", "content": "Generate a config for cars "}])
+    assert key == same
+    assert key != PromptCacheService.make_key("m", MESSAGES, {"temperature": 0.2})
+    assert key != PromptCacheService.make_key("other", MESSAGES)
+
+
+def test_memory_hit_counts_saved_latency():
+    cache = _cache()
+    key = cache.make_key("m", MESSAGES)
+    assert cache.get(key) is None
+    cache.put(key, "answer", elapsed=1.5)
+    assert cache.get(key) == "answer"
+    stats = cache.stats()
+    assert (stats["hits"], stats["misses"], stats["saved_seconds"]) == (1, 1, 1.5)
+
+
+def test_memory_tier_is_lru_bounded():
+    cache = _cache(max_entries=2)
+    for key in ("a", "b", "c"):
+        cache.put(key, key, elapsed=0.1)
+    assert cache.get("a") is None
+    assert cache.get("c") == "c"
+
+
+def test_disk_tier_is_shared_between_instances(tmp_path):
+    _cache(tmp_path).put("k", "answer", elapsed=2.0)
+    other = _cache(tmp_path)
+    assert other.get("k") == "answer"
+    assert other.stats()["disk_hits"] == 1
+
+
+def test_expired_and_discarded_entries_are_misses(tmp_path):
+    cache = _cache(tmp_path, ttl=-1)
+    cache.put("k", "answer", elapsed=1.0)
+    assert cache.get("k") is None
+
+    cache = _cache(tmp_path)
+    cache.put("k", "answer", elapsed=1.0)
+    cache.discard("k")
+    assert cache.get("k") is None
+    assert _cache(tmp_path).get("k") is None
+
+
+def test_replace_keeps_latency_and_reaches_disk(tmp_path):
+    cache = _cache(tmp_path)
+    key = cache.make_key("m", MESSAGES)
+    cache.put(key, "raw answer", elapsed=2.0)
+    cache.replace(key, "classified answer")
+    assert cache.get(key) == "classified answer"
+    assert cache.stats()["saved_seconds"] == 2.0
+    assert _cache(tmp_path).get(key) == "classified answer"
@@ -0,0 +1,78 @@
+import time
+
+import pandas as pd
+import pytest
+from sdv.metadata import Metadata
+
+from backend.services.synthesizers import SeededGaussianCopulaSynthesizer, TimeBoundedCTGANSynthesizer
+
+
+def _fit(df: pd.DataFrame) -> SeededGaussianCopulaSynthesizer:
+    synthesizer = SeededGaussianCopulaSynthesizer(Metadata.detect_from_dataframe(df))
+    synthesizer.fit(df)
+    return synthesizer
+
+
+def test_set_random_state_makes_sampling_reproducible():
+    df = pd.DataFrame({"age": [20 + i % 30 for i in range(90)], "score": [i / 7 for i in range(90)]})
+    synthesizer = _fit(df)
+
+    synthesizer.set_random_state(4)
+    first = synthesizer.sample(20)
+    synthesizer.set_random_state(4)
+    pd.testing.assert_frame_equal(synthesizer.sample(20), first)
+    synthesizer.set_random_state(5)
+    assert not synthesizer.sample(20).equals(first)
+
+
+def test_set_random_state_without_a_model():
+    # Only an ID and a PII column: SDV fits no model, sampling still works
+    df = pd.DataFrame({"id": range(40), "city": ["Lima", "Quito", "Cusco", "Cali"] * 10})
+    synthesizer = _fit(df)
+    synthesizer.set_random_state(1)
+    assert len(synthesizer.sample(5)) == 5
+
+
+def _ctgan_frame() -> pd.DataFrame:
+    return pd.DataFrame({
+        "age": [20 + i % 30 for i in range(200)],
+        "plan": [["basic", "pro", "team"][i % 3] for i in range(200)],
+    })
+
+
+def test_ctgan_stops_at_an_epoch_boundary_within_the_time_limit():
+    df = _ctgan_frame()
+    synthesizer = TimeBoundedCTGANSynthesizer(
+        Metadata.detect_from_dataframe(df), epochs=10_000, batch_size=100, time_limit=1.5, random_seed=0
+    )
+    started = time.perf_counter()
+    synthesizer.fit(df)
+    elapsed = time.perf_counter() - started
+
+    assert synthesizer.stopped_early
+    assert 0 < synthesizer.epochs_trained < 10_000
+    assert elapsed < 1.5 + 2.0
+    assert len(synthesizer.sample(10)) == 10
+
+
+def test_ctgan_without_time_limit_trains_every_epoch():
+    df = _ctgan_frame()
+    synthesizer = TimeBoundedCTGANSynthesizer(Metadata.detect_from_dataframe(df), epochs=3, batch_size=100)
+    synthesizer.fit(df)
+    assert (synthesizer.stopped_early, synthesizer.epochs_trained) == (False, 3)
+
+
+def test_ctgan_epoch_callback_can_stop_training_and_is_not_kept():
+    df = _ctgan_frame()
+    synthesizer = TimeBoundedCTGANSynthesizer(Metadata.detect_from_dataframe(df), epochs=50, batch_size=100)
+    reports = []
+
+    def stop_after_two(done, epochs):
+        reports.append((done, epochs))
+        if done == 2:
+            raise RuntimeError("cancelled")
+
+    with pytest.raises(RuntimeError, match="cancelled"):
+        synthesizer.fit(df, epoch_callback=stop_after_two)
+    assert reports == [(1, 50), (2, 50)]
+    assert synthesizer._model.epoch_callback is None
@@ -0,0 +1,49 @@
+import pandas as pd
+
+from backend.utils.training_utils import TrainingUtils
+
+
+def test_resolve_budget_defaults_and_batch_rounding():
+    budget = TrainingUtils.resolve_budget({"batch_size": 95, "epochs": None})
+    assert budget["batch_size"] == 100
+    assert budget["epochs"] == TrainingUtils.DEFAULT_BUDGET["epochs"]
+    assert budget["max_rows"] == 10000
+
+
+def test_stratify_columns_auto_picks_low_cardinality_categoricals():
+    df = pd.DataFrame({
+        "country": ["es", "fr"] * 50,
+        "name": [f"n{i}" for i in range(100)],
+        "amount": range(100),
+    })
+    assert TrainingUtils.stratify_columns(df) == ["country"]
+    assert TrainingUtils.stratify_columns(df, False) == []
+    assert TrainingUtils.stratify_columns(df, ["amount", "missing"]) == ["amount"]
+
+
+def test_subsample_small_frame_untouched():
+    df = pd.DataFrame({"a": range(5)})
+    assert TrainingUtils.subsample(df, 10) is df
+
+
+def test_subsample_stratified_keeps_rare_category():
+    df = pd.DataFrame({"kind": ["common"] * 999 + ["rare"], "v": range(1000)})
+    sample = TrainingUtils.subsample(df, 100, ["kind"], random_state=0)
+    assert len(sample) == 100
+    assert "rare" in set(sample["kind"])
+
+
+def test_subsample_trim_keeps_every_stratum():
+    # Every single-row stratum rounds up to one row, overshooting max_rows
+    kinds = ["common"] * 1000 + [f"rare{i}" for i in range(60)]
+    df = pd.DataFrame({"kind": kinds, "v": range(len(kinds))})
+    sample = TrainingUtils.subsample(df, 100, ["kind"], random_state=0)
+    assert len(sample) == 100
+    assert set(sample["kind"]) == set(kinds)
+
+
+def test_subsample_reproducible():
+    df = pd.DataFrame({"kind": ["a", "b", "c", "d"] * 250, "v": range(1000)})
+    first = TrainingUtils.subsample(df, 50, ["kind"], random_state=3)
+    second = TrainingUtils.subsample(df, 50, ["kind"], random_state=3)
+    assert first.index.equals(second.index)
@@ -0,0 +1,60 @@
+import logging
+
+import pytest
+
+from backend.services.translator_service import TranslatorService, TranslationError
+
+
+class StubBackend:
+    """Local backend: upper-cases texts, fails on texts containing 'fail'."""
+
+    def __init__(self):
+        self.calls = []
+
+    def translate_batch(self, texts, source, target):
+        self.calls.append(list(texts))
+        if any("fail" in text for text in texts):
+            raise RuntimeError("backend down")
+        return [f"{text.upper()}@{target}" for text in texts]
+
+
+def _service(backend, **kwargs):
+    return TranslatorService(logging.getLogger("test"), backend=backend, **kwargs)
+
+
+def test_batch_is_chunked_and_deduplicated():
+    backend = StubBackend()
+    service = _service(backend, batch_size=2)
+    result = service.translate_batch(["a", "b", "a", "c"])
+    assert result == ["A@en", "B@en", "A@en", "C@en"]
+    assert sorted(len(chunk) for chunk in backend.calls) == [1, 2]
+
+
+def test_memory_cache_avoids_repeated_requests():
+    backend = StubBackend()
+    service = _service(backend)
+    assert service.translate_text("hola") == "HOLA@en"
+    assert service.translate_text("hola") == "HOLA@en"
+    assert service.translate_text("hola", target_language="fr") == "HOLA@fr"
+    assert len(backend.calls) == 2
+
+
+def test_disk_cache_is_shared_between_instances(tmp_path):
+    path = str(tmp_path / "translations.sqlite3")
+    _service(StubBackend(), cache_path=path).translate_batch(["uno", "dos"])
+    backend = StubBackend()
+    assert _service(backend, cache_path=path).translate_batch(["dos", "tres"]) == ["DOS@en", "TRES@en"]
+    assert backend.calls == [["tres"]]
+
+
+def test_failures_return_none_and_are_not_cached():
+    backend = StubBackend()
+    service = _service(backend, batch_size=1)
+    assert service.translate_batch(["ok", "fail"]) == ["OK@en", None]
+    assert service.translate_text("fail") is None
+    assert backend.calls.count(["fail"]) == 2
+
+
+def test_failures_can_raise():
+    with pytest.raises(TranslationError):
+        _service(StubBackend(), raise_errors=True).translate_text("fail")
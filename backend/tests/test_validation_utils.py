@@ -58,3 +58,47 @@ def test_unknown_type():
     # Cualquier tipo no reconocido debe devolver False
     config = {"columns": {"col1": {"type": "mystery"}}}
     assert not ValidationUtils.validate_config_dict(config)
+
+@pytest.mark.parametrize("locales, expected", [
+    ({"en_US": 0.5, "es-ES": 0.5}, True),
+    ("de_DE", True),
+    ({"xx_XX": 1}, False),              # Locale inexistente en Faker
+    ({"en_US": "mucho"}, False),        # Peso no numérico
+    ({"en_US": None}, False),
+])
+def test_name_locales(locales, expected):
+    config = {"columns": {"who": {"type": "string", "values": ["Ana"], "semantic": "name", "locales": locales}}}
+    assert ValidationUtils.validate_config_dict(config) is expected
+
+def test_id_format_and_references():
+    ids = {"type": "string", "values": ["U1"], "id_format": "ulid"}
+    fk = {"type": "string", "references": {"column": "user_id", "rows": 10}}
+    assert ValidationUtils.validate_config_dict({"columns": {"user_id": ids, "owner_id": fk}})
+    assert not ValidationUtils.validate_config_dict({"columns": {"c": dict(ids, id_format="snowflake")}})
+    assert not ValidationUtils.validate_config_dict({"columns": {"c": {"type": "string", "references": {"rows": 0}}}})
+    assert not ValidationUtils.validate_config_dict({"columns": {"owner_id": fk}})
+    assert not ValidationUtils.validate_config_dict({"columns": {"user_id": dict(fk), "owner_id": fk}})
+
+def test_tables_config():
+    config = {"tables": {
+        "customers": {"rows": 10, "primary_key": "id", "columns": {"id": {"type": "string", "values": ["C1"]}}},
+        "orders": {"columns": {
+            "customer_id": {"type": "string", "references": {
+                "table": "customers", "per_parent": {"distribution": "poisson", "mean": 2}}},
+        }},
+    }}
+    assert ValidationUtils.validate_config_dict(config)
+
+    references = config["tables"]["orders"]["columns"]["customer_id"]["references"]
+    references["per_parent"] = {"distribution": "uniform", "min": 3, "max": 1}
+    assert not ValidationUtils.validate_config_dict(config)
+    references["per_parent"] = {"distribution": "fixed", "count": 2}
+    # 'per_parent' decides the child's rows, so 'rows' cannot be set as well
+    config["tables"]["orders"]["rows"] = 5
+    assert not ValidationUtils.validate_config_dict(config)
+    del config["tables"]["orders"]["rows"]
+    references["table"] = "suppliers"
+    assert not ValidationUtils.validate_config_dict(config)
+    references["table"] = "customers"
+    del config["tables"]["customers"]["primary_key"]
+    assert not ValidationUtils.validate_config_dict(config)
@@ -0,0 +1,63 @@
+import datetime
+import numpy as np
+import pandas as pd
+
+
+class ColumnUtils:
+    """
+    Utilidades vectorizadas para generar columnas completas de una sola vez
+    a partir de un numpy.random.Generator, en lugar de celda a celda.
+    """
+
+    @staticmethod
+    def int_column(rng: np.random.Generator, min_val, max_val, num_rows: int) -> np.ndarray:
+        """
+        Genera enteros uniformes en [min_val, max_val] (ambos incluidos).
+        """
+        return rng.integers(int(min_val), int(max_val), size=num_rows, endpoint=True)
+
+    @staticmethod
+    def float_column(
+        rng: np.random.Generator,
+        min_val,
+        max_val,
+        num_rows: int,
+        decimals: int = 2
+    ) -> np.ndarray:
+        """
+        Genera decimales uniformes en [min_val, max_val] redondeados a `decimals`.
+        """
+        return np.round(rng.uniform(float(min_val), float(max_val), size=num_rows), decimals)
+
+    @staticmethod
+    def boolean_column(rng: np.random.Generator, num_rows: int) -> np.ndarray:
+        """
+        Genera booleanos equiprobables.
+        """
+        return rng.integers(0, 2, size=num_rows, dtype=np.int8).astype(bool)
+
+    @staticmethod
+    def choice_column(rng: np.random.Generator, values: list, num_rows: int) -> pd.Categorical:
+        """
+        Elige uniformemente entre los valores dados y devuelve una columna
+        categórica (los valores repetidos conservan su peso).
+        """
+        value_codes, categories = pd.factorize(pd.Series(values, dtype=object))
+        picks = rng.integers(0, len(values), size=num_rows)
+        return pd.Categorical.from_codes(value_codes[picks], categories=categories)
+
+    @staticmethod
+    def date_column(rng: np.random.Generator, start_str: str, end_str: str, num_rows: int) -> np.ndarray:
+        """
+        Genera fechas uniformes entre dos fechas dadas (YYYY-MM-DD, ambas incluidas)
+        como un array datetime64[D]. Los límites se parsean una única vez y
+        la conversión a texto ISO se deja para el momento de escribir.
+        """
+        start = np.datetime64(datetime.datetime.strptime(start_str, '%Y-%m-%d').date(), 'D')
+        end = np.datetime64(datetime.datetime.strptime(end_str, '%Y-%m-%d').date(), 'D')
+        span = int((end - start) // np.timedelta64(1, 'D'))
+        if span < 0:
+            raise ValueError(f"Start date {start_str} is after end date {end_str}.")
+
+        offsets = rng.integers(0, span, size=num_rows, endpoint=True)
+        return start + offsets.astype('timedelta64[D]')
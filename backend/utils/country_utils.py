@@ -0,0 +1,218 @@
+import os
+import re
+import difflib
+import gettext
+import unicodedata
+from collections import namedtuple
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+import pycountry
+
+Country = namedtuple("Country", ["name", "alpha_2", "alpha_3"])
+
+
+class CountryUtils:
+    """
+    Detección de países sin conexión: un índice precalculado de nombres
+    (comunes, oficiales y traducidos a todos los idiomas de pycountry) y
+    búsqueda por nombre normalizado, con coincidencia aproximada como
+    respaldo. El traductor sólo se usa como último recurso y su resultado
+    se guarda en caché.
+
+    Para generar, una tabla inmutable de países construida una sola vez,
+    de la que se sacan columnas enteras con un único sorteo de índices.
+    """
+
+    # Nombres habituales que no están en los datos de pycountry
+    EXTRA_ALIASES = {
+        "UK": "GB", "Great Britain": "GB", "Britain": "GB",
+        "USA": "US", "US": "US", "America": "US",
+        "Russia": "RU", "South Korea": "KR", "North Korea": "KP",
+        "Ivory Coast": "CI", "Czech Republic": "CZ", "Macedonia": "MK",
+        "Turkey": "TR", "Palestine": "PS", "Brunei": "BN", "Cape Verde": "CV",
+        "Swaziland": "SZ", "Burma": "MM", "Holland": "NL", "East Timor": "TL",
+        "Vatican": "VA", "Vatican City": "VA", "Micronesia": "FM", "Vietnam": "VN",
+        "Laos": "LA", "Syria": "SY", "Iran": "IR", "Moldova": "MD", "Tanzania": "TZ",
+        "Congo-Kinshasa": "CD", "Congo-Brazzaville": "CG", "UAE": "AE",
+    }
+    # Similitud mínima (difflib) para aceptar una coincidencia aproximada
+    FUZZY_CUTOFF = 0.88
+    FUZZY_MIN_LENGTH = 5
+    MIN_TRANSLATED_LENGTH = 4
+    TRANSLATION_CACHE_SIZE = 65536
+    # Atributos de pycountry que se indexan
+    NAME_FIELDS = ("name", "official_name", "common_name")
+
+    _translation_cache = {}
+
+    @staticmethod
+    def normalize(text: str) -> str:
+        """
+        Minúsculas, sin acentos ni signos de puntuación y con espacios simples.
+        """
+        text = unicodedata.normalize("NFKD", str(text).casefold())
+        text = "".join(c for c in text if not unicodedata.combining(c))
+        text = re.sub(r"[^\w]+", " ", text).strip()
+        if text.startswith("the "):
+            text = text[4:]
+        return text
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def index() -> dict:
+        """
+        Nombre normalizado -> código alpha_2. Se construye una vez por proceso.
+        Los nombres en inglés tienen prioridad sobre las traducciones.
+        """
+        countries = list(pycountry.countries)
+        index = {}
+
+        def add(alias, code, min_length=1):
+            key = CountryUtils.normalize(alias)
+            if len(key) >= min_length:
+                index.setdefault(key, code)
+
+        for country in countries:
+            for field in CountryUtils.NAME_FIELDS:
+                value = getattr(country, field, None)
+                if value:
+                    add(value, country.alpha_2)
+                    # "Korea, Republic of" -> "Republic of Korea"
+                    if ", " in value:
+                        head, _, tail = value.partition(", ")
+                        add(f"{tail} {head}", country.alpha_2)
+        for alias, code in CountryUtils.EXTRA_ALIASES.items():
+            add(alias, code)
+
+        for language in CountryUtils._locale_languages():
+            translation = gettext.translation("iso3166-1", pycountry.LOCALES_DIR, languages=[language])
+            for country in countries:
+                for field in CountryUtils.NAME_FIELDS:
+                    value = getattr(country, field, None)
+                    if value:
+                        # Las traducciones muy cortas chocan con palabras comunes ("Man")
+                        add(translation.gettext(value), country.alpha_2, CountryUtils.MIN_TRANSLATED_LENGTH)
+        return index
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def table() -> tuple:
+        """
+        Tupla de Country(name, alpha_2, alpha_3) con los nombres ya limpios
+        (sin comillas). Se construye una vez por proceso.
+        """
+        return tuple(
+            Country(country.name.replace('"', ''), country.alpha_2, country.alpha_3)
+            for country in pycountry.countries
+        )
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def categories() -> pd.CategoricalDtype:
+        """
+        Tipo categórico con los nombres de la tabla, en el mismo orden.
+        """
+        return pd.CategoricalDtype([country.name for country in CountryUtils.table()])
+
+    @staticmethod
+    def probabilities(weights=None):
+        """
+        Vector de probabilidades alineado con table(), o None (uniforme).
+        `weights` es un dict {país: peso} o una lista de países (mismo
+        peso); los países se dan por nombre (en cualquier idioma) o código
+        y los que no aparecen no se generan. Así se pondera por población
+        o se restringe a una región.
+        """
+        if not weights:
+            return None
+        if not isinstance(weights, dict):
+            weights = dict.fromkeys(weights, 1)
+
+        positions = {country.alpha_2: i for i, country in enumerate(CountryUtils.table())}
+        alpha_3 = {country.alpha_3: country.alpha_2 for country in CountryUtils.table()}
+        p = np.zeros(len(positions))
+        for key, weight in weights.items():
+            text = str(key).strip().upper()
+            code = text if text in positions else alpha_3.get(text) or CountryUtils.resolve_offline(key)
+            if code is None or float(weight) < 0:
+                raise ValueError(f"Invalid country weight: {key!r}: {weight!r}")
+            p[positions[code]] += float(weight)
+        if p.sum() <= 0:
+            raise ValueError("Country weights must not all be zero.")
+        return p / p.sum()
+
+    @staticmethod
+    def country_column(rng: np.random.Generator, num_rows: int, weights=None, p=None) -> pd.Categorical:
+        """
+        Columna categórica de `num_rows` países sacados de table() con un
+        único sorteo de índices (ver probabilities para `weights`). Quien
+        genera por bloques pasa `p`, el vector ya calculado, en su lugar.
+        """
+        if p is None:
+            p = CountryUtils.probabilities(weights)
+        codes = rng.choice(len(CountryUtils.table()), size=num_rows, p=p)
+        return pd.Categorical.from_codes(codes, dtype=CountryUtils.categories())
+
+    @staticmethod
+    @lru_cache(maxsize=1)
+    def _english_keys() -> tuple:
+        return tuple(
+            CountryUtils.normalize(getattr(country, field))
+            for country in pycountry.countries
+            for field in CountryUtils.NAME_FIELDS
+            if getattr(country, field, None)
+        ) + tuple(CountryUtils.normalize(alias) for alias in CountryUtils.EXTRA_ALIASES)
+
+    @staticmethod
+    def _locale_languages() -> list:
+        languages = []
+        for language in sorted(os.listdir(pycountry.LOCALES_DIR)):
+            path = os.path.join(pycountry.LOCALES_DIR, language, "LC_MESSAGES", "iso3166-1.mo")
+            if os.path.exists(path):
+                languages.append(language)
+        return languages
+
+    @staticmethod
+    @lru_cache(maxsize=65536)
+    def resolve_offline(value: str):
+        """
+        Código alpha_2 del país que nombra `value` (en cualquier idioma de
+        pycountry), o None. Primero busca el nombre exacto normalizado y,
+        para textos largos, el nombre inglés más parecido.
+        """
+        key = CountryUtils.normalize(value)
+        if not key:
+            return None
+        index = CountryUtils.index()
+        code = index.get(key)
+        if code is not None or len(key) < CountryUtils.FUZZY_MIN_LENGTH:
+            return code
+        close = difflib.get_close_matches(key, CountryUtils._english_keys(), n=1, cutoff=CountryUtils.FUZZY_CUTOFF)
+        return index[close[0]] if close else None
+
+    @staticmethod
+    def resolve(value: str, translate_func=None):
+        """
+        Como resolve_offline, pero si no hay coincidencia y se da
+        `translate_func` traduce el texto al inglés y lo intenta de nuevo.
+        El resultado de cada traducción se guarda en caché por
+        (translate_func, value), así dos traductores no comparten
+        respuestas; si la traducción falla no se guarda nada.
+        """
+        code = CountryUtils.resolve_offline(value)
+        if code is not None or translate_func is None:
+            return code
+
+        cache = CountryUtils._translation_cache
+        key = (translate_func, value)
+        if key not in cache:
+            try:
+                translated = translate_func(value)
+            except Exception:
+                return None
+            if len(cache) >= CountryUtils.TRANSLATION_CACHE_SIZE:
+                cache.clear()
+            cache[key] = CountryUtils.resolve_offline(translated) if translated else None
+        return cache[key]
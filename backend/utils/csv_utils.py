@@ -0,0 +1,121 @@
+import numpy as np
+import pandas as pd
+
+
+class CSVUtils:
+    """
+    Utilidades para leer CSV grandes por bloques sin cargarlos enteros:
+    detección de tipos sobre una muestra, reducción de tipos numéricos,
+    muestreo de reservorio y copia en streaming del fichero original.
+    """
+
+    DEFAULT_CHUNK_SIZE = 100_000
+    SNIFF_ROWS = 10_000
+    # Un texto se carga como 'category' si tiene pocos valores distintos
+    CATEGORY_MAX_LEVELS = 1_000
+    CATEGORY_MAX_RATIO = 0.5
+
+    @staticmethod
+    def sniff_dtypes(path: str, sample_rows: int = SNIFF_ROWS) -> dict:
+        """
+        Lee las primeras `sample_rows` filas y devuelve el mapa de dtypes para
+        read_csv: las columnas de texto con baja cardinalidad como 'category'.
+        Las numéricas se dejan a pandas y se reducen después por bloque.
+        """
+        sample = pd.read_csv(path, nrows=sample_rows)
+        dtypes = {}
+        for column in sample.columns:
+            if sample[column].dtype != object:
+                continue
+            levels = sample[column].nunique(dropna=True)
+            if levels <= CSVUtils.CATEGORY_MAX_LEVELS and levels <= CSVUtils.CATEGORY_MAX_RATIO * len(sample):
+                dtypes[column] = 'category'
+        return dtypes
+
+    @staticmethod
+    def downcast(df: pd.DataFrame) -> pd.DataFrame:
+        """
+        Reduce los enteros al tipo más pequeño que los contiene y los decimales
+        a float32 sólo cuando no se pierde precisión.
+        """
+        for column in df.columns:
+            series = df[column]
+            if pd.api.types.is_integer_dtype(series):
+                df[column] = pd.to_numeric(series, downcast='integer')
+            elif pd.api.types.is_float_dtype(series) and series.dtype != np.float32:
+                as_float32 = series.astype(np.float32)
+                if np.array_equal(as_float32.to_numpy(np.float64), series.to_numpy(), equal_nan=True):
+                    df[column] = as_float32
+        return df
+
+    @staticmethod
+    def iter_chunks(path: str, chunk_size: int = DEFAULT_CHUNK_SIZE, dtypes: dict = None):
+        """
+        Itera el CSV en DataFrames de `chunk_size` filas con los tipos reducidos.
+        """
+        for chunk in pd.read_csv(path, chunksize=chunk_size, dtype=dtypes):
+            yield CSVUtils.downcast(chunk)
+
+    @staticmethod
+    def reservoir_sample(
+        path: str,
+        sample_size: int,
+        chunk_size: int = DEFAULT_CHUNK_SIZE,
+        random_state: int = 42
+    ):
+        """
+        Muestra uniforme sin reemplazo de `sample_size` filas leyendo el CSV
+        por bloques (se conservan las filas con menor clave aleatoria, así que
+        sólo hay en memoria el reservorio y un bloque).
+        Devuelve (muestra en el orden original del fichero, filas totales).
+        """
+        rng = np.random.default_rng(random_state)
+        dtypes = CSVUtils.sniff_dtypes(path)
+
+        reservoir = None
+        keys = None
+        total_rows = 0
+
+        for chunk in CSVUtils.iter_chunks(path, chunk_size, dtypes):
+            chunk.index = pd.RangeIndex(total_rows, total_rows + len(chunk))
+            total_rows += len(chunk)
+            chunk_keys = rng.random(len(chunk))
+
+            if reservoir is None:
+                candidates, candidate_keys = chunk, chunk_keys
+            else:
+                # Si las categorías de los bloques difieren, concat las pasa a texto
+                candidates = pd.concat([reservoir, chunk])
+                candidate_keys = np.concatenate([keys, chunk_keys])
+
+            if len(candidates) > sample_size:
+                keep = np.argpartition(candidate_keys, sample_size - 1)[:sample_size]
+                candidates, candidate_keys = candidates.iloc[keep], candidate_keys[keep]
+            reservoir, keys = candidates, candidate_keys
+
+        if reservoir is None:
+            return pd.read_csv(path, nrows=0), 0
+
+        order = np.argsort(reservoir.index.to_numpy(), kind='stable')
+        sample = reservoir.iloc[order].reset_index(drop=True)
+        for column in sample.columns:
+            if isinstance(sample[column].dtype, pd.CategoricalDtype):
+                sample[column] = sample[column].astype(object)
+        return sample, total_rows
+
+    @staticmethod
+    def iter_text(path: str, block_size: int = 1 << 20):
+        """
+        Itera el contenido del fichero en bloques de texto, tal cual, y
+        garantiza que termina en salto de línea para poder seguir añadiendo filas.
+        """
+        last = ''
+        with open(path, 'r', encoding='utf-8', newline='') as f:
+            while True:
+                block = f.read(block_size)
+                if not block:
+                    break
+                last = block[-1]
+                yield block
+        if last and last not in '\r\n':
+            yield '\n'
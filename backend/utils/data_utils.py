@@ -1,10 +1,11 @@
-import re
 import random
 import datetime
-import pycountry
 from faker import Faker
 from nltk.corpus import names
 
+from .country_utils import CountryUtils
+from .id_utils import IdUtils
+
 class DataUtils:
     """
     Colección de utilidades para detección y generación de datos:
@@ -38,46 +39,32 @@ class DataUtils:
         return False
 
     @staticmethod
-    def is_country(possible_country: str, translate_func) -> bool:
+    def is_country(possible_country: str, translate_func=None) -> bool:
         """
-        Traduce el texto y comprueba si es un país válido con pycountry.
+        Comprueba si el texto es un país con el índice sin conexión de
+        CountryUtils; `translate_func` (opcional) sólo se usa si no hay
+        coincidencia, como último recurso.
         """
-        english_name = translate_func(possible_country)
-        try:
-            pycountry.countries.lookup(english_name)
-            return True
-        except LookupError:
-            return False
+        return CountryUtils.resolve(possible_country, translate_func) is not None
 
     @staticmethod
     def generate_country() -> str:
         """
-        Devuelve aleatoriamente el nombre de un país.
+        Devuelve aleatoriamente el nombre de un país. Para columnas
+        enteras, CountryUtils.country_column.
         """
-        countries = list(pycountry.countries)
-        random_country = random.choice(countries)
-        return random_country.name.replace('"', '')
+        return random.choice(CountryUtils.table()).name
 
     @staticmethod
-    def generate_ids(template_str: str, max_val: int) -> list:
+    def generate_ids(template_str: str, max_val: int, offset: int = 0) -> list:
         """
         Genera una lista de IDs secuenciales basados en una plantilla.
+        `offset` permite continuar la secuencia (p. ej. entre bloques):
+        se generan los IDs offset + 1 ... offset + max_val. Sin dígitos en
+        la plantilla, el número se añade al final ("abc" -> "abc1").
+        Para arrays, otros formatos o claves foráneas, ver IdUtils.
         """
-        # Si es todo dígitos
-        if template_str.isdigit():
-            return [str(i).zfill(len(template_str)) for i in range(1, max_val + 1)]
-
-        match = re.search(r'(\D*)(\d+)(\D*)', template_str)
-        if not match:
-            return [template_str] * max_val
-
-        part_start, number_str, part_end = match.group(1), match.group(2), match.group(3)
-        number_len = len(number_str)
-
-        return [
-            f"{part_start}{str(i).zfill(number_len)}{part_end}"
-            for i in range(1, max_val + 1)
-        ]
+        return IdUtils.sequence(template_str, max_val, offset).tolist()
 
     @staticmethod
     def generate_random_date(start_str: str, end_str: str) -> datetime.date:
@@ -0,0 +1,275 @@
+import re
+import hashlib
+import datetime
+import numpy as np
+
+
+class IdUtils:
+    """
+    Generación vectorizada de identificadores. Cada ID es una función pura
+    de su número de fila (y de una clave), así que se pueden generar por
+    bloques con un desplazamiento, recalcular los de cualquier fila (claves
+    foráneas) y garantizar la unicidad sin guardar los ya generados:
+    secuencias con plantilla, UUIDv4/v7, ULID e IDs "hash" (una permutación
+    Feistel del número de fila).
+
+    Una especificación de ID es un dict con:
+    - 'id_format': uno de FORMATS (por defecto 'sequence').
+    - 'template': plantilla con prefijo/sufijo, p. ej. "INV-0001".
+    - 'key': entero que fija los bits pseudoaleatorios.
+    - 'timestamp': instante ISO para UUIDv7 y ULID.
+    """
+
+    FORMATS = ('sequence', 'uuid4', 'uuid7', 'ulid', 'hash')
+    # Marca de tiempo fija por defecto, para que los IDs sean reproducibles
+    DEFAULT_TIMESTAMP = "2024-01-01T00:00:00+00:00"
+    HASH_LENGTH = 16
+    FEISTEL_ROUNDS = 4
+    HEX = np.array([ord(c) for c in "0123456789abcdef"], dtype=np.uint32)
+    CROCKFORD = np.array([ord(c) for c in "0123456789ABCDEFGHJKMNPQRSTVWXYZ"], dtype=np.uint32)
+
+    _MASK64 = (1 << 64) - 1
+
+    @staticmethod
+    def parse_template(template: str) -> tuple:
+        """
+        Divide una plantilla en (prefijo, ancho, sufijo) alrededor de su
+        último bloque de dígitos. Sin dígitos, la plantilla entera es el
+        prefijo y el número va detrás sin relleno ("abc" -> "abc1").
+        """
+        match = re.fullmatch(r'(.*?)(\d+)(\D*)', template or "", re.DOTALL)
+        if not match:
+            return template or "", 1, ""
+        return match.group(1), len(match.group(2)), match.group(3)
+
+    @staticmethod
+    def key(*parts) -> int:
+        """
+        Clave estable de 64 bits a partir de textos (p. ej. el nombre de la columna).
+        """
+        digest = hashlib.blake2b("\x1f".join(map(str, parts)).encode("utf-8"), digest_size=8).digest()
+        return int.from_bytes(digest, "big")
+
+    @staticmethod
+    def column_spec(column_name: str, properties: dict) -> dict:
+        """
+        Especificación de ID de una columna de la configuración; la clave
+        por defecto sale del nombre de la columna.
+        """
+        values = properties.get('values') or []
+        return {
+            'id_format': properties.get('id_format', 'sequence'),
+            'template': properties.get('template', str(values[0]) if values else "0"),
+            'key': properties.get('key', IdUtils.key(column_name)),
+            'timestamp': properties.get('timestamp'),
+        }
+
+    @staticmethod
+    def ids(spec: dict, count: int, offset: int = 0) -> np.ndarray:
+        """
+        IDs de las filas offset ... offset + count - 1, como array de texto.
+        """
+        return IdUtils.ids_at(spec, np.arange(offset, offset + count, dtype=np.uint64))
+
+    @staticmethod
+    def foreign_keys(rng: np.random.Generator, spec: dict, parent_rows: int, num_rows: int) -> np.ndarray:
+        """
+        Columna de claves foráneas: IDs de filas al azar de una tabla padre
+        de `parent_rows` filas cuyos IDs siguen `spec`. No hace falta tener
+        los IDs del padre en memoria: se recalculan a partir de la fila.
+        """
+        return IdUtils.ids_at(spec, IdUtils.foreign_key_rows(rng, parent_rows, num_rows))
+
+    @staticmethod
+    def foreign_key_rows(rng: np.random.Generator, parent_rows: int, num_rows: int) -> np.ndarray:
+        """
+        Filas al azar (empezando en 0) de una tabla padre de `parent_rows` filas.
+        """
+        if parent_rows < 1:
+            raise ValueError("The referenced table has no rows.")
+        return rng.integers(0, parent_rows, size=num_rows).astype(np.uint64)
+
+    @staticmethod
+    def ids_at(spec: dict, indices: np.ndarray) -> np.ndarray:
+        """
+        IDs de las filas dadas (empezando en 0) según `spec`.
+        """
+        id_format = spec.get('id_format') or 'sequence'
+        key = int(spec.get('key') or 0) & IdUtils._MASK64
+        prefix, width, suffix = IdUtils.parse_template(spec.get('template', "0"))
+        indices = np.asarray(indices, dtype=np.uint64)
+
+        if id_format == 'sequence':
+            return IdUtils._numbers(indices + np.uint64(1), prefix, width, suffix)
+        if id_format == 'hash':
+            return IdUtils.hash_ids(indices, key, prefix, suffix)
+        if id_format in ('uuid4', 'uuid7', 'ulid'):
+            timestamp = IdUtils._timestamp_ms(spec.get('timestamp'))
+            if id_format == 'uuid4':
+                return IdUtils.uuid4(indices, key)
+            if id_format == 'uuid7':
+                return IdUtils.uuid7(indices, key, timestamp)
+            return IdUtils.ulid(indices, key, timestamp)
+        raise ValueError(f"Unknown id_format '{id_format}'. Expected one of {IdUtils.FORMATS}.")
+
+    @staticmethod
+    def sequence(template: str, count: int, offset: int = 0) -> np.ndarray:
+        """
+        Secuencia offset + 1 ... offset + count con la plantilla dada.
+        """
+        return IdUtils.ids({'template': template}, count, offset)
+
+    @staticmethod
+    def hash_ids(indices: np.ndarray, key: int, prefix: str = "", suffix: str = "",
+                 length: int = HASH_LENGTH) -> np.ndarray:
+        """
+        IDs hexadecimales de `length` caracteres con aspecto aleatorio,
+        únicos porque son una permutación del número de fila.
+        """
+        bits = 4 * length
+        if bits < 64 and len(indices) and int(indices.max()) >> bits:
+            raise ValueError(f"Too many rows for {length}-character hash IDs.")
+        values = IdUtils.permute(indices, bits, key)
+        shifts = np.arange(bits - 4, -1, -4, dtype=np.uint64)
+        return IdUtils._render(prefix, IdUtils.HEX[(values[:, None] >> shifts) & np.uint64(0xF)], suffix)
+
+    @staticmethod
+    def uuid4(indices: np.ndarray, key: int) -> np.ndarray:
+        """
+        UUID versión 4. Los 62 bits bajos son una permutación del número de
+        fila (de ahí la unicidad) y el resto, bits pseudoaleatorios.
+        """
+        IdUtils._check_rows(indices, 62, "UUIDv4")
+        hi = IdUtils._mix(indices, key)
+        hi = (hi & np.uint64(0xFFFFFFFFFFFF0FFF)) | np.uint64(0x4000)
+        lo = IdUtils.permute(indices, 62, key) | np.uint64(0x8000000000000000)
+        return IdUtils._uuid_text(hi, lo)
+
+    @staticmethod
+    def uuid7(indices: np.ndarray, key: int, timestamp_ms: int) -> np.ndarray:
+        """
+        UUID versión 7 (RFC 9562): marca de tiempo en milisegundos y un
+        contador (el número de fila) en los 40 bits bajos, así que los IDs
+        son únicos y se ordenan como las filas.
+        """
+        IdUtils._check_rows(indices, 40, "UUIDv7")
+        rand = IdUtils._splitmix(key)
+        hi = np.uint64(((timestamp_ms & 0xFFFFFFFFFFFF) << 16) | 0x7000 | (rand & 0xFFF))
+        lo = np.uint64(0x8000000000000000 | ((rand >> 12) & 0x3FFFFF) << 40) | indices
+        return IdUtils._uuid_text(np.full(len(indices), hi, dtype=np.uint64), lo)
+
+    @staticmethod
+    def ulid(indices: np.ndarray, key: int, timestamp_ms: int) -> np.ndarray:
+        """
+        ULID monótonos: marca de tiempo de 48 bits y 80 bits aleatorios a
+        los que se suma el número de fila (como indica la especificación
+        para IDs del mismo milisegundo).
+        """
+        base = IdUtils._splitmix(key) | (IdUtils._splitmix(key + 1) & 0x7FFF) << 64
+        base_lo = np.uint64(base & IdUtils._MASK64)
+        lo = indices + base_lo
+        carry = (lo < base_lo).astype(np.uint64)
+        hi = np.uint64(((timestamp_ms & 0xFFFFFFFFFFFF) << 16) | (base >> 64)) + carry
+
+        # 26 caracteres Crockford de 5 bits sobre un entero de 130 bits (hi:lo)
+        symbols = np.empty((len(indices), 26), dtype=np.uint64)
+        for position in range(26):
+            shift = 125 - 5 * position
+            if shift >= 64:
+                symbols[:, position] = hi >> np.uint64(shift - 64)
+            elif shift + 5 <= 64:
+                symbols[:, position] = lo >> np.uint64(shift)
+            else:
+                symbols[:, position] = (lo >> np.uint64(shift)) | (hi << np.uint64(64 - shift))
+        return IdUtils._render("", IdUtils.CROCKFORD[symbols & np.uint64(31)], "")
+
+    @staticmethod
+    def permute(indices: np.ndarray, bits: int, key: int) -> np.ndarray:
+        """
+        Permutación pseudoaleatoria de [0, 2**bits) (red Feistel
+        equilibrada, `bits` par): valores distintos dan valores distintos.
+        """
+        half = bits // 2
+        mask = np.uint64((1 << half) - 1)
+        left = (indices >> np.uint64(half)) & mask
+        right = indices & mask
+        for round_key in IdUtils._round_keys(key):
+            left, right = right, left ^ (IdUtils._mix(right, round_key) & mask)
+        return (left << np.uint64(half)) | right
+
+    @staticmethod
+    def _numbers(numbers: np.ndarray, prefix: str, width: int, suffix: str) -> np.ndarray:
+        """
+        Números con relleno de ceros hasta `width` (más largos si hace falta).
+        """
+        if width > 20:
+            prefix, width = prefix + "0" * (width - 20), 20
+        digits = np.full(len(numbers), width)
+        for power in range(width, 20):
+            digits[numbers >= np.uint64(10 ** power)] = power + 1
+
+        lengths = np.unique(digits)
+        result = np.empty(len(numbers), dtype=f'<U{len(prefix) + max(lengths, default=width) + len(suffix)}')
+        for length in lengths:
+            rows = np.flatnonzero(digits == length) if len(lengths) > 1 else slice(None)
+            exponents = np.power(np.uint64(10), np.arange(length - 1, -1, -1, dtype=np.uint64))
+            block = (numbers[rows, None] // exponents) % np.uint64(10)
+            result[rows] = IdUtils._render(prefix, block + np.uint64(48), suffix)
+        return result
+
+    @staticmethod
+    def _render(prefix: str, symbols: np.ndarray, suffix: str) -> np.ndarray:
+        """
+        Une prefijo, una matriz (filas x caracteres) de códigos Unicode y
+        sufijo en un array de texto, sin pasar por Python fila a fila.
+        """
+        head = np.array([ord(c) for c in prefix], dtype=np.uint32)
+        tail = np.array([ord(c) for c in suffix], dtype=np.uint32)
+        length = len(head) + symbols.shape[1] + len(tail)
+        out = np.empty((symbols.shape[0], length), dtype=np.uint32)
+        out[:, :len(head)] = head
+        out[:, len(head):length - len(tail)] = symbols
+        out[:, length - len(tail):] = tail
+        return out.view(f'<U{length}').ravel()
+
+    @staticmethod
+    def _uuid_text(hi: np.ndarray, lo: np.ndarray) -> np.ndarray:
+        shifts = np.arange(60, -1, -4, dtype=np.uint64)
+        nibbles = np.concatenate([(hi[:, None] >> shifts), (lo[:, None] >> shifts)], axis=1) & np.uint64(0xF)
+        hexes = IdUtils.HEX[nibbles]
+        dash = np.full((len(hi), 1), ord("-"), dtype=np.uint32)
+        parts = [hexes[:, :8], dash, hexes[:, 8:12], dash, hexes[:, 12:16], dash, hexes[:, 16:20], dash, hexes[:, 20:]]
+        return IdUtils._render("", np.concatenate(parts, axis=1), "")
+
+    @staticmethod
+    def _check_rows(indices: np.ndarray, bits: int, name: str):
+        if len(indices) and int(indices.max()) >> bits:
+            raise ValueError(f"Too many rows for {name} IDs.")
+
+    @staticmethod
+    def _timestamp_ms(value) -> int:
+        moment = datetime.datetime.fromisoformat(value or IdUtils.DEFAULT_TIMESTAMP)
+        if moment.tzinfo is None:
+            moment = moment.replace(tzinfo=datetime.timezone.utc)
+        return int(moment.timestamp() * 1000)
+
+    @staticmethod
+    def _splitmix(value: int) -> int:
+        z = (value + 0x9E3779B97F4A7C15) & IdUtils._MASK64
+        z = ((z ^ (z >> 30)) * 0xBF58476D1CE4E5B9) & IdUtils._MASK64
+        z = ((z ^ (z >> 27)) * 0x94D049BB133111EB) & IdUtils._MASK64
+        return z ^ (z >> 31)
+
+    @staticmethod
+    def _round_keys(key: int) -> list:
+        return [IdUtils._splitmix(key + i) for i in range(IdUtils.FEISTEL_ROUNDS)]
+
+    @staticmethod
+    def _mix(values: np.ndarray, key: int) -> np.ndarray:
+        """
+        Mezcla de 64 bits (finalizador de splitmix64) vectorizada.
+        """
+        z = values ^ np.uint64(key)
+        z = (z ^ (z >> np.uint64(30))) * np.uint64(0xBF58476D1CE4E5B9)
+        z = (z ^ (z >> np.uint64(27))) * np.uint64(0x94D049BB133111EB)
+        return z ^ (z >> np.uint64(31))
@@ -3,6 +3,174 @@ import json
 import csv
 import logging
 
+try:
+    import orjson
+except ImportError:  # opcional: se usa json de la biblioteca estándar
+    orjson = None
+
+try:
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+except ImportError:  # opcional: sólo hace falta para escribir Parquet
+    pa = None
+    pq = None
+
+class JSONScanner:
+    """
+    Recorre texto en una sola pasada, de una vez o por fragmentos con
+    `feed`, y devuelve el texto de cada objeto JSON de primer nivel en
+    cuanto llega su llave de cierre. Las llaves y comillas dentro de
+    cadenas no cuentan y el texto fuera de los objetos se ignora.
+    El coste es lineal en el tamaño del texto (no hay retroceso).
+    """
+
+    # Objeto sin objetos anidados (cuantificadores posesivos: sin retroceso)
+    _FLAT_OBJECT = re.compile(r'\{(?:[^{}"]++|"[^"\\]*+(?:\\.[^"\\]*+)*+")*+\}', re.DOTALL)
+    # Dentro de un objeto: una cadena completa, una llave o una comilla suelta
+    _TOKEN = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"|[{}"]', re.DOTALL)
+    # Fin de una cadena abierta: comilla o escape
+    _STRING_END = re.compile(r'["\\]')
+    # Cadena JSON completa (para separar lo que está dentro y fuera de cadenas)
+    _STRING = re.compile(r'"[^"\\]*(?:\\.[^"\\]*)*"', re.DOTALL)
+    # Reparaciones permisivas, aplicadas sólo fuera de las cadenas
+    _NEEDS_REPAIR = re.compile(r'N/A|None|True|False|,\s*[}\]]')
+    _REPAIRS = [
+        (re.compile(r',(\s*[}\]])'), r'\1'),   # comas finales
+        (re.compile(r'\bN/A\b'), '"N/A"'),     # N/A sin comillas
+        (re.compile(r'\bNone\b'), 'null'),     # literales de Python
+        (re.compile(r'\bTrue\b'), 'true'),
+        (re.compile(r'\bFalse\b'), 'false'),
+    ]
+
+    def __init__(self):
+        self._buffer = ''
+        self._pos = 0
+        self._depth = 0
+        self._start = None
+        self._in_string = False
+        self._escaped = False
+
+    @property
+    def pending(self) -> bool:
+        """Hay un objeto empezado que todavía no se ha cerrado."""
+        return self._depth > 0
+
+    def feed(self, chunk: str) -> list:
+        """
+        Añade un fragmento y devuelve los textos de los objetos completados.
+        """
+        if not chunk:
+            return []
+        self._buffer += chunk
+        buffer = self._buffer
+        pos = self._pos
+        if self._escaped:
+            # El carácter escapado llega en este fragmento
+            pos += 1
+            self._escaped = False
+
+        objects = []
+        length = len(buffer)
+        depth = self._depth
+        while pos < length:
+            if self._in_string:
+                # Cadena que quedó abierta al final del fragmento anterior
+                match = self._STRING_END.search(buffer, pos)
+                if match is None:
+                    pos = length
+                    break
+                pos = match.end()
+                if match.group() == '"':
+                    self._in_string = False
+                else:
+                    pos += 1
+                    if pos > length:
+                        self._escaped = True
+                        pos = length
+                        break
+            elif depth == 0:
+                # Fuera de los objetos sólo importa la siguiente llave
+                start = buffer.find('{', pos)
+                if start < 0:
+                    pos = length
+                    break
+                # Caso habitual: objeto plano y completo, de una vez
+                match = self._FLAT_OBJECT.match(buffer, start)
+                if match is not None:
+                    objects.append(match.group())
+                    pos = match.end()
+                    continue
+                self._start = start
+                depth = 1
+                pos = start + 1
+            else:
+                match = self._TOKEN.search(buffer, pos)
+                if match is None:
+                    pos = length
+                    break
+                token = match.group()
+                pos = match.end()
+                if token == '{':
+                    depth += 1
+                elif token == '}':
+                    depth -= 1
+                    if depth == 0:
+                        objects.append(buffer[self._start:pos])
+                        self._start = None
+                elif token == '"':
+                    # Comilla sin cierre en lo recibido hasta ahora
+                    self._in_string = True
+        self._depth = depth
+
+        # Sólo se conserva el objeto a medias, si lo hay
+        if self._start is None:
+            self._buffer, self._pos = '', 0
+        else:
+            self._buffer = buffer[self._start:]
+            self._pos = len(buffer) - self._start
+            self._start = 0
+        return objects
+
+    @staticmethod
+    def repair(text: str) -> str:
+        """
+        Aplica las reparaciones permisivas fuera de las cadenas.
+        Un JSON válido se devuelve tal cual.
+        """
+        if not JSONScanner._NEEDS_REPAIR.search(text):
+            return text
+        pieces = []
+        last = 0
+        for match in JSONScanner._STRING.finditer(text):
+            pieces.append(JSONScanner._repair_outside(text[last:match.start()]))
+            pieces.append(match.group())
+            last = match.end()
+        pieces.append(JSONScanner._repair_outside(text[last:]))
+        return ''.join(pieces)
+
+    @staticmethod
+    def _repair_outside(text: str) -> str:
+        for pattern, replacement in JSONScanner._REPAIRS:
+            text = pattern.sub(replacement, text)
+        return text
+
+    @staticmethod
+    def parse(text: str, lenient: bool = True):
+        """
+        Convierte el texto de un objeto en dict; si no es válido y
+        `lenient` es True lo intenta de nuevo reparado. None si falla.
+        """
+        try:
+            return json.loads(text)
+        except json.JSONDecodeError:
+            if not lenient:
+                return None
+        try:
+            return json.loads(JSONScanner.repair(text))
+        except json.JSONDecodeError:
+            return None
+
+
 class JSONUtils:
     """
     Utilidad estática para extraer JSON de texto crudo,
@@ -10,67 +178,162 @@ class JSONUtils:
     """
 
     @staticmethod
-    def format_result_for_jsonl(raw_result: str) -> str:
+    def format_result_for_jsonl(raw_result: str, lenient: bool = True) -> str:
         """
         Limpia el texto crudo para extraer múltiples objetos JSON,
         devolviéndolos como JSONL (uno por línea).
+        Con `lenient`, los objetos inválidos se devuelven reparados
+        (N/A sin comillas, comas finales...).
         """
-        matches = re.findall(r'\{.*?\}', raw_result, re.DOTALL)
+        matches = JSONScanner().feed(raw_result)
         if not matches:
             raise ValueError("No valid JSON block found in the response.")
 
-        # Une los bloques JSON con saltos de línea
-        json_content = "\n".join(matches).replace("\n\n", "\n")
+        lines = []
+        for text in matches:
+            if lenient:
+                text = JSONScanner.repair(text)
+            # Un objeto por línea: los saltos fuera de cadenas son espacios
+            if '\n' in text or '\r' in text:
+                text = text.replace('\r', ' ').replace('\n', ' ')
+            lines.append(text)
+        return "\n".join(lines)
 
-        # Corrige valores N/A no entre comillas
-        corrected_json_content = re.sub(r'(?<!")\bN/A\b(?!")', '"N/A"', json_content)
-        return corrected_json_content
+    @staticmethod
+    def iter_json_objects(chunks, lenient: bool = True):
+        """
+        Recorre los fragmentos de texto de una respuesta en streaming y
+        devuelve cada objeto JSON de primer nivel en cuanto llega su llave
+        de cierre. Los objetos que no se pueden leer (ni reparados, con
+        `lenient`) se descartan.
+        """
+        scanner = JSONScanner()
+        for chunk in chunks:
+            for text in scanner.feed(chunk):
+                obj = JSONScanner.parse(text, lenient)
+                if obj is not None:
+                    yield obj
 
     @staticmethod
-    def extract_low_result_json(raw_result: str) -> str:
+    def extract_low_result_json(raw_result: str, lenient: bool = True) -> str:
         """
         Extrae y devuelve sólo el bloque JSON válido del texto,
         eliminando comillas triples u otros textos alrededor.
+        Se devuelve el primer objeto completo que se puede leer (reparado
+        si hace falta, con `lenient`) o, si ninguno, el primero encontrado.
         """
-        cleaned = raw_result.replace("'''json", "").strip()
-        match = re.search(r'\{.*\}', cleaned, re.DOTALL)
-        if not match:
+        matches = JSONScanner().feed(raw_result)
+        if not matches:
             raise ValueError("No valid JSON structure found.")
-        return match.group(0)
+        for text in matches:
+            if JSONScanner.parse(text, lenient=False) is not None:
+                return text
+            if lenient and JSONScanner.parse(text) is not None:
+                return JSONScanner.repair(text)
+        return matches[0]
 
     @staticmethod
-    def jsonlist_to_csv(jsonl_list: list, output_file: str, logger: logging.Logger) -> None:
+    def parse_jsonl(jsonl_list: list, logger: logging.Logger) -> list:
         """
-        Convierte una lista de cadenas JSONL en un fichero CSV.
-        Las columnas se infieren de las claves del primer objeto.
+        Convierte una lista de cadenas JSONL en objetos. Se intenta leer todo
+        de una vez (con orjson si está instalado) y sólo si falla se recorre
+        línea a línea para descartar y registrar las inválidas.
         """
-        logger.info(f"Starting conversion of {len(jsonl_list)} JSONL strings to CSV: {output_file}")
+        if not jsonl_list:
+            return []
+        try:
+            objects = JSONUtils._loads('[' + ','.join(jsonl_list) + ']')
+            # Una línea como '{...}, {...}' no cuenta como un solo objeto
+            if len(objects) == len(jsonl_list):
+                return objects
+        except ValueError:
+            pass
 
-        json_objects = []
+        objects = []
         for idx, line in enumerate(jsonl_list):
+            line = line.strip()
+            if not line:
+                continue
             try:
-                obj = json.loads(line.strip())
-                json_objects.append(obj)
-                logger.debug(f"Parsed JSONL at index {idx}: {obj}")
-            except json.JSONDecodeError as je:
+                objects.append(JSONUtils._loads(line))
+            except ValueError as je:
                 logger.error(f"JSON decode error at index {idx}: {je}")
-            except Exception as e:
-                logger.error(f"Unexpected error at index {idx}: {e}")
+        return objects
 
+    @staticmethod
+    def objects_to_columns(objects: list, schema: list = None) -> dict:
+        """
+        Pasa una lista de objetos a columnas {campo: [valores]}. Sin `schema`
+        las columnas son la unión de claves en orden de aparición; con él,
+        sólo esas columnas y en ese orden. Los huecos quedan como None y lo
+        que no es un objeto se ignora.
+        """
+        objects = [obj for obj in objects if isinstance(obj, dict)]
+        if schema is None:
+            schema = list(dict.fromkeys(key for obj in objects for key in obj))
+        return {field: [obj.get(field) for obj in objects] for field in schema}
+
+    @staticmethod
+    def jsonlist_to_csv(
+        jsonl_list: list,
+        output_file: str,
+        logger: logging.Logger,
+        schema: list = None,
+        output_format: str = None
+    ) -> int:
+        """
+        Convierte una lista de cadenas JSONL en un fichero CSV o Parquet.
+        Las columnas son la unión de las claves de todos los objetos o el
+        `schema` fijado (las claves de más se descartan). `output_format`
+        es 'csv' o 'parquet'; por defecto se deduce de la extensión.
+        Devuelve el número de filas escritas.
+        """
+        logger.info(f"Starting conversion of {len(jsonl_list)} JSONL strings to CSV: {output_file}")
+        if output_format is None:
+            output_format = 'parquet' if output_file.lower().endswith('.parquet') else 'csv'
+
+        json_objects = [obj for obj in JSONUtils.parse_jsonl(jsonl_list, logger) if isinstance(obj, dict)]
         if not json_objects:
             logger.warning("No valid JSON objects to write. Aborting CSV creation.")
-            return
+            return 0
 
-        fieldnames = list(json_objects[0].keys())
-        logger.info(f"Using fieldnames: {fieldnames}")
+        columns = JSONUtils.objects_to_columns(json_objects, schema)
+        logger.info(f"Using fieldnames: {list(columns)}")
+        if schema is not None:
+            extra = {key for obj in json_objects for key in obj} - set(schema)
+            if extra:
+                logger.warning(f"Dropping fields outside the schema: {sorted(extra)}")
 
         try:
-            with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
-                writer = csv.DictWriter(f, fieldnames=fieldnames)
-                writer.writeheader()
-                for obj in json_objects:
-                    writer.writerow(obj)
-                    logger.debug(f"Wrote row: {obj}")
-            logger.info(f"CSV created successfully: {output_file}")
+            if output_format == 'parquet':
+                JSONUtils._write_parquet(columns, output_file)
+                logger.info(f"Parquet created successfully: {output_file}")
+            else:
+                with open(output_file, 'w', newline='', encoding='utf-8-sig') as f:
+                    writer = csv.writer(f)
+                    writer.writerow(columns.keys())
+                    writer.writerows(zip(*columns.values()))
+                logger.info(f"CSV created successfully: {output_file}")
         except Exception as e:
-            logger.error(f"Error writing CSV: {e}")
+            logger.error(f"Error writing {output_format.upper()}: {e}")
+            return 0
+        return len(json_objects)
+
+    @staticmethod
+    def _loads(text: str):
+        if orjson is not None:
+            return orjson.loads(text)
+        return json.loads(text)
+
+    @staticmethod
+    def _write_parquet(columns: dict, output_file: str) -> None:
+        if pa is None:
+            raise ImportError("pyarrow is required to write Parquet files.")
+        arrays = []
+        for values in columns.values():
+            try:
+                arrays.append(pa.array(values))
+            except (pa.ArrowInvalid, pa.ArrowTypeError):
+                # Tipos mezclados en la columna: se guarda como texto
+                arrays.append(pa.array([None if v is None else str(v) for v in values], type=pa.string()))
+        pq.write_table(pa.Table.from_arrays(arrays, names=list(columns)), output_file)
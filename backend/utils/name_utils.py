@@ -0,0 +1,158 @@
+from functools import lru_cache
+
+import numpy as np
+import pandas as pd
+from faker import Faker
+from faker.config import AVAILABLE_LOCALES
+
+
+class NameUtils:
+    """
+    Generación vectorizada de nombres de persona. Por cada locale se crea
+    una única instancia de Faker con semilla fija, de la que se sacan una
+    vez por proceso listas de nombres y apellidos; las columnas se montan
+    después con índices aleatorios de un numpy.random.Generator, de modo
+    que el resultado sólo depende de la semilla de ese generador.
+    """
+
+    DEFAULT_LOCALE = "en_US"
+    # Extracciones de Faker por lista; las repeticiones conservan su frecuencia
+    POOL_DRAWS = 3000
+    POOL_SEED = 0
+    # Locales que escriben el apellido antes del nombre
+    LAST_NAME_FIRST = ("ja_JP", "zh_CN", "zh_TW", "ko_KR", "hu_HU", "vi_VN")
+    # Rondas de nuevos sorteos para resolver duplicados con `unique`
+    MAX_UNIQUE_ROUNDS = 50
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def faker(locale: str) -> Faker:
+        """
+        Instancia de Faker (con semilla fija) reutilizada para un locale.
+        """
+        fake = Faker(locale)
+        fake.seed_instance(NameUtils.POOL_SEED)
+        return fake
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def pools(locale: str) -> tuple:
+        """
+        (nombres, apellidos) de un locale como arrays de objetos, con
+        repeticiones según la frecuencia que les da Faker.
+        """
+        fake = NameUtils.faker(locale)
+        first = np.array([fake.first_name() for _ in range(NameUtils.POOL_DRAWS)], dtype=object)
+        last = np.array([fake.last_name() for _ in range(NameUtils.POOL_DRAWS)], dtype=object)
+        return first, last
+
+    @staticmethod
+    @lru_cache(maxsize=None)
+    def distinct_pools(locale: str) -> tuple:
+        """
+        Como pools, pero sin repeticiones (para nombres únicos).
+        """
+        first, last = NameUtils.pools(locale)
+        return pd.unique(first), pd.unique(last)
+
+    @staticmethod
+    def parse_locales(locales=None) -> tuple:
+        """
+        Acepta un locale, una lista de locales (mismo peso) o un dict
+        {locale: peso}. Devuelve (locales, probabilidades). Lanza ValueError
+        si algún locale no existe en Faker o los pesos no son válidos.
+        """
+        if not locales:
+            locales = [NameUtils.DEFAULT_LOCALE]
+        elif isinstance(locales, str):
+            locales = [locales]
+        if isinstance(locales, dict):
+            names = list(locales)
+            weights = np.array([float(locales[name]) for name in names])
+        else:
+            names = list(locales)
+            weights = np.ones(len(names))
+        unknown = [name for name in names if str(name).replace("-", "_") not in AVAILABLE_LOCALES]
+        if unknown:
+            raise ValueError(f"Unknown locales: {unknown}")
+        if (weights < 0).any() or weights.sum() <= 0:
+            raise ValueError(f"Invalid locale weights: {locales}")
+        return names, weights / weights.sum()
+
+    @staticmethod
+    def capacity(locales=None) -> int:
+        """
+        Número máximo de nombres completos distintos para esos locales.
+        """
+        names, _ = NameUtils.parse_locales(locales)
+        return sum(len(first) * len(last) for first, last in map(NameUtils.distinct_pools, names))
+
+    @staticmethod
+    def name_column(
+        rng: np.random.Generator,
+        num_rows: int,
+        locales=None,
+        unique: bool = False,
+        seen: set = None
+    ) -> np.ndarray:
+        """
+        Genera `num_rows` nombres completos mezclando `locales` (ver
+        parse_locales). Con `unique` no se repite ningún nombre, tampoco
+        los que ya estén en `seen`, al que se añaden los nuevos (así la
+        unicidad se mantiene entre bloques). Lanza ValueError si no hay
+        nombres distintos suficientes.
+        """
+        names, weights = NameUtils.parse_locales(locales)
+        get_pools = NameUtils.distinct_pools if unique else NameUtils.pools
+        if unique:
+            available = NameUtils.capacity(names) - (len(seen) if seen else 0)
+            if num_rows > available:
+                raise ValueError(f"Cannot generate {num_rows} unique names for {names}: only {available} left.")
+
+        if len(names) == 1:
+            row_locales = np.zeros(num_rows, dtype=np.intp)
+        else:
+            row_locales = rng.choice(len(names), size=num_rows, p=weights)
+
+        result = np.empty(num_rows, dtype=object)
+
+        def fill(rows: np.ndarray):
+            for i, locale in enumerate(names):
+                target = rows[row_locales[rows] == i]
+                if len(target) == 0:
+                    continue
+                first, last = get_pools(locale)
+                if unique:
+                    if len(target) > len(first) * len(last):
+                        raise ValueError(f"Cannot generate {len(target)} unique '{locale}' names.")
+                    codes = rng.choice(len(first) * len(last), size=len(target), replace=False)
+                    given, family = first[codes // len(last)], last[codes % len(last)]
+                else:
+                    given = first[rng.integers(0, len(first), size=len(target))]
+                    family = last[rng.integers(0, len(last), size=len(target))]
+                if locale in NameUtils.LAST_NAME_FIRST:
+                    given, family = family, given
+                result[target] = given + " " + family
+
+        fill(np.arange(num_rows))
+        if not unique:
+            return result
+
+        seen = set() if seen is None else seen
+        series = pd.Series(result)
+        pending = series.duplicated().to_numpy()
+        if seen:
+            pending |= series.isin(seen).to_numpy()
+        seen.update(result[~pending])
+
+        # Sólo se vuelven a sortear las filas repetidas
+        for _ in range(NameUtils.MAX_UNIQUE_ROUNDS):
+            rows = np.flatnonzero(pending)
+            if len(rows) == 0:
+                return result
+            fill(rows)
+            for row in rows:
+                if result[row] not in seen:
+                    seen.add(result[row])
+                    pending[row] = False
+        raise ValueError(f"Could not draw {num_rows} unique names for {names}; use more locales.")
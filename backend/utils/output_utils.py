@@ -0,0 +1,204 @@
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+from .csv_utils import CSVUtils
+
+
+class OutputUtils:
+    """
+    Formatos de salida de los generadores. Los CSV (opcionalmente
+    comprimidos con gzip o zstd) se escriben tal cual los da pandas, bloque
+    a bloque; Parquet y Arrow IPC se escriben con pyarrow, un row group /
+    record batch por bloque, con los tipos del config o de la metadata SDV.
+    """
+
+    DEFAULT_FORMAT = "csv"
+    # formato -> (extensión, tipo MIME)
+    FORMATS = {
+        "csv": (".csv", "text/csv"),
+        "csv.gz": (".csv.gz", "application/gzip"),
+        "csv.zst": (".csv.zst", "application/zstd"),
+        "parquet": (".parquet", "application/vnd.apache.parquet"),
+        "arrow": (".arrow", "application/vnd.apache.arrow.file"),
+    }
+    ALIASES = {
+        "gzip": "csv.gz",
+        "csv.gzip": "csv.gz",
+        "zstd": "csv.zst",
+        "csv.zstd": "csv.zst",
+        "feather": "arrow",
+        "ipc": "arrow",
+    }
+    COLUMNAR = ("parquet", "arrow")
+    CSV_COMPRESSION = {"csv.gz": "gzip", "csv.zst": "zstd"}
+    PARQUET_COMPRESSION = "zstd"
+    # Tipos de columna de un config MERLIN
+    CONFIG_TYPES = {
+        "string": pa.string(),
+        "int": pa.int64(),
+        "float": pa.float64(),
+        "boolean": pa.bool_(),
+        "date": pa.date32(),
+    }
+    BOOLEANS = {"true": True, "false": False, "1": True, "0": False, "yes": True, "no": False}
+
+    @staticmethod
+    def normalize_format(output_format: str = None) -> str:
+        """
+        Nombre canónico de un formato (None = csv). Lanza ValueError si no existe.
+        """
+        if not output_format:
+            return OutputUtils.DEFAULT_FORMAT
+        name = str(output_format).strip().lower().lstrip(".")
+        name = OutputUtils.ALIASES.get(name, name)
+        if name not in OutputUtils.FORMATS:
+            raise ValueError(f"Unknown output_format '{output_format}'. Use one of {list(OutputUtils.FORMATS)}.")
+        return name
+
+    @staticmethod
+    def is_columnar(output_format: str) -> bool:
+        return OutputUtils.normalize_format(output_format) in OutputUtils.COLUMNAR
+
+    @staticmethod
+    def extension(output_format: str) -> str:
+        return OutputUtils.FORMATS[OutputUtils.normalize_format(output_format)][0]
+
+    @staticmethod
+    def mimetype(output_format: str) -> str:
+        return OutputUtils.FORMATS[OutputUtils.normalize_format(output_format)][1]
+
+    @staticmethod
+    def format_of(path: str) -> str:
+        """
+        Formato de un fichero según su extensión (csv si no se reconoce).
+        """
+        for name, (extension, _) in sorted(OutputUtils.FORMATS.items(), key=lambda item: -len(item[1][0])):
+            if path.lower().endswith(extension):
+                return name
+        return OutputUtils.DEFAULT_FORMAT
+
+    @staticmethod
+    def config_schema(column_types: dict) -> pa.Schema:
+        """
+        Esquema Arrow para {columna: tipo del config} ('string', 'int', ...).
+        """
+        return pa.schema([
+            (name, OutputUtils.CONFIG_TYPES.get(column_type, pa.string()))
+            for name, column_type in column_types.items()
+        ])
+
+    @staticmethod
+    def metadata_schema(columns: dict, sample: pd.DataFrame) -> pa.Schema:
+        """
+        Esquema Arrow para las columnas de una metadata SDV
+        ({columna: {'sdtype': ...}}). Los sdtypes numerical, boolean y
+        datetime fijan el tipo; para el resto (categorical, id, ...) se usa
+        el que pyarrow infiere de `sample`, una muestra de los datos originales.
+        """
+        fields = []
+        for name, column in columns.items():
+            sdtype = column.get("sdtype")
+            if sdtype == "boolean":
+                arrow_type = pa.bool_()
+            elif sdtype == "datetime":
+                arrow_type = pa.timestamp("us")
+            elif sdtype == "numerical":
+                representation = column.get("computer_representation", "")
+                integer = representation.startswith(("Int", "UInt")) or (
+                    not representation and name in sample and pd.api.types.is_integer_dtype(sample[name])
+                )
+                arrow_type = pa.int64() if integer else pa.float64()
+            elif name in sample:
+                arrow_type = OutputUtils._inferred_type(sample[name])
+            else:
+                arrow_type = pa.string()
+            fields.append((name, arrow_type))
+        return pa.schema(fields)
+
+    @staticmethod
+    def _inferred_type(series: pd.Series) -> pa.DataType:
+        if isinstance(series.dtype, pd.CategoricalDtype):
+            series = series.astype(series.cat.categories.dtype)
+        try:
+            arrow_type = pa.array(series, from_pandas=True).type
+        except (pa.ArrowInvalid, pa.ArrowTypeError):
+            return pa.string()
+        if pa.types.is_null(arrow_type):
+            return pa.string()
+        if pa.types.is_integer(arrow_type):
+            return pa.int64()
+        if pa.types.is_floating(arrow_type):
+            return pa.float64()
+        return arrow_type
+
+    @staticmethod
+    def to_table(df: pd.DataFrame, schema: pa.Schema) -> pa.Table:
+        """
+        Convierte un bloque al esquema dado. Los valores que no encajan en
+        el tipo de su columna (texto en una columna numérica, fechas mal
+        formadas...) quedan como nulos y los decimales de las columnas
+        enteras se redondean.
+        """
+        arrays = []
+        for field in schema:
+            series = df[field.name]
+            arrow_type = field.type
+            if pa.types.is_string(arrow_type):
+                values = series.astype("string")
+            elif pa.types.is_boolean(arrow_type):
+                values = series if pd.api.types.is_bool_dtype(series) else (
+                    series.astype("string").str.strip().str.lower().map(OutputUtils.BOOLEANS)
+                )
+            elif pa.types.is_temporal(arrow_type):
+                values = series if pd.api.types.is_datetime64_any_dtype(series) else (
+                    pd.to_datetime(series, errors="coerce")
+                )
+            elif pa.types.is_integer(arrow_type):
+                values = pd.to_numeric(series, errors="coerce").round().astype("Int64")
+            else:
+                values = pd.to_numeric(series, errors="coerce")
+            arrays.append(pa.array(values, type=arrow_type, from_pandas=True))
+        return pa.Table.from_arrays(arrays, schema=schema)
+
+    @staticmethod
+    def write_csv(chunks, path: str, output_format: str = DEFAULT_FORMAT) -> None:
+        """
+        Escribe bloques de texto CSV, comprimidos si el formato lo pide.
+        """
+        compression = OutputUtils.CSV_COMPRESSION.get(OutputUtils.normalize_format(output_format))
+        stream = pa.CompressedOutputStream(path, compression) if compression else open(path, "wb")
+        with stream:
+            for chunk in chunks:
+                stream.write(chunk.encode("utf-8"))
+
+    @staticmethod
+    def write_tables(tables, path: str, output_format: str, schema: pa.Schema) -> int:
+        """
+        Escribe tablas Arrow como Parquet (un row group por tabla) o como
+        fichero Arrow IPC. Devuelve el número de filas escritas.
+        """
+        if OutputUtils.normalize_format(output_format) == "parquet":
+            writer = pq.ParquetWriter(path, schema, compression=OutputUtils.PARQUET_COMPRESSION)
+        else:
+            writer = pa.ipc.new_file(path, schema)
+        rows = 0
+        with writer:
+            for table in tables:
+                writer.write_table(table.cast(schema) if table.schema != schema else table)
+                rows += table.num_rows
+        return rows
+
+    @staticmethod
+    def convert_csv(csv_path: str, path: str, output_format: str) -> None:
+        """
+        Convierte un CSV (pequeño) ya escrito al formato pedido; en los
+        formatos columnares los tipos son los que infiere pandas.
+        """
+        output_format = OutputUtils.normalize_format(output_format)
+        if not OutputUtils.is_columnar(output_format):
+            OutputUtils.write_csv(CSVUtils.iter_text(csv_path), path, output_format)
+            return
+        df = pd.read_csv(csv_path, encoding="utf-8-sig")
+        schema = pa.schema([(name, OutputUtils._inferred_type(df[name])) for name in df.columns])
+        OutputUtils.write_tables([OutputUtils.to_table(df, schema)], path, output_format, schema)
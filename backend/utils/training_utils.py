@@ -0,0 +1,101 @@
+import numpy as np
+import pandas as pd
+
+
+class TrainingUtils:
+    """
+    Utilidades para preparar el entrenamiento de los sintetizadores SDV:
+    presupuesto de entrenamiento y submuestreo (estratificado) de filas.
+    """
+
+    DEFAULT_BUDGET = {
+        "max_rows": 10000,
+        "stratify": True,
+        "epochs": 300,
+        "batch_size": 500,
+        "time_limit": None,
+        "random_state": 42,
+    }
+    # Columnas con más valores distintos no se usan para estratificar
+    MAX_STRATA_LEVELS = 50
+    # pac por defecto de CTGAN: batch_size debe ser múltiplo de este valor
+    CTGAN_PAC = 10
+
+    @staticmethod
+    def resolve_budget(training: dict = None) -> dict:
+        """
+        Completa el presupuesto con los valores por defecto y lo normaliza.
+        """
+        budget = dict(TrainingUtils.DEFAULT_BUDGET)
+        budget.update({k: v for k, v in (training or {}).items() if v is not None})
+
+        budget["max_rows"] = max(int(budget["max_rows"]), 1)
+        budget["epochs"] = max(int(budget["epochs"]), 1)
+        pac = TrainingUtils.CTGAN_PAC
+        budget["batch_size"] = max(pac, -(-int(budget["batch_size"]) // pac) * pac)
+        if budget["time_limit"] is not None:
+            budget["time_limit"] = float(budget["time_limit"])
+        return budget
+
+    @staticmethod
+    def stratify_columns(df: pd.DataFrame, stratify=True) -> list:
+        """
+        Devuelve las columnas sobre las que estratificar: las indicadas o, si
+        `stratify` es True, las categóricas con pocos valores distintos.
+        """
+        if not stratify:
+            return []
+        if isinstance(stratify, (list, tuple)):
+            return [c for c in stratify if c in df.columns]
+
+        columns = []
+        for column in df.columns:
+            series = df[column]
+            is_categorical = (
+                series.dtype == object
+                or isinstance(series.dtype, pd.CategoricalDtype)
+                or pd.api.types.is_bool_dtype(series)
+            )
+            if is_categorical and 1 < series.nunique(dropna=False) <= TrainingUtils.MAX_STRATA_LEVELS:
+                columns.append(column)
+        return columns
+
+    @staticmethod
+    def subsample(df: pd.DataFrame, max_rows: int, columns: list = None, random_state: int = 42) -> pd.DataFrame:
+        """
+        Selecciona como mucho `max_rows` filas. Si se dan `columns`, el
+        reparto es proporcional a cada combinación de valores y cada
+        combinación conserva al menos una fila, para no perder categorías raras.
+        """
+        if len(df) <= max_rows:
+            return df
+        if not columns:
+            return df.sample(n=max_rows, random_state=random_state)
+
+        rng = np.random.default_rng(random_state)
+        groups = df.groupby(columns, observed=True, dropna=False, sort=False).indices
+        if len(groups) >= max_rows:
+            return df.sample(n=max_rows, random_state=random_state)
+
+        # Cada combinación reserva su primera fila elegida; el resto son extras
+        fraction = max_rows / len(df)
+        reserved, extra = [], []
+        for group_positions in groups.values():
+            take = max(1, int(round(len(group_positions) * fraction)))
+            chosen = rng.choice(group_positions, size=min(take, len(group_positions)), replace=False)
+            reserved.append(chosen[:1])
+            extra.append(chosen[1:])
+        reserved, extra = np.concatenate(reserved), np.concatenate(extra)
+        positions = np.concatenate([reserved, extra])
+
+        # El redondeo puede desviarse un poco del objetivo: se ajusta al final,
+        # recortando sólo extras para no perder ninguna combinación
+        if len(positions) > max_rows:
+            extra = rng.choice(extra, size=max_rows - len(reserved), replace=False)
+            positions = np.concatenate([reserved, extra])
+        elif len(positions) < max_rows:
+            remaining = np.setdiff1d(np.arange(len(df)), positions, assume_unique=True)
+            extra = rng.choice(remaining, size=max_rows - len(positions), replace=False)
+            positions = np.concatenate([positions, extra])
+
+        return df.iloc[np.sort(positions)]
@@ -1,22 +1,94 @@
+from .id_utils import IdUtils
+from .name_utils import NameUtils
+
+
 class ValidationUtils:
     """
     Clase estática para validar diccionarios de configuración
     en estructuras de generación de datos.
     """
 
+    # Distribuciones de filas hijas por fila padre y sus parámetros
+    CARDINALITY_PARAMS = {
+        'fixed': ('count',),
+        'uniform': ('min', 'max'),
+        'poisson': ('mean',),
+    }
+
     @staticmethod
     def validate_config_dict(config_dict: dict) -> bool:
         """
         Valida que el diccionario de configuración tenga la estructura
-        requerida para cada tipo de dato (string, int, float, boolean, date).
+        requerida para cada tipo de dato (string, int, float, boolean, date)
+        y para las columnas de ID y de clave foránea. Las configuraciones
+        con varias tablas ({"tables": {...}}) se validan con
+        validate_tables_config.
+        """
+        if 'tables' in config_dict:
+            return ValidationUtils.validate_tables_config(config_dict)
+        return ValidationUtils._validate_columns(config_dict.get('columns', {}))
+
+    @staticmethod
+    def validate_tables_config(config_dict: dict) -> bool:
+        """
+        Valida una configuración de varias tablas:
+        {"tables": {nombre: {"columns": {...}, "rows": n, "primary_key": col}}}.
+        Las claves foráneas ({"references": {"table": padre}}) apuntan a la
+        clave primaria de otra tabla y, como mucho una por tabla, pueden
+        fijar cuántas filas hijas tiene cada padre ("per_parent"); esa
+        tabla no puede fijar además "rows".
         """
-        columns = config_dict.get('columns', {})
+        tables = config_dict.get('tables')
+        if not isinstance(tables, dict) or not tables:
+            return False
+
+        for spec in tables.values():
+            columns = spec.get('columns', {}) if isinstance(spec, dict) else {}
+            if not ValidationUtils._validate_columns(columns, tables):
+                return False
+            rows = spec.get('rows', 1)
+            if not isinstance(rows, int) or rows < 0:
+                return False
+            if 'primary_key' in spec and spec['primary_key'] not in columns:
+                return False
+
+            per_parent = [
+                props['references']['per_parent']
+                for props in columns.values()
+                if 'per_parent' in props.get('references', {})
+            ]
+            if len(per_parent) > 1 or not all(map(ValidationUtils._validate_cardinality, per_parent)):
+                return False
+            if per_parent and 'rows' in spec:
+                return False
+
+        return True
+
+    @staticmethod
+    def _validate_columns(columns: dict, tables: dict = None) -> bool:
         if not columns:
             return False
 
         for _, props in columns.items():
             col_type = props.get('type')
 
+            # IDs: formato conocido; claves foráneas: tabla referenciada o número de filas
+            if props.get('id_format', 'sequence') not in IdUtils.FORMATS:
+                return False
+            # Locales de Faker para los nombres: deben existir y tener pesos válidos
+            if 'locales' in props and not ValidationUtils._validate_locales(props['locales']):
+                return False
+            if 'references' in props:
+                references = props['references']
+                if col_type not in ('string', 'int') or not ValidationUtils._validate_references(references, tables):
+                    return False
+                # Referencia a otra columna de la misma configuración: debe existir y no ser otra clave foránea
+                if 'column' in references and 'table' not in references:
+                    target = columns.get(references['column'])
+                    if not isinstance(target, dict) or 'references' in target:
+                        return False
+                continue
+
             if col_type == 'string':
                 # Debe tener una lista 'values' no vacía
                 if not props.get('values'):
@@ -46,3 +118,34 @@ class ValidationUtils:
                 return False
 
         return True
+
+    @staticmethod
+    def _validate_references(references, tables: dict = None) -> bool:
+        if not isinstance(references, dict):
+            return False
+        if tables is not None and 'table' in references:
+            parent = tables.get(references['table'])
+            if not isinstance(parent, dict) or 'primary_key' not in parent:
+                return False
+            return references.get('column', parent['primary_key']) == parent['primary_key']
+        return isinstance(references.get('rows'), int) and references['rows'] >= 1
+
+    @staticmethod
+    def _validate_locales(locales) -> bool:
+        try:
+            NameUtils.parse_locales(locales)
+        except (ValueError, TypeError):
+            return False
+        return True
+
+    @staticmethod
+    def _validate_cardinality(per_parent) -> bool:
+        if not isinstance(per_parent, dict):
+            return False
+        params = ValidationUtils.CARDINALITY_PARAMS.get(per_parent.get('distribution', 'fixed'))
+        if params is None:
+            return False
+        values = [per_parent.get(param) for param in params]
+        if not all(isinstance(value, (int, float)) and value >= 0 for value in values):
+            return False
+        return per_parent.get('distribution') != 'uniform' or values[0] <= values[1]